@@ -0,0 +1,338 @@
+import json
+import os
+import shutil
+from contextlib import contextmanager
+from threading import Lock
+import numpy as np
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from http_cache import bump_tables, table_versions
+from models import db, Game, GameRecord, GameResult, PlayerCountStat
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# 게임 결과 컬럼형 스냅샷
+# GameResult/GameRecord 를 컬럼별 바이너리 파일(메모리 맵)로 내보내고 NumPy 로 통계를 계산합니다.
+# 스냅샷 디렉터리 구조:
+#   meta.json              - 세대 번호, 행 수, 마지막 결과 ID, 전체 결과 수, 결과 삭제 카운터
+#   gen-<세대>/<column>.bin - 컬럼별 고정 길이 배열 (COLUMNS 의 dtype)
+# 새 결과는 마지막 결과 ID 이후만 현재 세대 파일 끝에 덧붙이고, 결과가 삭제되었으면 전체를 다시 만듭니다.
+# game_result 는 AUTOINCREMENT 가 아니어서 가장 최근 결과를 지우면 그 ID 가 다시 쓰이므로, 삭제는 결과 수나 마지막 ID 가
+# 아니라 결과를 지우는 트랜잭션에서 함께 올리는 삭제 카운터(TableVersion 의 RESULTS_REMOVED 행)로 감지합니다.
+# 기존 결과의 수정(클레임 등)은 감지하지 않으므로 `flask --app app build-snapshot` 으로 다시 만드세요.
+#
+# 다른 스레드/워커가 잠금 없이 컬럼 파일을 메모리 맵으로 읽고 있을 수 있으므로, 전체 재생성은 새 세대 디렉터리에
+# 파일을 쓴 뒤 meta.json 을 os.replace 로 바꿔 공개합니다. 읽는 쪽은 meta.json 의 세대와 행 수만큼만 매핑하고,
+# 공개된 행이 있는 파일은 자르거나 다시 쓰지 않습니다. (덧붙이기 전에 잘라내는 것은 공개되지 않은 끝부분뿐입니다)
+# 바로 이전 세대는 meta.json 을 막 읽은 요청을 위해 남겨 두고 그보다 오래된 세대를 지웁니다.
+
+COLUMNS = {
+    'result_id': np.int64,
+    'record_id': np.int64,
+    'game_id': np.int32,
+    'player_id': np.int32,      # 미등록 플레이어는 0
+    'date_ordinal': np.int32,   # date.toordinal()
+    'score': np.float32,        # 점수가 없으면 NaN
+    'is_winner': np.uint8,
+}
+
+FETCH_CHUNK_SIZE = 10000
+
+# 결과 삭제 카운터의 TableVersion 이름 (실제 테이블이 아니므로 ETag 에는 쓰이지 않습니다)
+RESULTS_REMOVED = 'game_result:removed'
+
+_lock = Lock()
+
+
+def _meta_path(directory):
+    return os.path.join(directory, 'meta.json')
+
+
+def _generation_dir(directory, generation):
+    return os.path.join(directory, f'gen-{generation}')
+
+
+def _column_path(directory, generation, name):
+    return os.path.join(_generation_dir(directory, generation), f'{name}.bin')
+
+
+def _read_meta(directory):
+    # 세대 번호가 없는 이전 형식의 메타데이터는 없는 것으로 보고 새로 만듭니다
+    try:
+        with open(_meta_path(directory)) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if 'generation' in meta else None
+
+
+def _write_meta(directory, meta):
+    tmp_path = _meta_path(directory) + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, _meta_path(directory))
+
+
+@contextmanager
+def _file_lock(directory):
+    # 여러 워커 프로세스가 동시에 파일을 덧붙이지 않도록 잠급니다
+    with _lock:
+        with open(os.path.join(directory, '.lock'), 'w') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _db_result_total():
+    # 롤업 히스토그램에서 전체 결과 수를 계산합니다 (플레이어 수 x 기록 수의 합)
+    return db.session.query(
+        func.coalesce(func.sum(PlayerCountStat.player_count * PlayerCountStat.record_count), 0)
+    ).scalar()
+
+
+def _removed_version():
+    return table_versions([RESULTS_REMOVED])[RESULTS_REMOVED]
+
+
+def results_removed(session=None):
+    """게임 결과를 삭제하는 트랜잭션에서 호출하여 다음 조회 때 스냅샷을 다시 만들게 합니다."""
+    session = session if session is not None else db.session
+    bump_tables(session.connection(), [RESULTS_REMOVED])
+
+
+def _remove_old_generations(directory, generation):
+    # 현재와 바로 이전 세대를 제외한 세대 디렉터리와 이전 형식의 컬럼 파일을 지웁니다.
+    # 아직 매핑 중인 파일도 지울 수 있으며(POSIX), 매핑은 닫힐 때까지 유효합니다
+    for entry in os.listdir(directory):
+        path = os.path.join(directory, entry)
+        if entry.startswith('gen-'):
+            try:
+                old = int(entry[len('gen-'):])
+            except ValueError:
+                continue
+            if old < generation - 1:
+                shutil.rmtree(path, ignore_errors=True)
+        elif entry.endswith('.bin'):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _append_rows(directory, after_result_id):
+    # after_result_id 이후의 결과를 세대 디렉터리의 컬럼 파일 끝에 덧붙이고 (추가된 행 수, 마지막 결과 ID)를 반환합니다
+    result = db.session.execute(db.select(
+        GameResult.id, GameResult.game_record_id, GameRecord.game_id, GameResult.player_id,
+        GameRecord.date, GameResult.score, GameResult.is_winner
+    ).join(
+        GameRecord, GameResult.game_record_id == GameRecord.id
+    ).where(
+        GameResult.id > after_result_id
+    ).order_by(GameResult.id).execution_options(stream_results=True, yield_per=FETCH_CHUNK_SIZE))
+
+    files = {name: open(os.path.join(directory, f'{name}.bin'), 'ab') for name in COLUMNS}
+    appended = 0
+    last_id = after_result_id
+    try:
+        for partition in result.partitions():
+            rows = list(zip(*partition))
+            columns = {
+                'result_id': np.array(rows[0], dtype=COLUMNS['result_id']),
+                'record_id': np.array(rows[1], dtype=COLUMNS['record_id']),
+                'game_id': np.array(rows[2], dtype=COLUMNS['game_id']),
+                'player_id': np.array([p or 0 for p in rows[3]], dtype=COLUMNS['player_id']),
+                'date_ordinal': np.array([d.toordinal() for d in rows[4]], dtype=COLUMNS['date_ordinal']),
+                'score': np.array([np.nan if s is None else s for s in rows[5]], dtype=COLUMNS['score']),
+                'is_winner': np.array([1 if w else 0 for w in rows[6]], dtype=COLUMNS['is_winner']),
+            }
+            for name, values in columns.items():
+                files[name].write(values.tobytes())
+            appended += len(partition)
+            last_id = int(columns['result_id'][-1])
+    finally:
+        for f in files.values():
+            f.close()
+    return appended, last_id
+
+
+def build_snapshot(directory):
+    """스냅샷을 새 세대 디렉터리에 처음부터 다시 만들고 공개합니다."""
+    os.makedirs(directory, exist_ok=True)
+    with _file_lock(directory):
+        current = _read_meta(directory)
+        generation = current['generation'] + 1 if current else 1
+        # 행을 읽기 전의 카운터를 기록합니다. 그 사이의 삭제는 다음 조회에서 한 번 더 다시 만들게 할 뿐입니다
+        removed = _removed_version()
+        # 중단된 이전 재생성이 남긴 (공개되지 않은) 같은 세대 디렉터리는 지우고 다시 씁니다
+        generation_dir = _generation_dir(directory, generation)
+        shutil.rmtree(generation_dir, ignore_errors=True)
+        os.makedirs(generation_dir)
+        rows, last_id = _append_rows(generation_dir, 0)
+        meta = {'generation': generation, 'rows': rows, 'last_result_id': last_id,
+                'result_total': _db_result_total(), 'removed': removed}
+        _write_meta(directory, meta)
+        _remove_old_generations(directory, generation)
+    return meta
+
+
+def refresh_snapshot(directory):
+    """
+    새로 추가된 결과만 덧붙입니다. 스냅샷이 없거나 스냅샷 이후 결과가 삭제되었으면 전체를 다시 만듭니다.
+    """
+    meta = _read_meta(directory)
+    removed = _removed_version()
+    if meta is None or meta.get('removed') != removed:
+        return build_snapshot(directory)
+
+    result_total = _db_result_total()
+    max_id = db.session.query(func.max(GameResult.id)).scalar() or 0
+    if max_id == meta['last_result_id'] and result_total == meta['result_total']:
+        return meta
+
+    with _file_lock(directory):
+        meta = _read_meta(directory)
+        # 다른 워커가 그 사이에 공개한 스냅샷도 같은 삭제 카운터에서 만든 것이어야 덧붙일 수 있습니다
+        if meta is not None and meta.get('removed') != removed:
+            meta = None
+        if meta is not None:
+            # 이미 덧붙인 행 이후에 삭제가 있었는지 확인: 새 행 수 + 기존 행 수가 전체 결과 수와 같아야 합니다
+            new_rows = db.session.query(func.count(GameResult.id)).filter(
+                GameResult.id > meta['last_result_id']
+            ).scalar()
+            if meta['rows'] + new_rows != result_total:
+                meta = None
+        if meta is not None:
+            # 메타데이터에 기록된 행 수 이후의 (중단된 쓰기로 남은) 바이트는 잘라냅니다.
+            # 읽는 쪽은 공개된 행 수까지만 매핑하므로 이 부분은 매핑되어 있지 않습니다
+            generation_dir = _generation_dir(directory, meta['generation'])
+            for name, dtype in COLUMNS.items():
+                with open(_column_path(directory, meta['generation'], name), 'r+b') as f:
+                    f.truncate(meta['rows'] * np.dtype(dtype).itemsize)
+            appended, last_id = _append_rows(generation_dir, meta['last_result_id'])
+            meta = dict(meta, rows=meta['rows'] + appended, last_result_id=last_id, result_total=result_total)
+            _write_meta(directory, meta)
+    if meta is None:
+        return build_snapshot(directory)
+    return meta
+
+
+# ORM 으로 삭제하는 결과도 스냅샷 재생성을 표시합니다. (일괄 삭제는 rollup 모듈에서 results_removed 를 호출합니다)
+@event.listens_for(Session, 'before_flush')
+def _mark_removed_on_result_deletes(session, flush_context, instances):
+    if any(isinstance(obj, GameResult) for obj in session.deleted):
+        results_removed(session)
+
+
+class ResultsSnapshot:
+    """스냅샷 컬럼을 메모리 맵으로 열어 NumPy 배열로 제공합니다."""
+
+    def __init__(self, directory, meta=None):
+        meta = meta or _read_meta(directory)
+        self.rows = meta['rows'] if meta else 0
+        self.columns = {}
+        for name, dtype in COLUMNS.items():
+            if self.rows == 0:
+                self.columns[name] = np.empty(0, dtype=dtype)
+            else:
+                path = _column_path(directory, meta['generation'], name)
+                self.columns[name] = np.memmap(path, dtype=dtype, mode='r', shape=(self.rows,))
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def select(self, date_from=None, date_to=None):
+        """기록 날짜 범위(date 객체)에 해당하는 행만 담은 컬럼 딕셔너리를 반환합니다."""
+        if date_from is None and date_to is None:
+            return self.columns
+        mask = np.ones(self.rows, dtype=bool)
+        if date_from is not None:
+            mask &= self.columns['date_ordinal'] >= date_from.toordinal()
+        if date_to is not None:
+            mask &= self.columns['date_ordinal'] <= date_to.toordinal()
+        return {name: values[mask] for name, values in self.columns.items()}
+
+
+def load_snapshot(directory):
+    """스냅샷을 최신 상태로 갱신한 뒤 엽니다."""
+    return ResultsSnapshot(directory, refresh_snapshot(directory))
+
+
+# NumPy 벡터화 통계 쿼리 (모든 함수는 ResultsSnapshot.select 의 컬럼 딕셔너리를 받습니다)
+
+def game_popularity(columns, limit=10):
+    """게임별 플레이(기록) 수 상위 목록: [(game_id, plays), ...]"""
+    if len(columns['record_id']) == 0:
+        return []
+    _, first = np.unique(columns['record_id'], return_index=True)
+    plays = np.bincount(columns['game_id'][first])
+    game_ids = np.nonzero(plays)[0]
+    order = np.argsort(-plays[game_ids], kind='stable')[:limit]
+    return [(int(game_ids[i]), int(plays[game_ids[i]])) for i in order]
+
+
+def player_win_rates(columns, min_plays=1):
+    """등록된 플레이어별 [(player_id, plays, wins, win_rate)], 승리 수 내림차순"""
+    registered = columns['player_id'] > 0
+    player_ids = columns['player_id'][registered]
+    if len(player_ids) == 0:
+        return []
+    plays = np.bincount(player_ids)
+    wins = np.bincount(player_ids, weights=columns['is_winner'][registered]).astype(np.int64)
+    ids = np.nonzero(plays >= min_plays)[0]
+    order = np.lexsort((ids, -wins[ids]))
+    return [
+        (int(ids[i]), int(plays[ids[i]]), int(wins[ids[i]]), round(wins[ids[i]] / plays[ids[i]] * 100, 1))
+        for i in order
+    ]
+
+
+def player_count_histogram(columns):
+    """기록당 플레이어 수별 기록 수: {player_count: record_count}"""
+    if len(columns['record_id']) == 0:
+        return {}
+    _, per_record = np.unique(columns['record_id'], return_counts=True)
+    histogram = np.bincount(per_record)
+    return {int(count): int(histogram[count]) for count in np.nonzero(histogram)[0]}
+
+
+def game_score_stats(columns):
+    """게임별 점수 통계: {game_id: {'count', 'mean', 'min', 'max', 'std'}} (점수 없는 결과 제외)"""
+    scored = ~np.isnan(columns['score'])
+    game_ids = columns['game_id'][scored]
+    scores = columns['score'][scored].astype(np.float64)
+    if len(scores) == 0:
+        return {}
+    size = int(game_ids.max()) + 1
+    counts = np.bincount(game_ids, minlength=size)
+    sums = np.bincount(game_ids, weights=scores, minlength=size)
+    squares = np.bincount(game_ids, weights=scores * scores, minlength=size)
+    minimums = np.full(size, np.inf)
+    maximums = np.full(size, -np.inf)
+    np.minimum.at(minimums, game_ids, scores)
+    np.maximum.at(maximums, game_ids, scores)
+
+    stats = {}
+    for game_id in np.nonzero(counts)[0]:
+        mean = sums[game_id] / counts[game_id]
+        variance = max(squares[game_id] / counts[game_id] - mean * mean, 0.0)
+        stats[int(game_id)] = {
+            'count': int(counts[game_id]),
+            'mean': round(float(mean), 1),
+            'min': float(minimums[game_id]),
+            'max': float(maximums[game_id]),
+            'std': round(float(np.sqrt(variance)), 1)
+        }
+    return stats
+
+
+def game_names(game_ids):
+    if not game_ids:
+        return {}
+    return dict(db.session.query(Game.id, Game.name).filter(Game.id.in_(list(game_ids))).all())
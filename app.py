@@ -1,65 +1,160 @@
 from flask import Flask, jsonify, request, make_response
 from flask_cors import CORS
-from models import db, Player, Meeting, Game, GameRecord, GameResult
+from models import db, init_db
 from routes import game, player, meeting, game_record, index
 from utils import add_cors_headers, create_cors_preflight_response
 import logging
+import request_log
+import click
+import rollup
+import analytics
+import ratings
+import query_stats
+import metrics
+import migrations
+from routes.index import analytics_snapshot_dir
+from player_cache import player_stats_cache
+from config import get_config
 
-# 로깅 설정
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
-app.config['SECRET_KEY'] = 'your-secret-key'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///boardgame.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-# CORS 설정 - 기본 설정 적용
-CORS(app, resources={r"/*": {"origins": "*"}})
-
-# 모든 응답에 CORS 헤더 추가
-@app.after_request
-def after_request(response):
-    logger.debug(f"Applying CORS headers to response for: {request.path}")
-    return add_cors_headers(response)
-
-# OPTIONS 요청에 대한 전역 핸들러
-@app.route('/', defaults={'path': ''}, methods=['OPTIONS'])
-@app.route('/<path:path>', methods=['OPTIONS'])
-def options_handler(path):
-    logger.debug(f"OPTIONS request received for path: {path}")
-    return create_cors_preflight_response()
-
-# API 요청 로깅
-@app.before_request
-def log_request():
-    logger.debug(f"Request received: {request.method} {request.path}")
-    logger.debug(f"Request headers: {request.headers}")
-    if request.method in ['POST', 'PUT'] and request.is_json:
-        logger.debug(f"Request body: {request.get_json()}")
-
-db.init_app(app)
-
-# 블루프린트 등록
-app.register_blueprint(index.index)
-app.register_blueprint(player.player)
-app.register_blueprint(meeting.meeting)
-app.register_blueprint(game.game)
-app.register_blueprint(game_record.game_record)
-
-# 404 에러 핸들러
-@app.errorhandler(404)
-def not_found(error):
-    logger.error(f"404 error: {request.path}")
-    return jsonify({'error': '요청한 리소스를 찾을 수 없습니다.'}), 404
-
-# 500 에러 핸들러
-@app.errorhandler(500)
-def server_error(error):
-    logger.error(f"500 error: {error}")
-    return jsonify({'error': '서버 내부 오류가 발생했습니다.'}), 500
+
+def create_app(config=None):
+    """
+    앱을 생성합니다. config 는 프로필 이름('development', 'production', 'testing'),
+    설정 클래스, 또는 설정 딕셔너리입니다. 없으면 APP_ENV 환경 변수의 프로필을 사용합니다.
+    """
+    app = Flask(__name__)
+    if config is None or isinstance(config, str):
+        app.config.from_object(get_config(config))
+    elif isinstance(config, dict):
+        app.config.from_object(get_config())
+        app.config.update(config)
+    else:
+        app.config.from_object(config)
+    if not app.config.get('SECRET_KEY'):
+        # 운영 프로필은 기본 SECRET_KEY 가 없습니다 (세션/flash 서명에 쓰이므로 알려진 값으로 시작하지 않습니다)
+        raise RuntimeError("SECRET_KEY 환경 변수를 설정해야 합니다.")
+
+    # 로깅 설정 (큐 기반 비동기 출력, 요청별 한 줄 접근 로그)
+    request_log.init_app(app)
+
+    # 플레이어 통계 캐시 크기 (LRU)
+    player_stats_cache.max_size = app.config['PLAYER_STATS_CACHE_SIZE']
+
+    # CORS 설정 - 기본 설정 적용
+    CORS(app, resources={r"/*": {"origins": "*"}})
+
+    # 모든 응답에 CORS 헤더 추가
+    @app.after_request
+    def after_request(response):
+        return add_cors_headers(response)
+
+    # OPTIONS 요청에 대한 전역 핸들러
+    @app.route('/', defaults={'path': ''}, methods=['OPTIONS'])
+    @app.route('/<path:path>', methods=['OPTIONS'])
+    def options_handler(path):
+        return create_cors_preflight_response()
+
+    # DB 연결 (엔진 옵션, SQLite PRAGMA)
+    init_db(app)
+
+    # 요청별 SQL 쿼리 수/시간 계측 (X-Query-Count 헤더, N+1 의심 로그)
+    query_stats.init_app(app)
+
+    # 엔드포인트별 응답 시간/크기/DB 시간 히스토그램 (GET /metrics)
+    metrics.init_app(app)
+
+    # 블루프린트 등록
+    app.register_blueprint(index.index)
+    app.register_blueprint(player.player)
+    app.register_blueprint(meeting.meeting)
+    app.register_blueprint(game.game)
+    app.register_blueprint(game_record.game_record)
+
+    # 404 에러 핸들러
+    @app.errorhandler(404)
+    def not_found(error):
+        logger.warning("404 error: %s", request.path)
+        return jsonify({'error': '요청한 리소스를 찾을 수 없습니다.'}), 404
+
+    # 500 에러 핸들러
+    @app.errorhandler(500)
+    def server_error(error):
+        logger.error("500 error: %s", error)
+        return jsonify({'error': '서버 내부 오류가 발생했습니다.'}), 500
+
+    register_commands(app)
+
+    # 메모리 DB를 쓰는 테스트 프로필만 앱 생성 시 스키마를 만듭니다. 그 밖에는 init-db (개발 서버는 아래 __main__)
+    if app.config.get('CREATE_SCHEMA'):
+        with app.app_context():
+            db.create_all()
+
+    return app
+
+
+def register_commands(app):
+    # 스키마 생성 명령: flask --app app init-db
+    @app.cli.command('init-db')
+    def init_db_command():
+        """테이블을 생성합니다. (이미 있는 테이블은 그대로 둡니다)"""
+        db.create_all()
+        click.echo("스키마 생성 완료")
+
+    # 스키마 마이그레이션 명령: flask --app app migrate [--dry-run]
+    @app.cli.command('migrate')
+    @click.option('--dry-run', is_flag=True, help='변경 없이 단계별 예상 시간만 출력')
+    @click.option('--chunk-size', default=migrations.DEFAULT_CHUNK_SIZE, help='한 트랜잭션에서 처리할 id 범위')
+    def migrate_command(dry_run, chunk_size):
+        """적용하지 않은 마이그레이션을 실행합니다. (SQLite, migrations.py)"""
+        if db.engine.dialect.name != 'sqlite' or not db.engine.url.database:
+            raise click.ClickException("SQLite 파일 데이터베이스만 지원합니다.")
+        migrations.migrate(db.engine.url.database, dry_run=dry_run, chunk_size=chunk_size, report=click.echo)
+
+    # 통계 롤업 테이블 재계산 명령: flask --app app rebuild-stats
+    @app.cli.command('rebuild-stats')
+    def rebuild_stats_command():
+        """통계 롤업 테이블을 원본 데이터에서 다시 계산하고 기존 값과의 차이를 출력합니다."""
+        db.create_all()
+        before = rollup.snapshot()
+        rollup.rebuild()
+        db.session.commit()
+        differences = rollup.diff(before, rollup.snapshot())
+        for table, count in differences.items():
+            click.echo(f"{table}: {count}개 행 불일치" if count else f"{table}: 일치")
+
+    # 분석용 컬럼형 스냅샷 재생성 명령: flask --app app build-snapshot
+    @app.cli.command('build-snapshot')
+    def build_snapshot_command():
+        """게임 결과 컬럼형 스냅샷을 처음부터 다시 만듭니다."""
+        meta = analytics.build_snapshot(analytics_snapshot_dir())
+        click.echo(f"스냅샷 생성 완료: {meta['rows']}개 결과 (마지막 결과 ID {meta['last_result_id']})")
+
+    # 레이팅 전체 재계산 명령: flask --app app rebuild-ratings [--if-dirty]
+    @app.cli.command('rebuild-ratings')
+    @click.option('--if-dirty', is_flag=True, help='재계산이 필요한 경우에만 실행 (주기 작업용)')
+    def rebuild_ratings_command(if_dirty):
+        """전체 게임 기록을 날짜순으로 다시 처리하여 플레이어 레이팅을 재계산합니다."""
+        db.create_all()
+        if if_dirty:
+            if not ratings.is_stale():
+                click.echo("레이팅이 최신 상태입니다.")
+                return
+            count = ratings.refresh()
+            if count is None:
+                raise click.ClickException("재계산 중에 기록이 변경되었습니다. 다시 실행하세요.")
+        else:
+            count = ratings.replay()
+            db.session.commit()
+        click.echo(f"레이팅 재계산 완료: {count}개 레이팅")
+
+
+# `flask --app app` 및 `gunicorn app:app` 용 기본 앱 (APP_ENV 프로필)
+# 운영: export APP_ENV=production SECRET_KEY=... && flask --app app init-db && gunicorn -w 4 -b 0.0.0.0:5005 app:app
+app = create_app()
 
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
-    app.run(debug=True, port=5005, host='0.0.0.0')
+    app.run(debug=app.config.get('DEBUG', False), port=5005, host='0.0.0.0')
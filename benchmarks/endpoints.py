@@ -0,0 +1,250 @@
+"""
+엔드포인트 벤치마크
+
+seed_data.py 로 만든 규모별 합성 DB에서 routes/*.py 의 모든 엔드포인트를 Flask 테스트 클라이언트로 호출하고
+엔드포인트별 지연 시간 백분위수, 쿼리 수, 최대 메모리 사용량을 비교합니다.
+
+    python benchmarks/endpoints.py --scales 10000,100000,1000000 --iterations 20
+    python benchmarks/endpoints.py --scales 10000000 --data-dir /data/bench --json endpoints.json
+
+호출 목록은 check_schema.EXERCISES 를 그대로 씁니다. 목록 전체(조회 -> 생성 -> 수정 -> 삭제)를 한 번의 반복으로
+실행하므로 반복마다 새로 만든 플레이어/게임을 수정하고 삭제합니다. 첫 --warmup 번의 반복은 집계하지 않습니다.
+{player_id} 등에는 첫 번째 ID(합성 데이터에서 가장 활동이 많은 플레이어/게임)가 들어갑니다.
+
+최대 메모리는 측정 반복이 끝난 뒤 엔드포인트마다 한 번 더 호출하면서 tracemalloc 으로 잰 요청 중 Python 할당
+최대치(NumPy 배열 포함, SQLite 페이지 캐시 제외)입니다. tracemalloc 은 느리므로 지연 시간 측정과 따로 실행합니다.
+
+--data-dir 를 주면 생성한 DB(scale-<결과 수>-seed-<시드>.db)를 남겨 다음 실행에서 다시 씁니다.
+측정은 항상 복사본에서 하므로 남겨 둔 DB는 바뀌지 않습니다.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import check_schema  # noqa: E402
+import seed_data  # noqa: E402
+
+
+def _create_app(db_path, directory):
+    # app 모듈을 가져올 때 만들어지는 기본 앱은 메모리 DB(testing 프로필)를 쓰게 합니다
+    os.environ['APP_ENV'] = 'testing'
+    from app import create_app
+    logging.disable(logging.CRITICAL)
+    return create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'ANALYTICS_SNAPSHOT_DIR': os.path.join(directory, 'analytics'),
+        'CREATE_SCHEMA': False,
+        'LOG_ASYNC': False,
+        'LOG_ACCESS': False,
+        'DEBUG': False,
+        'TESTING': False,
+    })
+
+
+def _dataset(scale, seed, data_dir):
+    path = os.path.join(data_dir, f'scale-{scale}-seed-{seed}.db')
+    if not os.path.exists(path):
+        print(f"[{scale}] 합성 데이터 생성 중...", file=sys.stderr)
+        try:
+            seed_data.generate(path, scale, seed, report=lambda message: print(f"    {message}", file=sys.stderr))
+        except BaseException:
+            if os.path.exists(path):
+                os.remove(path)
+            raise
+    return path
+
+
+def _copy(source, target):
+    # WAL 에 남은 내용까지 포함하도록 백업 API로 복사합니다
+    src, dst = sqlite3.connect(source), sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        src.close()
+        dst.close()
+
+
+def _call(client, method, path, body):
+    from query_stats import collect_queries
+    kwargs = {'data': body['form']} if isinstance(body, dict) and 'form' in body else {'json': body}
+    # 테스트 클라이언트는 같은 스레드에서 앱을 실행하므로 스트리밍 응답을 읽는 동안의 쿼리까지 셉니다
+    # (X-Query-Count 헤더는 본문을 만들기 전에 보내므로 내보내기 쿼리가 빠집니다)
+    with collect_queries() as stats:
+        started = time.perf_counter()
+        try:
+            response = client.open(path, method=method, **kwargs)
+            response.get_data()  # 스트리밍 응답까지 모두 읽기
+        except Exception:
+            response = None
+        elapsed = time.perf_counter() - started
+    return response, elapsed, stats.count
+
+
+def _run_exercises(client, ids, on_call):
+    """EXERCISES 를 한 번 실행합니다. on_call(i, method, path, response, elapsed, queries)"""
+    for i, (endpoint, method, path, body) in enumerate(check_schema.EXERCISES):
+        try:
+            path = check_schema.fill_ids(path, ids)
+            body = check_schema.fill_ids(body, ids)
+        except KeyError:
+            on_call(i, method, path, None, None, None)
+            continue
+        response, elapsed, queries = _call(client, method, path, body)
+        on_call(i, method, path, response, elapsed, queries)
+        if response is not None and response.status_code == 201:
+            created = response.get_json(silent=True)
+            if isinstance(created, dict) and 'id' in created:
+                ids['new_' + endpoint.split('.')[0] + '_id'] = created['id']
+
+
+def _percentiles(values):
+    if not values:
+        return {'p50': None, 'p95': None, 'p99': None, 'max': None}
+    values = sorted(values)
+
+    def pick(q):
+        return round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 2)
+
+    return {'p50': pick(0.50), 'p95': pick(0.95), 'p99': pick(0.99), 'max': round(values[-1] * 1000, 2)}
+
+
+def run_scale(scale, args, data_dir):
+    source = _dataset(scale, args.seed, data_dir)
+    directory = tempfile.mkdtemp(prefix='endpoints-')
+    try:
+        db_path = os.path.join(directory, 'bench.db')
+        _copy(source, db_path)
+        app = _create_app(db_path, directory)
+        client = app.test_client()
+        ids = check_schema.first_ids(app)
+        with sqlite3.connect(db_path) as conn:
+            tables = {table: conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+                      for table in ('player', 'game', 'meeting', 'meeting_participant', 'game_record', 'game_result')}
+
+        samples = [{'latencies': [], 'queries': [], 'statuses': {}} for _ in check_schema.EXERCISES]
+        paths = [None] * len(check_schema.EXERCISES)
+
+        def record(i, method, path, response, elapsed, queries):
+            paths[i] = path
+            sample = samples[i]
+            status = 'error' if response is None else str(response.status_code)
+            sample['statuses'][status] = sample['statuses'].get(status, 0) + 1
+            if response is not None and response.status_code < 400:
+                sample['latencies'].append(elapsed)
+                sample['queries'].append(queries)
+
+        def ignore(*_):
+            pass
+
+        print(f"[{scale}] 측정 중... (예열 {args.warmup}회, 측정 {args.iterations}회)", file=sys.stderr)
+        for iteration in range(args.warmup + args.iterations):
+            _run_exercises(client, ids, record if iteration >= args.warmup else ignore)
+
+        peaks = [None] * len(check_schema.EXERCISES)
+
+        def measure_memory(i, method, path, response, elapsed, queries):
+            current, peak = tracemalloc.get_traced_memory()
+            peaks[i] = peak - baseline[0]
+            baseline[0] = current
+            tracemalloc.reset_peak()
+
+        tracemalloc.start()
+        baseline = [tracemalloc.get_traced_memory()[0]]
+        try:
+            _run_exercises(client, ids, measure_memory)
+        finally:
+            tracemalloc.stop()
+
+        with app.app_context():
+            from models import db
+            db.engine.dispose()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    endpoints = []
+    for (endpoint, method, _, _), path, sample, peak in zip(check_schema.EXERCISES, paths, samples, peaks):
+        queries = sample['queries']
+        endpoints.append({
+            'endpoint': endpoint,
+            'method': method,
+            'path': path,
+            'statuses': sample['statuses'],
+            'latency_ms': _percentiles(sample['latencies']),
+            'queries': max(queries) if queries else None,
+            'peak_memory_kb': round(peak / 1024, 1) if peak is not None else None,
+        })
+    return {'scale': scale, 'tables': tables, 'endpoints': endpoints}
+
+
+def not_exercised():
+    """EXERCISES 에 없는 엔드포인트 (라우트를 추가하고 호출 목록에 넣지 않은 경우)"""
+    os.environ['APP_ENV'] = 'testing'
+    from app import app
+    registered = {rule.endpoint for rule in app.url_map.iter_rules()} - check_schema.SKIPPED_ENDPOINTS
+    return sorted(registered - {endpoint for endpoint, _, _, _ in check_schema.EXERCISES})
+
+
+def print_report(reports):
+    header = (f"{'method':<7}{'path':<58}{'status':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"
+              f"{'queries':>9}{'peak KB':>10}")
+    for report in reports:
+        tables = report['tables']
+        print(f"\n결과 {tables['game_result']}행 (기록 {tables['game_record']}, 플레이어 {tables['player']}, "
+              f"게임 {tables['game']}, 모임 {tables['meeting']})")
+        print(header)
+        print('-' * len(header))
+        for endpoint in report['endpoints']:
+            latency = endpoint['latency_ms']
+            status = ','.join(sorted(endpoint['statuses'])) or '-'
+            print(f"{endpoint['method']:<7}{endpoint['path'][:57]:<58}{status:>8}"
+                  f"{str(latency['p50']):>9}{str(latency['p95']):>9}{str(latency['p99']):>9}{str(latency['max']):>9}"
+                  f"{str(endpoint['queries']):>9}{str(endpoint['peak_memory_kb']):>10}")
+    print('(시간 단위: ms, 오류 응답은 지연 시간에서 제외)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='엔드포인트 벤치마크')
+    parser.add_argument('--scales', default='10000,100000,1000000', help='쉼표로 구분한 게임 결과 행 수')
+    parser.add_argument('--iterations', type=int, default=20, help='엔드포인트별 측정 횟수')
+    parser.add_argument('--warmup', type=int, default=2, help='집계하지 않는 예열 반복 횟수')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--data-dir', help='생성한 합성 DB를 보관/재사용할 디렉터리 (없으면 임시 디렉터리)')
+    parser.add_argument('--json', help='결과를 JSON 파일로 저장할 경로')
+    args = parser.parse_args()
+
+    missing = not_exercised()
+    if missing:
+        print(f"호출 목록에 없는 엔드포인트: {', '.join(missing)}", file=sys.stderr)
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix='seed-data-')
+    os.makedirs(data_dir, exist_ok=True)
+    try:
+        reports = [run_scale(int(scale), args, data_dir) for scale in args.scales.split(',')]
+    finally:
+        if not args.data_dir:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    print_report(reports)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'args': vars(args),
+                'environment': {'python': platform.python_version(), 'sqlite': sqlite3.sqlite_version},
+                'not_exercised': missing,
+                'reports': reports,
+            }, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,468 @@
+"""
+HTTP 부하 테스트
+
+앱을 별도 프로세스의 HTTP 서버로 띄우고(또는 --url 의 서버에), 프런트엔드(frontend/src/services/api.ts)가
+보내는 요청을 MIX 비율(읽기 90%, 쓰기 10%)로 섞어 동시에 보냅니다. 요청별 처리량, 지연 시간 백분위수,
+오류율(SQLite 잠금 오류 포함)을 출력하고 실행마다 JSON 보고서를 저장합니다.
+
+    python benchmarks/load_test.py --concurrency 16 --duration 30
+    python benchmarks/load_test.py --results 1000000 --data-dir /data/bench --server-processes 4
+    python benchmarks/load_test.py --write-ratio 0.3 --compare load-report-20240501-120000.json
+    python benchmarks/load_test.py --url http://localhost:5005 --concurrency 8   # 이미 실행 중인 서버
+
+서버는 seed_data.py 로 만든 합성 DB(--results)의 복사본을 production 프로필로 사용합니다.
+--server-processes N 이면 스레드 서버 프로세스 N 개를 서로 다른 포트로 띄우고 클라이언트를 나눠 붙여,
+여러 워커 프로세스(gunicorn -w N)가 같은 SQLite 파일을 쓰는 상황을 흉내 냅니다.
+
+클라이언트는 --concurrency 개의 스레드가 각자 연결을 유지하며 응답을 받으면 바로 다음 요청을 보냅니다.
+처음 --warmup 초의 요청은 집계하지 않습니다. 잠금 오류는 응답 본문에 'database is locked' 가 있는
+5xx 응답입니다. (기록 저장 API는 오류 메시지를 본문에 넣고, 그 밖의 API는 일반 5xx 로만 집계됩니다)
+"""
+import argparse
+import datetime
+import http.client
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MBTI_TYPES = ['INTP', 'ENFP', 'ISTJ', 'ESFJ']
+LOCATIONS = ['서울', '부산', '대구', '인천']
+
+
+def _results(rng, ids):
+    players = rng.sample(ids['players'], min(rng.randint(2, 5), len(ids['players'])))
+    return [{'player_id': player_id, 'score': rng.randint(0, 100), 'is_winner': i == 0}
+            for i, player_id in enumerate(players)]
+
+
+# 본문 생성 함수: (rng, 전체 ID 목록, 이번 요청 경로에 넣은 ID) -> JSON 본문
+def _record_body(rng, ids, target):
+    return {'game_id': target['game_id'], 'results': _results(rng, ids)}
+
+
+def _standalone_body(rng, ids, target):
+    day = datetime.date(2024, 1, 1) + datetime.timedelta(days=rng.randint(0, 365))
+    return {'game_id': target['game_id'], 'date': day.isoformat(), 'results': _results(rng, ids)}
+
+
+def _participant_body(rng, ids, target):
+    return {'player_id': target['player_id'], 'arrival_time': f'{rng.randint(18, 20)}:00'}
+
+
+def _meeting_body(rng, ids, target):
+    return {'date': '2025-01-01', 'location': rng.choice(LOCATIONS), 'host_id': target['player_id'],
+            'planned_games': [target['game_id']]}
+
+
+def _player_body(rng, ids, target):
+    return {'name': f"플레이어{target['player_id']}", 'birth_year': rng.randint(1970, 2005),
+            'mbti': rng.choice(MBTI_TYPES), 'location': rng.choice(LOCATIONS)}
+
+
+# 요청 구성: (이름, 가중치, 메서드, 경로, 본문 생성 함수)
+# frontend/src/services/api.ts 의 호출 중 화면에서 쓰고 백엔드에 라우트가 있는 것입니다.
+# 가중치는 읽기 합계 90, 쓰기 합계 10 입니다. (--write-ratio 로 비율을, --mix 로 개별 가중치를 바꿉니다)
+# 모임 목록은 첫 페이지만 요청합니다. (meetingApi.getAll 은 X-Next-Cursor 를 따라 모든 페이지를 가져옵니다)
+MIX = [
+    ('stats', 20, 'GET', '/api/stats', None),                                # statsApi.getStats (대시보드)
+    ('meetings', 15, 'GET', '/api/meetings', None),                          # meetingApi.getPage
+    ('meeting_detail', 10, 'GET', '/api/meetings/{meeting_id}', None),       # meetingApi.getById
+    ('players', 15, 'GET', '/api/players', None),                            # playerApi.getAll
+    ('player_detail', 10, 'GET', '/api/players/{player_id}', None),          # playerApi.getById
+    ('player_stats', 8, 'GET', '/api/stats/player/{player_id}', None),       # statsApi.getPlayerStats
+    ('games', 7, 'GET', '/api/games', None),                                 # gameApi.getAll
+    ('game_detail', 5, 'GET', '/api/games/{game_id}', None),                 # gameApi.getById
+    ('meeting_record', 4, 'POST', '/api/meetings/{meeting_id}/records', _record_body),  # gameRecordApi.create
+    ('standalone_record', 3, 'POST', '/api/game-records', _standalone_body),  # gameResultApi.createStandalone
+    ('participant', 1, 'POST', '/api/meetings/{meeting_id}/participants', _participant_body),  # addParticipant
+    ('meeting_create', 1, 'POST', '/api/meetings', _meeting_body),           # meetingApi.create
+    ('player_update', 1, 'PUT', '/api/players/{player_id}', _player_body),   # playerApi.update
+]
+
+MEETING_PAGES = 2
+SERVER_START_TIMEOUT = 60.0
+
+
+def mix_weights(write_ratio=None, overrides=None):
+    """요청 이름 -> 가중치. overrides 를 먼저 적용하고 write_ratio 가 있으면 읽기/쓰기 합계를 맞춥니다."""
+    weights = {name: weight for name, weight, _, _, _ in MIX}
+    for name, weight in (overrides or {}).items():
+        if name not in weights:
+            raise ValueError(f'알 수 없는 요청 이름: {name}')
+        weights[name] = weight
+    if write_ratio is not None:
+        writes = {name for name, _, method, _, _ in MIX if method != 'GET'}
+        write_total = sum(weights[name] for name in writes)
+        read_total = sum(weight for name, weight in weights.items() if name not in writes)
+        for name in weights:
+            if name in writes:
+                weights[name] = weights[name] / write_total * write_ratio if write_total else 0
+            else:
+                weights[name] = weights[name] / read_total * (1 - write_ratio) if read_total else 0
+    return weights
+
+
+def _serve(db_path, directory, port):
+    # production 프로필에 벤치마크 DB를 연결합니다
+    os.environ['APP_ENV'] = 'production'
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ.setdefault('SECRET_KEY', 'load-test')
+    from werkzeug.serving import run_simple
+    from app import create_app
+    app = create_app({'ANALYTICS_SNAPSHOT_DIR': os.path.join(directory, 'analytics'), 'LOG_LEVEL': 'ERROR'})
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    run_simple('127.0.0.1', port, app, threaded=True)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _copy(source, target):
+    # WAL 에 남은 내용까지 포함하도록 백업 API로 복사합니다
+    src, dst = sqlite3.connect(source), sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        src.close()
+        dst.close()
+
+
+def _dataset(results, seed, data_dir):
+    import seed_data
+    path = os.path.join(data_dir, f'scale-{results}-seed-{seed}.db')
+    if not os.path.exists(path):
+        print(f"합성 데이터 생성 중... (결과 {results}행)", file=sys.stderr)
+        try:
+            seed_data.generate(path, results, seed, report=lambda message: print(f"    {message}", file=sys.stderr))
+        except BaseException:
+            if os.path.exists(path):
+                os.remove(path)
+            raise
+    return path
+
+
+def _table_counts(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return {table: conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+                for table in ('player', 'game', 'meeting', 'game_record', 'game_result')}
+
+
+class Client:
+    """keep-alive 연결 하나로 요청을 보냅니다. 연결 오류가 나면 다음 요청에서 다시 연결합니다."""
+
+    def __init__(self, url, timeout):
+        parsed = urllib.parse.urlsplit(url)
+        self.host, self.port = parsed.hostname, parsed.port or 80
+        self.prefix = parsed.path.rstrip('/')
+        self.timeout = timeout
+        self.conn = None
+
+    def request(self, method, path, body=None):
+        """(상태 코드, 본문 바이트, 응답 헤더)"""
+        if self.conn is None:
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        headers = {'Accept': 'application/json'}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+        try:
+            self.conn.request(method, self.prefix + path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+        except Exception:
+            self.close()
+            raise
+        if response.will_close:
+            self.close()
+        return response.status, data, response.headers
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def _wait_for_server(url, process=None):
+    deadline = time.time() + SERVER_START_TIMEOUT
+    client = Client(url, timeout=5)
+    while time.time() < deadline:
+        if process is not None and not process.is_alive():
+            raise RuntimeError('서버 프로세스가 종료되었습니다.')
+        try:
+            status, _, _ = client.request('GET', '/api/games')
+            if status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f'{SERVER_START_TIMEOUT}초 안에 서버가 응답하지 않습니다: {url}')
+
+
+def fetch_ids(url):
+    """요청 경로와 본문에 쓸 플레이어/게임/모임 ID (모임은 최근 MEETING_PAGES 페이지)"""
+    client = Client(url, timeout=60)
+    try:
+        ids = {}
+        for key, path in (('players', '/api/players'), ('games', '/api/games')):
+            status, data, _ = client.request('GET', path)
+            if status != 200:
+                raise RuntimeError(f'{path} 응답 {status}')
+            ids[key] = [item['id'] for item in json.loads(data)]
+        ids['meetings'] = []
+        path = '/api/meetings'
+        for _ in range(MEETING_PAGES):
+            status, data, headers = client.request('GET', path)
+            if status != 200:
+                raise RuntimeError(f'{path} 응답 {status}')
+            ids['meetings'].extend(item['id'] for item in json.loads(data))
+            cursor = headers.get('X-Next-Cursor')
+            if not cursor:
+                break
+            path = '/api/meetings?' + urllib.parse.urlencode({'cursor': cursor})
+    finally:
+        client.close()
+    if not ids['players'] or not ids['games'] or not ids['meetings']:
+        raise RuntimeError('플레이어, 게임, 모임이 하나 이상 있어야 합니다.')
+    return ids
+
+
+def _error_kind(status, body):
+    if status < 400:
+        return None
+    if status >= 500 and b'database is locked' in body:
+        return 'locked'
+    return '5xx' if status >= 500 else '4xx'
+
+
+def worker(url, ids, weights, seed, start_at, measure_from, deadline, timeout, samples):
+    rng = random.Random(seed)
+    requests = {name: (method, path, body) for name, _, method, path, body in MIX}
+    names = [name for name in weights if weights[name] > 0]
+    cum_weights = []
+    total = 0
+    for name in names:
+        total += weights[name]
+        cum_weights.append(total)
+    client = Client(url, timeout)
+    time.sleep(max(0.0, start_at - time.time()))
+    while True:
+        name = rng.choices(names, cum_weights=cum_weights)[0]
+        method, path, make_body = requests[name]
+        target = {'player_id': rng.choice(ids['players']), 'game_id': rng.choice(ids['games']),
+                  'meeting_id': rng.choice(ids['meetings'])}
+        path = path.format(**target)
+        body = make_body(rng, ids, target) if make_body else None
+        started_at = time.time()
+        if started_at >= deadline:
+            break
+        started = time.perf_counter()
+        try:
+            status, data, _ = client.request(method, path, body)
+            error = _error_kind(status, data)
+        except socket.timeout:
+            status, error = None, 'timeout'
+        except OSError:
+            status, error = None, 'connection'
+        elapsed = time.perf_counter() - started
+        if started_at >= measure_from:
+            samples.append((name, elapsed, status, error))
+    client.close()
+
+
+def _percentiles(values):
+    if not values:
+        return {'p50': None, 'p95': None, 'p99': None, 'max': None}
+    values = sorted(values)
+
+    def pick(q):
+        return round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 2)
+
+    return {'p50': pick(0.50), 'p95': pick(0.95), 'p99': pick(0.99), 'max': round(values[-1] * 1000, 2)}
+
+
+def summarize(samples, duration):
+    def stats(rows):
+        errors = {}
+        for row in rows:
+            if row[3]:
+                errors[row[3]] = errors.get(row[3], 0) + 1
+        ok = [row[1] for row in rows if row[3] is None]
+        return {
+            'requests': len(rows),
+            'per_second': round(len(ok) / duration, 1),
+            'error_rate': round(sum(errors.values()) / len(rows), 4) if rows else 0.0,
+            'errors': errors,
+            'latency_ms': _percentiles(ok),
+        }
+
+    methods = {name: method for name, _, method, _, _ in MIX}
+    return {
+        'total': stats(samples),
+        'reads': stats([row for row in samples if methods[row[0]] == 'GET']),
+        'writes': stats([row for row in samples if methods[row[0]] != 'GET']),
+        'requests': {name: stats([row for row in samples if row[0] == name])
+                     for name, _, _, _, _ in MIX if any(row[0] == name for row in samples)},
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(args, urls):
+    """클라이언트 i 는 urls[i % len(urls)] 에 요청합니다."""
+    ids = fetch_ids(urls[0])
+    weights = mix_weights(args.write_ratio, args.mix)
+    samples = []
+    start_at = time.time() + 0.5
+    measure_from = start_at + args.warmup
+    deadline = measure_from + args.duration
+    threads = [
+        threading.Thread(target=worker, daemon=True, args=(
+            urls[i % len(urls)], ids, weights, args.seed + i, start_at, measure_from, deadline, args.timeout, samples
+        ))
+        for i in range(args.concurrency)
+    ]
+    print(f"부하 실행 중... (동시 {args.concurrency}, 예열 {args.warmup}초, 측정 {args.duration}초)", file=sys.stderr)
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return weights, summarize(samples, args.duration)
+
+
+def print_report(report, previous=None):
+    header = f"{'request':<20}{'count':>8}{'ok/s':>9}{'err%':>7}{'locked':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"
+    print(header)
+    print('-' * len(header))
+    summary = report['summary']
+    rows = list(summary['requests'].items()) + [('(읽기)', summary['reads']), ('(쓰기)', summary['writes']),
+                                                ('(전체)', summary['total'])]
+    for name, stats in rows:
+        latency = stats['latency_ms']
+        print(f"{name:<20}{stats['requests']:>8}{stats['per_second']:>9}{stats['error_rate'] * 100:>7.2f}"
+              f"{stats['errors'].get('locked', 0):>8}{str(latency['p50']):>9}{str(latency['p95']):>9}"
+              f"{str(latency['p99']):>9}{str(latency['max']):>9}")
+    print('(시간 단위: ms)')
+
+    if previous:
+        print(f"\n이전 보고서 대비 ({previous.get('created_at')}, {previous.get('git_commit')}):")
+        before = dict(previous['summary']['requests'],
+                      **{'(읽기)': previous['summary']['reads'], '(쓰기)': previous['summary']['writes'],
+                         '(전체)': previous['summary']['total']})
+        for name, stats in rows:
+            old = before.get(name)
+            if not old:
+                continue
+            p99, old_p99 = stats['latency_ms']['p99'], old['latency_ms']['p99']
+            change = f"{(p99 - old_p99) / old_p99 * 100:+.0f}%" if p99 and old_p99 else '-'
+            print(f"  {name:<20} ok/s {old['per_second']} -> {stats['per_second']}, "
+                  f"p99 {old_p99} -> {p99} ({change}), 오류율 {old['error_rate']} -> {stats['error_rate']}")
+
+
+def _parse_mix(value):
+    overrides = {}
+    for item in filter(None, (value or '').split(',')):
+        name, _, weight = item.partition('=')
+        overrides[name.strip()] = float(weight)
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTTP 부하 테스트')
+    parser.add_argument('--url', help='이미 실행 중인 서버 주소 (없으면 합성 DB로 서버를 띄웁니다)')
+    parser.add_argument('--concurrency', type=int, default=8, help='동시에 요청하는 클라이언트 수')
+    parser.add_argument('--duration', type=float, default=30.0, help='측정 시간 (초)')
+    parser.add_argument('--warmup', type=float, default=5.0, help='집계하지 않는 시작 시간 (초)')
+    parser.add_argument('--write-ratio', type=float, help='쓰기 요청 비율 (기본은 MIX 가중치 그대로, 0.1)')
+    parser.add_argument('--mix', type=_parse_mix, help='요청별 가중치 변경 (예: stats=40,players=5)')
+    parser.add_argument('--timeout', type=float, default=30.0, help='요청 타임아웃 (초)')
+    parser.add_argument('--results', type=int, default=100_000, help='서버를 띄울 때 합성 DB의 게임 결과 행 수')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--data-dir', help='생성한 합성 DB를 보관/재사용할 디렉터리 (없으면 임시 디렉터리)')
+    parser.add_argument('--server-processes', type=int, default=1, help='서버 프로세스 수 (각각 스레드 서버)')
+    parser.add_argument('--output', help='보고서 JSON 경로 (기본 load-report-<시각>.json)')
+    parser.add_argument('--compare', help='비교할 이전 보고서 JSON')
+    args = parser.parse_args()
+    try:
+        mix_weights(args.write_ratio, args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    created_at = datetime.datetime.now()
+    report = {
+        'created_at': created_at.isoformat(timespec='seconds'),
+        'git_commit': _git_commit(),
+        'environment': {'python': platform.python_version(), 'sqlite': sqlite3.sqlite_version,
+                        'cpus': os.cpu_count()},
+        'args': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+    }
+
+    if args.url:
+        _wait_for_server(args.url)
+        report['weights'], report['summary'] = run(args, [args.url])
+    else:
+        data_dir = args.data_dir or tempfile.mkdtemp(prefix='seed-data-')
+        os.makedirs(data_dir, exist_ok=True)
+        directory = tempfile.mkdtemp(prefix='load-test-')
+        servers = []
+        try:
+            db_path = os.path.join(directory, 'load.db')
+            _copy(_dataset(args.results, args.seed, data_dir), db_path)
+            report['tables'] = _table_counts(db_path)
+            context = multiprocessing.get_context('spawn')
+            urls = []
+            for _ in range(args.server_processes):
+                port = _free_port()
+                server = context.Process(target=_serve, args=(db_path, directory, port), daemon=True)
+                server.start()
+                servers.append(server)
+                urls.append(f'http://127.0.0.1:{port}')
+            for url, server in zip(urls, servers):
+                _wait_for_server(url, server)
+            report['weights'], report['summary'] = run(args, urls)
+        finally:
+            for server in servers:
+                server.terminate()
+                server.join()
+            shutil.rmtree(directory, ignore_errors=True)
+            if not args.data_dir:
+                shutil.rmtree(data_dir, ignore_errors=True)
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    print_report(report, previous)
+
+    output = args.output or f"load-report-{created_at.strftime('%Y%m%d-%H%M%S')}.json"
+    with open(output, 'w') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"보고서 저장: {output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
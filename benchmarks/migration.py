@@ -0,0 +1,228 @@
+"""
+마이그레이션 벤치마크
+
+이전 스키마(meeting.host_id 없음, YY-MM-DD 날짜, 중복 참가 기록, 인덱스 없음)로 만든 합성 DB에
+migrations.py 를 청크 크기별로 실행하여 dry run 예상 시간과 실제 시간, 동시에 실행한 쓰기 요청의
+대기 시간(마이그레이션이 쓰기를 막는 시간)을 비교합니다. 청크 크기 0은 테이블 전체를 한 트랜잭션으로,
+청크 사이 대기 없이 처리합니다.
+
+    python benchmarks/migration.py --results 1000000 --chunk-sizes 0,20000,5000 --pause-ms 20
+    python benchmarks/migration.py --results 100000 --json migration.json
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+RESULTS_PER_RECORD = 4
+LEGACY_DATE_RATIO = 0.2
+WRITE_INTERVAL = 0.01  # 초
+
+# host_id 와 인덱스가 없던 때의 스키마
+LEGACY_SCHEMA = '''
+CREATE TABLE player (
+    id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, birth_year INTEGER, mbti VARCHAR(4), location VARCHAR(100)
+);
+CREATE TABLE game (id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, description VARCHAR(500));
+CREATE TABLE meeting (
+    id INTEGER PRIMARY KEY, date DATE NOT NULL, location VARCHAR(200) NOT NULL, description TEXT, created_at DATETIME
+);
+CREATE TABLE game_record (
+    id INTEGER PRIMARY KEY, meeting_id INTEGER REFERENCES meeting (id), game_id INTEGER NOT NULL REFERENCES game (id),
+    date DATE NOT NULL
+);
+CREATE TABLE game_result (
+    id INTEGER PRIMARY KEY, game_record_id INTEGER NOT NULL REFERENCES game_record (id),
+    player_id INTEGER REFERENCES player (id), player_name VARCHAR(100), score INTEGER, is_winner BOOLEAN
+);
+CREATE TABLE meeting_participant (
+    id INTEGER PRIMARY KEY, meeting_id INTEGER NOT NULL, player_id INTEGER NOT NULL,
+    arrival_time TIME NOT NULL DEFAULT '00:00', status VARCHAR(20) NOT NULL DEFAULT 'confirmed', created_at DATETIME
+);
+'''
+
+
+def _date(rng):
+    year, month, day = rng.randint(2019, 2024), rng.randint(1, 12), rng.randint(1, 28)
+    if rng.random() < LEGACY_DATE_RATIO:
+        return f'{year % 100:02d}-{month:02d}-{day:02d}'
+    return f'{year}-{month:02d}-{day:02d}'
+
+
+def build_legacy_db(path, results, players=200, games=50, meetings=2000, seed=42):
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.executescript(LEGACY_SCHEMA)
+    conn.executemany('INSERT INTO player (id, name) VALUES (?, ?)', [(i, f'플레이어{i}') for i in range(1, players + 1)])
+    conn.executemany('INSERT INTO game (id, name) VALUES (?, ?)', [(i, f'게임{i}') for i in range(1, games + 1)])
+    conn.executemany('INSERT INTO meeting (id, date, location) VALUES (?, ?, ?)',
+                     [(i, _date(rng), f'장소{i % 20}') for i in range(1, meetings + 1)])
+    participants = []
+    for meeting_id in range(1, meetings + 1):
+        for player_id in rng.sample(range(1, players + 1), 6):
+            participants.append((meeting_id, player_id))
+            if rng.random() < 0.05:
+                participants.append((meeting_id, player_id))  # 중복 참가
+    conn.executemany('INSERT INTO meeting_participant (meeting_id, player_id) VALUES (?, ?)', participants)
+
+    record_count = results // RESULTS_PER_RECORD
+    records = ((i, rng.randint(1, meetings) if rng.random() < 0.7 else None, rng.randint(1, games), _date(rng))
+               for i in range(1, record_count + 1))
+    conn.executemany('INSERT INTO game_record (id, meeting_id, game_id, date) VALUES (?, ?, ?, ?)', records)
+
+    def result_rows():
+        for record_id in range(1, record_count + 1):
+            for i, player_id in enumerate(rng.sample(range(1, players + 1), RESULTS_PER_RECORD)):
+                yield record_id, player_id, rng.randint(0, 100), i == 0
+    conn.executemany(
+        'INSERT INTO game_result (game_record_id, player_id, score, is_winner) VALUES (?, ?, ?, ?)', result_rows()
+    )
+    conn.commit()
+    conn.close()
+    return record_count
+
+
+class Writer(threading.Thread):
+    """마이그레이션 중 앱처럼 짧은 쓰기 트랜잭션을 반복하고 각 트랜잭션의 시간을 기록합니다."""
+
+    def __init__(self, path):
+        super().__init__(daemon=True)
+        self.path = path
+        self.latencies = []
+        self.errors = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        conn = sqlite3.connect(self.path, isolation_level=None, timeout=60)
+        rng = random.Random(7)
+        while not self.stopped.is_set():
+            started = time.perf_counter()
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                record_id = conn.execute(
+                    'INSERT INTO game_record (game_id, date) VALUES (?, ?)', (rng.randint(1, 50), '2025-01-01')
+                ).lastrowid
+                # 현재 앱처럼 record_date 컬럼이 생긴 뒤에는 기록 날짜도 저장합니다 (10단계 이후 NOT NULL)
+                columns = {row[1] for row in conn.execute('PRAGMA table_info(game_result)')}
+                if 'record_date' in columns:
+                    conn.executemany(
+                        'INSERT INTO game_result (game_record_id, player_id, score, is_winner, record_date) '
+                        'VALUES (?, ?, ?, ?, ?)',
+                        [(record_id, player_id, 0, False, '2025-01-01') for player_id in rng.sample(range(1, 201), 3)]
+                    )
+                else:
+                    conn.executemany(
+                        'INSERT INTO game_result (game_record_id, player_id, score, is_winner) VALUES (?, ?, ?, ?)',
+                        [(record_id, player_id, 0, False) for player_id in rng.sample(range(1, 201), 3)]
+                    )
+                conn.execute('COMMIT')
+                self.latencies.append(time.perf_counter() - started)
+            except sqlite3.OperationalError:
+                self.errors += 1
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+            time.sleep(WRITE_INTERVAL)
+        conn.close()
+
+
+def _percentiles(values):
+    if not values:
+        return {'p50': None, 'p99': None, 'max': None}
+    values = sorted(values)
+    return {
+        'p50': round(values[len(values) // 2] * 1000, 1),
+        'p99': round(values[min(len(values) - 1, int(0.99 * len(values)))] * 1000, 1),
+        'max': round(values[-1] * 1000, 1),
+    }
+
+
+def run(legacy_path, chunk_size, pause, directory, record_count, verbose):
+    import migrations
+    path = os.path.join(directory, f'chunk-{chunk_size}.db')
+    shutil.copy(legacy_path, path)
+    for suffix in ('-wal', '-shm'):
+        if os.path.exists(legacy_path + suffix):
+            shutil.copy(legacy_path + suffix, path + suffix)
+    # 0 은 테이블 전체를 한 청크로
+    size = chunk_size or record_count * RESULTS_PER_RECORD + 1
+    report = print if verbose else (lambda message: None)
+
+    estimates = {name: seconds for _, name, seconds in migrations.migrate(
+        path, dry_run=True, chunk_size=size, pause=pause, report=report
+    )}
+
+    writer = Writer(path)
+    writer.start()
+    time.sleep(0.2)
+    started = time.perf_counter()
+    actual = migrations.migrate(path, chunk_size=size, pause=pause, report=report)
+    total = time.perf_counter() - started
+    writer.stopped.set()
+    writer.join()
+    os.remove(path)
+
+    return {
+        'chunk_size': chunk_size,
+        'pause_ms': int(pause * 1000),
+        'total_seconds': round(total, 2),
+        'steps': [{'name': name, 'estimated_seconds': round(estimates.get(name, 0.0), 2), 'seconds': round(seconds, 2)}
+                  for _, name, seconds in actual],
+        'writes': len(writer.latencies),
+        'write_errors': writer.errors,
+        'write_latency_ms': _percentiles(writer.latencies),
+    }
+
+
+def print_report(reports):
+    for report in reports:
+        label = report['chunk_size'] or '전체'
+        latency = report['write_latency_ms']
+        print(f"청크 {label} (대기 {report['pause_ms']}ms): 총 {report['total_seconds']}초, 동시 쓰기 {report['writes']}건 "
+              f"(오류 {report['write_errors']}), 쓰기 p50 {latency['p50']}ms p99 {latency['p99']}ms 최대 {latency['max']}ms")
+        for step in report['steps']:
+            print(f"    {step['name']:<32} 예상 {step['estimated_seconds']:>7}초  실제 {step['seconds']:>7}초")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='마이그레이션 벤치마크')
+    parser.add_argument('--results', type=int, default=1_000_000, help='게임 결과 행 수')
+    parser.add_argument('--chunk-sizes', default='0,20000,5000', help='쉼표로 구분한 청크 크기 (0 = 한 트랜잭션)')
+    parser.add_argument('--pause-ms', type=int, default=20, help='청크/인덱스 사이 대기 시간 (한 트랜잭션 실행에는 적용하지 않음)')
+    parser.add_argument('--verbose', action='store_true', help='마이그레이션 진행 상황 출력')
+    parser.add_argument('--json', help='결과를 JSON 파일로 저장할 경로')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='migration-')
+    try:
+        legacy_path = os.path.join(directory, 'legacy.db')
+        started = time.perf_counter()
+        record_count = build_legacy_db(legacy_path, args.results)
+        print(f"이전 스키마 DB 생성: 결과 {args.results}행, 기록 {record_count}행 "
+              f"({time.perf_counter() - started:.1f}초)", file=sys.stderr)
+
+        reports = []
+        for chunk_size in (int(value) for value in args.chunk_sizes.split(',')):
+            print(f"[청크 {chunk_size or '전체'}] 실행 중...", file=sys.stderr)
+            pause = args.pause_ms / 1000 if chunk_size else 0.0
+            reports.append(run(legacy_path, chunk_size, pause, directory, record_count, args.verbose))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print_report(reports)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'reports': reports}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+"""
+SQLite 쓰기 경합 벤치마크
+
+읽기 프로세스(/api/stats, /api/meetings, 기록 내보내기)와 쓰기 프로세스(POST /api/game-records)를
+같은 DB 파일에 동시에 실행하고, 저널 설정별 처리량과 지연 시간, 잠금 대기 시간, 잠금 오류 수를 비교합니다.
+
+    python benchmarks/sqlite_contention.py --readers 4 --writers 2 --duration 10
+    python benchmarks/sqlite_contention.py --profiles rollback,wal --json contention.json
+
+프로필:
+    rollback - 기존 설정 (롤백 저널, pysqlite 기본 5초 타임아웃)
+    wal      - config.Config.SQLITE_PRAGMAS (WAL, busy_timeout, 체크포인트 설정)
+
+잠금 대기 시간은 쓰기 요청마다 첫 INSERT 문 실행 시간(쓰기 잠금 획득)과 COMMIT 시간의 합입니다.
+"""
+import argparse
+import datetime
+import json
+import logging
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PROFILES = {
+    'rollback': {'journal_mode': 'DELETE'},
+    'wal': None,  # config.Config.SQLITE_PRAGMAS
+}
+
+READ_PATHS = ['/api/stats', '/api/meetings', '/api/export/game-records']
+READ_WEIGHTS = [5, 4, 1]
+STARTUP_SECONDS = 2.0
+
+
+def _app_config(db_path, pragmas):
+    from config import Config
+    return {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'SQLITE_PRAGMAS': Config.SQLITE_PRAGMAS if pragmas is None else pragmas,
+        'CREATE_SCHEMA': True,
+        'DEBUG': False,
+        'LOG_LEVEL': 'WARNING',
+        'LOG_ASYNC': False,
+        'LOG_ACCESS': False,
+    }
+
+
+def _random_record(rng, players, games, meetings):
+    return {
+        'game_id': rng.randint(1, games),
+        'meeting_id': rng.choice([None] + list(range(1, meetings + 1))),
+        'date': f'2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+        'results': [
+            {'player_id': player_id, 'score': rng.randint(0, 100), 'is_winner': i == 0}
+            for i, player_id in enumerate(rng.sample(range(1, players + 1), rng.randint(2, 5)))
+        ],
+    }
+
+
+def _import_create_app():
+    # app 모듈을 가져올 때 만들어지는 기본 앱은 메모리 DB(testing 프로필)를 쓰게 하여
+    # 벤치마크 DB에 다른 저널 설정의 연결이 남지 않도록 합니다
+    os.environ['APP_ENV'] = 'testing'
+    from app import create_app
+    return create_app
+
+
+def seed(db_path, pragmas, players, games, meetings, records):
+    create_app = _import_create_app()
+    from models import db, Player, Game, Meeting
+    logging.disable(logging.CRITICAL)
+    app = create_app(_app_config(db_path, pragmas))
+    rng = random.Random(42)
+    with app.app_context():
+        db.session.add_all([Player(name=f'플레이어{i}') for i in range(players)])
+        db.session.add_all([Game(name=f'게임{i}') for i in range(games)])
+        db.session.flush()
+        db.session.add_all([Meeting(date=datetime.date(2024, 1, 1), location=f'장소{i}', host_id=1)
+                            for i in range(meetings)])
+        db.session.commit()
+        db.engine.dispose()
+    client = app.test_client()
+    for start in range(0, records, 500):
+        batch = [_random_record(rng, players, games, meetings) for _ in range(min(500, records - start))]
+        response = client.post('/api/game-records/batch', json={'records': batch})
+        assert response.status_code == 201, response.get_data(as_text=True)
+    with app.app_context():
+        db.engine.dispose()
+
+
+def _install_lock_timer(engine, state):
+    # 요청마다 첫 INSERT 문 실행 시간과 COMMIT 시간을 잠금 대기 시간으로 누적합니다
+    from sqlalchemy import event
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before(conn, cursor, statement, parameters, context, executemany):
+        if not state['wrote'] and statement.lstrip().upper().startswith('INSERT'):
+            state['insert_started'] = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after(conn, cursor, statement, parameters, context, executemany):
+        if state.get('insert_started') is not None:
+            state['lock_wait'] += time.perf_counter() - state.pop('insert_started')
+            state['wrote'] = True
+
+    @event.listens_for(engine, 'commit')
+    def before_commit(conn):
+        state['commit_started'] = time.perf_counter()
+
+    @event.listens_for(engine, 'rollback')
+    def before_rollback(conn):
+        state.pop('commit_started', None)
+
+    return state
+
+
+def worker(kind, db_path, pragmas, start_at, deadline, seed_value, players, games, meetings, results):
+    create_app = _import_create_app()
+    from models import db
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+    logging.disable(logging.CRITICAL)
+    app = create_app(dict(_app_config(db_path, pragmas), CREATE_SCHEMA=False))
+    client = app.test_client()
+    rng = random.Random(seed_value)
+    samples = []
+    state = {'wrote': False, 'lock_wait': 0.0}
+
+    if kind == 'write':
+        with app.app_context():
+            _install_lock_timer(db.engine, state)
+
+        @event.listens_for(Session, 'after_commit')
+        def after_commit(session):
+            started = state.pop('commit_started', None)
+            if started is not None:
+                state['lock_wait'] += time.perf_counter() - started
+
+    # 모든 프로세스가 앱을 만든 뒤 같은 시각에 시작합니다
+    time.sleep(max(0.0, start_at - time.time()))
+    while time.time() < deadline:
+        state['wrote'] = False
+        state['lock_wait'] = 0.0
+        started = time.perf_counter()
+        try:
+            if kind == 'write':
+                response = client.post('/api/game-records', json=_random_record(rng, players, games, meetings))
+                ok = response.status_code == 201
+            else:
+                path = rng.choices(READ_PATHS, READ_WEIGHTS)[0]
+                response = client.get(path)
+                response.get_data()  # 스트리밍 응답까지 모두 읽기
+                ok = response.status_code == 200
+            locked = not ok and 'locked' in response.get_data(as_text=True)
+        except Exception as e:  # 앱 밖으로 나온 잠금 오류
+            ok = False
+            locked = 'locked' in str(e)
+        samples.append((kind, time.perf_counter() - started, ok, locked, state['lock_wait']))
+    results.put(samples)
+
+
+def _percentiles(values):
+    if not values:
+        return {'p50': None, 'p95': None, 'p99': None}
+    values = sorted(values)
+
+    def pick(q):
+        return round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 2)
+
+    return {'p50': pick(0.50), 'p95': pick(0.95), 'p99': pick(0.99)}
+
+
+def run_profile(name, args):
+    pragmas = PROFILES[name]
+    directory = tempfile.mkdtemp(prefix='contention-')
+    db_path = os.path.join(directory, 'bench.db')
+    try:
+        seed(db_path, pragmas, args.players, args.games, args.meetings, args.records)
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        # 프로세스 시작(앱 생성) 시간을 측정에서 제외하도록 시작 시각을 늦춥니다
+        start_at = time.time() + STARTUP_SECONDS
+        deadline = start_at + args.duration
+        processes = [
+            context.Process(target=worker, args=(
+                kind, db_path, pragmas, start_at, deadline, i, args.players, args.games, args.meetings, results
+            ))
+            for i, kind in enumerate(['read'] * args.readers + ['write'] * args.writers)
+        ]
+        for process in processes:
+            process.start()
+        samples = []
+        for _ in processes:
+            samples.extend(results.get())
+        for process in processes:
+            process.join()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    report = {'profile': name, 'pragmas': pragmas}
+    for kind in ('read', 'write'):
+        rows = [s for s in samples if s[0] == kind]
+        report[kind] = {
+            'requests': len(rows),
+            'per_second': round(sum(1 for s in rows if s[2]) / args.duration, 1),
+            'errors': sum(1 for s in rows if not s[2]),
+            'lock_errors': sum(1 for s in rows if s[3]),
+            'latency_ms': _percentiles([s[1] for s in rows if s[2]]),
+        }
+        if kind == 'write':
+            report[kind]['lock_wait_ms'] = _percentiles([s[4] for s in rows if s[2]])
+    return report
+
+
+def print_report(reports):
+    header = f"{'profile':<10}{'kind':<7}{'ok/s':>8}{'errors':>8}{'locked':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'wait p95':>10}{'wait p99':>10}"
+    print(header)
+    print('-' * len(header))
+    for report in reports:
+        for kind in ('read', 'write'):
+            stats = report[kind]
+            latency = stats['latency_ms']
+            wait = stats.get('lock_wait_ms', {})
+            print(f"{report['profile']:<10}{kind:<7}{stats['per_second']:>8}{stats['errors']:>8}{stats['lock_errors']:>8}"
+                  f"{str(latency['p50']):>9}{str(latency['p95']):>9}{str(latency['p99']):>9}"
+                  f"{str(wait.get('p95', '')):>10}{str(wait.get('p99', '')):>10}")
+    print('(시간 단위: ms)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SQLite 쓰기 경합 벤치마크')
+    parser.add_argument('--profiles', default='rollback,wal', help='쉼표로 구분한 프로필 (rollback, wal)')
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=10.0, help='측정 시간 (초)')
+    parser.add_argument('--players', type=int, default=50)
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--meetings', type=int, default=30)
+    parser.add_argument('--records', type=int, default=5000, help='미리 넣을 게임 기록 수')
+    parser.add_argument('--json', help='결과를 JSON 파일로 저장할 경로')
+    args = parser.parse_args()
+
+    reports = []
+    for name in args.profiles.split(','):
+        if name not in PROFILES:
+            parser.error(f'알 수 없는 프로필: {name}')
+        print(f'[{name}] 실행 중... (읽기 {args.readers}, 쓰기 {args.writers}, {args.duration}초)', file=sys.stderr)
+        reports.append(run_profile(name, args))
+
+    print_report(reports)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'reports': reports}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,519 @@
+"""
+쿼리 계획 점검 도구 (EXPLAIN QUERY PLAN 기반 인덱스 진단)
+
+모든 엔드포인트를 테스트 클라이언트로 한 번씩 호출하면서 실행된 SQL을 엔진 이벤트로 모으고,
+각 SQL의 EXPLAIN QUERY PLAN 에서 전체 테이블 스캔, 임시 B-트리(정렬/그룹), 자동 인덱스를 찾아
+인덱스를 제안합니다. 제안한 인덱스는 롤백되는 트랜잭션 안에서 실제로 만들어 계획이 나아지는지 확인합니다.
+
+    python check_schema.py                          # 시드 데이터로 만든 임시 DB에서 점검
+    python check_schema.py --db instance/boardgame.db  # 운영 DB의 복사본에서 점검 (원본은 바꾸지 않음)
+    python check_schema.py --json plan-report.json  # 릴리스 간 비교용 JSON 보고서 저장
+    python check_schema.py --compare old-report.json   # 이전 보고서보다 새로 생긴 문제가 있으면 종료 코드 1
+    python check_schema.py --columns game_record    # 테이블 컬럼 출력
+
+JSON 보고서에는 실행 시간처럼 실행마다 달라지는 값을 넣지 않으므로 두 보고서를 그대로 diff 할 수 있습니다.
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import random
+import re
+import shutil
 import sqlite3
+import sys
+import tempfile
+from collections import OrderedDict
+
+# 데이터베이스 파일 경로
+DB_FILE = 'instance/boardgame.db'
+
+# 시드 데이터 크기
+FIXTURE_PLAYERS = 30
+FIXTURE_GAMES = 10
+FIXTURE_MEETINGS = 20
+FIXTURE_RECORDS = 300
+
+# 엔드포인트 호출 목록: (엔드포인트, 메서드, 경로, JSON 본문 또는 form 데이터)
+# 경로의 {player_id} 등은 DB에 있는 첫 번째 ID로, {new_player_id} 는 앞선 POST 가 만든 ID로 채웁니다.
+# 조회를 먼저, 변경을 나중에, 삭제를 마지막에 호출합니다.
+EXERCISES = [
+    ('index.home', 'GET', '/', None),
+    ('player.api_player_list', 'GET', '/api/players', None),
+    ('player.api_player_detail', 'GET', '/api/players/{player_id}', None),
+    ('player.api_player_detail', 'GET', '/api/players/{player_id}?game_id={game_id}&from=2024-03-01', None),
+    ('game.api_game_list', 'GET', '/api/games', None),
+    ('game.api_game_detail', 'GET', '/api/games/{game_id}', None),
+    ('game.game_list', 'GET', '/games', None),
+    ('game.game_detail', 'GET', '/games/{game_id}', None),
+    ('game.add_game', 'GET', '/games/add', None),
+    ('game.edit_game', 'GET', '/games/{game_id}/edit', None),
+    ('meeting.api_meeting_list', 'GET', '/api/meetings', None),
+    ('meeting.api_meeting_detail', 'GET', '/api/meetings/{meeting_id}', None),
+    ('index.get_stats', 'GET', '/api/stats', None),
+    ('index.get_stats', 'GET', '/api/stats?from=2024-02-10&to=2024-06-20', None),
+    ('index.get_player_stats', 'GET', '/api/stats/player/{player_id}', None),
+    ('index.get_player_stats', 'GET', '/api/stats/player/{player_id}?from=2024-02-10&to=2024-06-20', None),
+    ('index.get_player_ratings', 'GET', '/api/stats/player/{player_id}/ratings', None),
+    ('index.get_rating_leaderboard', 'GET', '/api/stats/ratings', None),
+    ('index.get_head_to_head', 'GET', '/api/stats/head-to-head/{player_id}', None),
+    ('index.get_player_stats_cache', 'GET', '/api/stats/player-cache', None),
+    ('index.get_analytics_stats', 'GET', '/api/stats/analytics', None),
+    ('game_record.api_export_game_records', 'GET', '/api/export/game-records', None),
+    ('game_record.add_game_record', 'GET', '/game_records/add', None),
+    ('player.api_add_player', 'POST', '/api/players', {'name': '점검용 플레이어'}),
+    ('player.api_edit_player', 'PUT', '/api/players/{new_player_id}', {'name': '점검용 플레이어2', 'birth_year': 90, 'mbti': 'INTP', 'location': '서울'}),
+    ('game.api_add_game', 'POST', '/api/games', {'name': '점검용 게임'}),
+    ('game.api_update_game', 'PUT', '/api/games/{new_game_id}', {'name': '점검용 게임2'}),
+    ('meeting.api_add_meeting', 'POST', '/api/meetings',
+     {'date': '2024-05-05', 'location': '점검', 'host_id': '{player_id}', 'planned_games': ['{game_id}']}),
+    ('meeting.api_add_participant', 'POST', '/api/meetings/{meeting_id}/participants',
+     {'player_id': '{player_id}', 'arrival_time': '19:00'}),
+    ('game_record.api_add_standalone_game_record', 'POST', '/api/game-records',
+     {'game_id': '{game_id}', 'date': '2024-05-05', 'results': [
+         {'player_id': '{player_id}', 'score': 10, 'is_winner': True},
+         {'player_id': '{new_player_id}', 'score': 5, 'is_winner': False},
+         {'player_name': '손님', 'score': 3, 'is_winner': False}]}),
+    ('game_record.api_add_meeting_game_record', 'POST', '/api/meetings/{meeting_id}/records',
+     {'game_id': '{game_id}', 'results': [
+         {'player_id': '{player_id}', 'score': 10, 'is_winner': True},
+         {'player_id': '{new_player_id}', 'score': 5, 'is_winner': False}]}),
+    ('game_record.api_add_game_records_batch', 'POST', '/api/game-records/batch',
+     {'records': [{'game_id': '{game_id}', 'date': '2024-06-01', 'results': [
+         {'player_id': '{player_id}', 'score': 1, 'is_winner': True},
+         {'player_id': '{new_player_id}', 'score': 0, 'is_winner': False}]}]}),
+    ('game.edit_game', 'POST', '/games/{new_game_id}/edit', {'form': {'name': '점검용 게임3'}}),
+    ('player.api_delete_player', 'DELETE', '/api/players/{new_player_id}', None),
+    ('game.delete_game', 'POST', '/games/{new_game_id}/delete', {'form': {}}),
+]
+
+# 점검하지 않는 엔드포인트 (SQL 없음)
+SKIPPED_ENDPOINTS = {'static', 'options_handler', 'metrics'}
+
+EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH')
+RANGE_OPERATORS = ('>', '<', '>=', '<=', 'BETWEEN', 'LIKE')
 
-def check_schema():
-    conn = sqlite3.connect('instance/boardgame.db')
-    cursor = conn.cursor()
-    
-    # game_record 테이블의 컬럼 정보 확인
-    cursor.execute("PRAGMA table_info(game_record)")
-    columns = cursor.fetchall()
-    
-    print("game_record 테이블 컬럼:")
+
+def print_columns(db_path, table):
+    conn = sqlite3.connect(db_path)
+    try:
+        columns = conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+    finally:
+        conn.close()
+    print(f"{table} 테이블 컬럼:")
     for col in columns:
         print(f"- {col[1]} ({col[2]})")
-    
+
+
+def _create_app(db_path):
+    os.environ.setdefault('APP_ENV', 'testing')
+    from app import create_app
+    logging.disable(logging.CRITICAL)
+    return create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        # 분석 스냅샷도 임시 디렉터리에 만들어 실행마다 같은 SQL이 나오게 합니다
+        'ANALYTICS_SNAPSHOT_DIR': os.path.join(os.path.dirname(db_path), 'analytics'),
+        'LOG_ASYNC': False,
+        'LOG_ACCESS': False,
+        'DEBUG': False,
+        'TESTING': False,
+    })
+
+
+def build_fixture(app, seed=42):
+    """점검용 시드 데이터를 넣습니다. 기록은 배치 API로 넣어 롤업 테이블도 함께 채웁니다."""
+    from models import db, Player, Game, Meeting, MeetingParticipant
+    rng = random.Random(seed)
+    with app.app_context():
+        db.session.add_all([Player(name=f'플레이어{i}') for i in range(FIXTURE_PLAYERS)])
+        db.session.add_all([Game(name=f'게임{i}') for i in range(FIXTURE_GAMES)])
+        db.session.flush()
+        for i in range(FIXTURE_MEETINGS):
+            meeting = Meeting(date=datetime.date(2024, i % 12 + 1, i % 28 + 1), location=f'장소{i}', host_id=1)
+            db.session.add(meeting)
+            db.session.flush()
+            for player_id in rng.sample(range(1, FIXTURE_PLAYERS + 1), 5):
+                db.session.add(MeetingParticipant(meeting_id=meeting.id, player_id=player_id))
+        db.session.commit()
+
+    client = app.test_client()
+    records = [{
+        'game_id': rng.randint(1, FIXTURE_GAMES),
+        'meeting_id': rng.choice([None, rng.randint(1, FIXTURE_MEETINGS)]),
+        'date': f'2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+        'results': [{'player_id': player_id, 'score': rng.randint(0, 100), 'is_winner': i == 0}
+                    for i, player_id in enumerate(rng.sample(range(1, FIXTURE_PLAYERS + 1), rng.randint(2, 5)))]
+    } for _ in range(FIXTURE_RECORDS)]
+    response = client.post('/api/game-records/batch', json={'records': records})
+    assert response.status_code == 201, response.get_data(as_text=True)
+
+    # 통계가 없으면 비용이 같은 인덱스 중 스키마 순서(생성 순서)로 고르므로 실행마다 계획이 달라질 수 있습니다.
+    # 마이그레이션처럼 ANALYZE 를 실행해 둡니다
+    with app.app_context():
+        db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
+
+
+def first_ids(app):
+    """EXERCISES 의 {player_id}, {game_id}, {meeting_id} 자리에 넣을 DB의 첫 번째 ID"""
+    from models import db, Player, Game, Meeting
+    with app.app_context():
+        return {
+            'player_id': db.session.query(db.func.min(Player.id)).scalar(),
+            'game_id': db.session.query(db.func.min(Game.id)).scalar(),
+            'meeting_id': db.session.query(db.func.min(Meeting.id)).scalar(),
+        }
+
+
+def fill_ids(value, ids):
+    # 본문/경로의 {이름} 자리표시자를 ID로 바꿉니다. 값 전체가 자리표시자면 정수로 바꿉니다
+    if isinstance(value, str):
+        match = re.fullmatch(r'\{(\w+)\}', value)
+        if match:
+            return ids[match.group(1)]
+        return value.format(**ids)
+    if isinstance(value, list):
+        return [fill_ids(item, ids) for item in value]
+    if isinstance(value, dict):
+        return {key: fill_ids(item, ids) for key, item in value.items()}
+    return value
+
+
+def normalize_sql(statement):
+    """공백을 정리하고 IN (?, ?, ...) 목록을 하나로 합쳐 바인드 개수가 달라도 같은 SQL로 취급합니다."""
+    statement = ' '.join(statement.split())
+    return re.sub(r'\(\?(?:, \?)+\)', '(?, ...)', statement)
+
+
+def capture(app, exercises=EXERCISES):
+    """
+    엔드포인트를 차례로 호출하고 실행된 SQL을 모읍니다.
+    [{'endpoint', 'method', 'path', 'status', 'statements': {정규화 SQL: {'sql', 'params', 'count'}}}]
+    """
+    from models import db
+    from sqlalchemy import event
+
+    with app.app_context():
+        engine = db.engine
+    ids = first_ids(app)
+    current = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not current or not statement.lstrip().upper().startswith(EXPLAINABLE):
+            return
+        if executemany:
+            parameters = parameters[0] if parameters else ()
+        key = normalize_sql(statement)
+        entry = current[-1]['statements'].setdefault(key, {'sql': statement, 'params': parameters, 'count': 0})
+        entry['count'] += 1
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    client = app.test_client()
+    calls = []
+    try:
+        for endpoint, method, path, body in exercises:
+            try:
+                path = fill_ids(path, ids)
+                body = fill_ids(body, ids)
+            except KeyError as e:
+                calls.append({'endpoint': endpoint, 'method': method, 'path': path, 'status': None,
+                              'error': f'ID 없음: {e}', 'statements': {}})
+                continue
+            call = {'endpoint': endpoint, 'method': method, 'path': path, 'statements': OrderedDict()}
+            current.append(call)
+            kwargs = {'data': body['form']} if isinstance(body, dict) and 'form' in body else {'json': body}
+            try:
+                response = client.open(path, method=method, **kwargs)
+                response.get_data()
+                call['status'] = response.status_code
+                created = response.get_json(silent=True) if response.status_code == 201 else None
+                if isinstance(created, dict) and 'id' in created:
+                    ids['new_' + endpoint.split('.')[0] + '_id'] = created['id']
+            except Exception as e:  # 템플릿 없음 등. 그때까지 실행된 SQL은 점검합니다
+                call['status'] = None
+                call['error'] = f'{type(e).__name__}: {e}'
+            current.pop()
+            calls.append(call)
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    return calls
+
+
+def _aliases(sql):
+    """FROM/JOIN 의 별칭 -> 테이블 이름"""
+    aliases = {}
+    for table, alias in re.findall(r'\b(?:FROM|JOIN|UPDATE|INTO)\s+"?(\w+)"?(?:\s+AS\s+"?(\w+)"?)?', sql, re.I):
+        aliases[alias or table] = table
+    return aliases
+
+
+def _predicates(sql, alias):
+    """
+    alias 의 컬럼 중 바인드 값이나 상수와 비교하는 조건의 (같음 비교 컬럼, 범위 비교 컬럼).
+    다른 테이블 컬럼과의 조인 조건은 어느 쪽이 바깥 루프인지 알 수 없으므로 보지 않습니다.
+    """
+    where = re.split(r'\b(?:GROUP BY|ORDER BY|LIMIT)\b', sql, flags=re.I)[0]
+    equality, ranges = [], []
+    pattern = (rf'\b{re.escape(alias)}\.(\w+)\s*'
+               r"(?:(==|=|>=|<=|>|<|LIKE\b|IS\b)\s*(?=\?|'|-?\d|NULL\b|NOT\b)"
+               r"|(IN)\s*(?=\(\s*(?:\?|'|-?\d|SELECT\b))|(BETWEEN)\s+(?=\?))")
+    for match in re.finditer(pattern, where, re.I):
+        column = match.group(1)
+        operator = next(group for group in match.groups()[1:] if group).upper()
+        target = ranges if operator in RANGE_OPERATORS else equality
+        if column != 'id' and column not in equality and column not in target:
+            target.append(column)
+    return equality, [column for column in ranges if column not in equality]
+
+
+def _order_columns(sql, alias):
+    match = re.search(r'\bORDER BY\b(.*?)(?:\bLIMIT\b|$)', sql, re.I | re.S)
+    if not match:
+        return None
+    columns = []
+    for term in match.group(1).split(','):
+        found = re.match(rf'\s*{re.escape(alias)}\.(\w+)', term)
+        if not found:
+            return None  # 다른 테이블이나 식으로 정렬하면 인덱스로 정렬을 대신할 수 없습니다
+        columns.append(found.group(1))
+    return columns
+
+
+def explain(conn, sql, params):
+    return [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params or ())]
+
+
+def plan_issues(plan, aliases, tables, sql):
+    """
+    계획에서 문제 항목: [{'kind', 'alias', 'detail'}]
+    full_scan 은 조건이 있는데도 테이블 전체를 읽는 경우, full_read 는 조건 없이 전체를 읽는 쿼리(목록, 내보내기)입니다.
+    """
+    issues = []
+    for detail in plan:
+        scan = re.match(r'SCAN (\w+)(?: USING (COVERING )?INDEX)?', detail)
+        if scan and not scan.group(0).endswith('INDEX') and aliases.get(scan.group(1), scan.group(1)) in tables:
+            equality, ranges = _predicates(sql, scan.group(1))
+            kind = 'full_scan' if equality or ranges else 'full_read'
+            issues.append({'kind': kind, 'alias': scan.group(1), 'detail': detail})
+        elif 'USE TEMP B-TREE' in detail:
+            issues.append({'kind': 'temp_btree', 'alias': None, 'detail': detail})
+        elif 'AUTOMATIC' in detail:
+            issues.append({'kind': 'automatic_index', 'alias': None, 'detail': detail})
+    return issues
+
+
+def suggest(sql, issue, aliases):
+    """문제 항목에 대한 인덱스 제안 (table, columns) 또는 None"""
+    if issue['kind'] == 'full_scan':
+        alias = issue['alias']
+        equality, ranges = _predicates(sql, alias)
+        columns = equality + ranges[:1]
+        return (aliases.get(alias, alias), columns) if columns else None
+    if issue['kind'] == 'temp_btree' and 'ORDER BY' in issue['detail']:
+        # 한 테이블의 컬럼으로만 정렬하면 (같음 비교 컬럼 + 정렬 컬럼) 인덱스로 정렬을 없앨 수 있습니다
+        for alias, table in aliases.items():
+            order = _order_columns(sql, alias)
+            if order:
+                equality, _ = _predicates(sql, alias)
+                return table, equality + [column for column in order if column not in equality]
+    return None
+
+
+def _existing_index(conn, table, columns):
+    # INTEGER PRIMARY KEY 는 rowid 이므로 별도 인덱스가 필요 없습니다 (작은 테이블은 SQLite가 스캔을 고를 수 있음)
+    primary = [col for col in conn.execute(f'PRAGMA table_info("{table}")') if col[5]]
+    if len(primary) == 1 and primary[0][2].upper() == 'INTEGER' and columns[:1] == [primary[0][1]]:
+        return 'INTEGER PRIMARY KEY'
+    for row in conn.execute(f'PRAGMA index_list("{table}")'):
+        indexed = [info[2] for info in conn.execute(f'PRAGMA index_info("{row[1]}")')]
+        if indexed[:len(columns)] == columns:
+            return row[1]
+    return None
+
+
+def verify(conn, table, columns, sql, params, tables):
+    """제안 인덱스를 만든 상태의 계획 (트랜잭션은 롤백합니다)"""
+    conn.execute('BEGIN')
+    try:
+        conn.execute(f'CREATE INDEX "advisor_candidate" ON "{table}" ({", ".join(columns)})')
+        plan = explain(conn, sql, params)
+    finally:
+        conn.execute('ROLLBACK')
+    return plan, plan_issues(plan, _aliases(sql), tables, sql)
+
+
+def build_report(calls, db_path, app):
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    row_counts = {table: conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] for table in sorted(tables)}
+
+    endpoints = []
+    suggestions = OrderedDict()
+    for call in calls:
+        queries = []
+        # 스트리밍 응답은 문장 실행 순서가 실행마다 달라질 수 있어 정렬하여 보고서를 비교 가능하게 합니다
+        for key, entry in sorted(call['statements'].items()):
+            aliases = _aliases(entry['sql'])
+            try:
+                plan = explain(conn, entry['sql'], entry['params'])
+            except sqlite3.Error as e:
+                queries.append({'sql': key, 'count': entry['count'], 'error': str(e)})
+                continue
+            issues = plan_issues(plan, aliases, tables, entry['sql'])
+            for issue in issues:
+                candidate = suggest(entry['sql'], issue, aliases)
+                if not candidate:
+                    continue
+                table, columns = candidate
+                existing = _existing_index(conn, table, columns)
+                name = f"ix_{table}_{'_'.join(columns)}"
+                suggestion = suggestions.get(name)
+                if suggestion is None:
+                    suggestion = suggestions[name] = {
+                        'name': name, 'table': table, 'columns': columns,
+                        'sql': f'CREATE INDEX {name} ON {table} ({", ".join(columns)})',
+                        'existing_index': existing, 'resolves': [], 'endpoints': [],
+                    }
+                if not existing:
+                    _, remaining = verify(conn, table, columns, entry['sql'], entry['params'], tables)
+                    resolved = issue['detail'] not in [other['detail'] for other in remaining]
+                else:
+                    resolved = False  # 같은 인덱스가 이미 있는데도 플래너가 쓰지 않은 경우 (통계/선택도 문제)
+                issue['suggestion'] = name
+                if resolved:
+                    suggestion['resolves'].append({'endpoint': call['endpoint'], 'issue': issue['detail']})
+                if call['endpoint'] not in suggestion['endpoints']:
+                    suggestion['endpoints'].append(call['endpoint'])
+            queries.append({
+                'sql': key,
+                'count': entry['count'],
+                'plan': plan,
+                'issues': [{key: value for key, value in issue.items() if key != 'alias'} for issue in issues],
+            })
+        endpoints.append({
+            'endpoint': call['endpoint'],
+            'method': call['method'],
+            'path': call['path'],
+            'status': call['status'],
+            'error': call.get('error'),
+            'queries': queries,
+        })
     conn.close()
 
+    exercised = {call['endpoint'] for call in calls}
+    registered = sorted({rule.endpoint for rule in app.url_map.iter_rules()} - SKIPPED_ENDPOINTS)
+    issue_counts = {}
+    for endpoint in endpoints:
+        for query in endpoint['queries']:
+            for issue in query.get('issues', []):
+                issue_counts[issue['kind']] = issue_counts.get(issue['kind'], 0) + 1
+    return {
+        'tables': row_counts,
+        'summary': {
+            'endpoints': len(endpoints),
+            'statements': sum(len(endpoint['queries']) for endpoint in endpoints),
+            'issues': issue_counts,
+            'suggestions': sum(1 for suggestion in suggestions.values() if suggestion['resolves']),
+            'not_exercised': [endpoint for endpoint in registered if endpoint not in exercised],
+        },
+        'endpoints': endpoints,
+        'suggestions': list(suggestions.values()),
+    }
+
+
+def _issue_keys(report):
+    return {
+        (endpoint['endpoint'], endpoint['path'], query['sql'], issue['kind'], issue['detail'])
+        for endpoint in report['endpoints']
+        for query in endpoint['queries']
+        for issue in query.get('issues', [])
+    }
+
+
+def compare_reports(old, new):
+    """(새로 생긴 문제, 해결된 문제) 키 목록"""
+    old_keys, new_keys = _issue_keys(old), _issue_keys(new)
+    return sorted(new_keys - old_keys), sorted(old_keys - new_keys)
+
+
+def print_report(report, verbose=False):
+    for endpoint in report['endpoints']:
+        issues = [(query, issue) for query in endpoint['queries'] for issue in query.get('issues', [])]
+        status = endpoint['status'] if endpoint['status'] is not None else 'ERR'
+        scans = sum(1 for _, issue in issues if issue['kind'] == 'full_scan')
+        print(f"{endpoint['method']:<6} {endpoint['path']:<60} {status}  쿼리 {len(endpoint['queries'])}개  "
+              f"전체 스캔 {scans}개  기타 {len(issues) - scans}개")
+        for query, issue in issues:
+            if verbose or issue['kind'] == 'full_scan':
+                print(f"    [{issue['kind']}] {issue['detail']}")
+                print(f"        {query['sql'][:150]}")
+
+    print()
+    summary = report['summary']
+    print(f"엔드포인트 {summary['endpoints']}개, SQL {summary['statements']}개, 문제 {summary['issues']}")
+    if summary['not_exercised']:
+        print(f"호출하지 않은 엔드포인트: {', '.join(summary['not_exercised'])}")
+    for suggestion in report['suggestions']:
+        if suggestion['existing_index']:
+            print(f"[기존 인덱스 미사용] {suggestion['table']} ({', '.join(suggestion['columns'])}) "
+                  f"-> {suggestion['existing_index']}: {', '.join(suggestion['endpoints'])}")
+        elif suggestion['resolves']:
+            print(f"[제안] {suggestion['sql']};  -- {len(suggestion['resolves'])}건 해결: "
+                  f"{', '.join(suggestion['endpoints'])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='EXPLAIN QUERY PLAN 기반 인덱스 점검')
+    parser.add_argument('--db', help='점검할 SQLite DB (복사본에서 실행). 없으면 시드 데이터로 임시 DB를 만듭니다')
+    parser.add_argument('--json', help='JSON 보고서를 저장할 경로')
+    parser.add_argument('--compare', help='비교할 이전 JSON 보고서. 새로 생긴 문제가 있으면 종료 코드 1')
+    parser.add_argument('--columns', metavar='TABLE', help='테이블 컬럼만 출력')
+    parser.add_argument('--verbose', action='store_true', help='모든 문제 항목 출력')
+    args = parser.parse_args(argv)
+
+    if args.columns:
+        print_columns(args.db or DB_FILE, args.columns)
+        return 0
+
+    directory = tempfile.mkdtemp(prefix='check-schema-')
+    try:
+        db_path = os.path.join(directory, 'check.db')
+        if args.db:
+            source, target = sqlite3.connect(args.db), sqlite3.connect(db_path)
+            source.backup(target)
+            source.close()
+            target.close()
+        app = _create_app(db_path)
+        if not args.db:
+            build_fixture(app)
+        calls = capture(app)
+        with app.app_context():
+            from models import db
+            db.engine.dispose()
+        report = build_report(calls, db_path, app)
+        report['database'] = args.db or 'fixture'
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print_report(report, args.verbose)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+
+    if args.compare:
+        with open(args.compare) as f:
+            added, resolved = compare_reports(json.load(f), report)
+        print()
+        print(f"이전 보고서 대비: 새 문제 {len(added)}건, 해결 {len(resolved)}건")
+        for endpoint, path, sql, kind, detail in added:
+            print(f"  + {endpoint} {path} [{kind}] {detail}\n      {sql[:150]}")
+        for endpoint, path, sql, kind, detail in resolved:
+            print(f"  - {endpoint} {path} [{kind}] {detail}")
+        # 조건 없는 전체 읽기(full_read)는 실패로 보지 않습니다
+        return 1 if any(kind != 'full_read' for _, _, _, kind, _ in added) else 0
+    return 0
+
+
 if __name__ == "__main__":
-    check_schema() 
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,95 @@
+import os
+
+# 실행 환경별 설정
+# APP_ENV 환경 변수(development / production / testing)로 프로필을 선택합니다. 기본값은 development 입니다.
+# 운영 환경은 여러 워커 프로세스(gunicorn -w N)로 실행하는 것을 전제로 하며, 스키마는 워커가 아니라
+# 배포 시 `flask --app app init-db` 로 한 번만 만듭니다. 운영 환경은 SECRET_KEY 환경 변수가 없으면 시작하지 않습니다.
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+class Config:
+    # 개발/테스트용 기본값. 운영 프로필은 기본값 없이 환경 변수에서만 읽습니다
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'your-secret-key')
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///boardgame.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    # 연결마다 실행할 SQLite PRAGMA (이름: 값). SQLite 가 아니면 무시합니다.
+    # WAL 에서는 읽기가 쓰기를 막지 않고, 쓰기끼리의 잠금 충돌은 busy_timeout 동안 재시도합니다.
+    # 체크포인트는 WAL 이 wal_autocheckpoint 페이지를 넘을 때 커밋한 연결이 수행하며,
+    # journal_size_limit 로 체크포인트 후 WAL 파일 크기를 제한합니다.
+    # (벤치마크: python benchmarks/sqlite_contention.py)
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',      # WAL 에서는 NORMAL 로도 커밋된 데이터가 보존됩니다
+        'busy_timeout': _env_int('SQLITE_BUSY_TIMEOUT', 5000),
+        'wal_autocheckpoint': 1000,   # 페이지 (약 4MB)
+        'journal_size_limit': 64 * 1024 * 1024,
+    }
+    # 앱 생성 시 db.create_all() 실행 여부. 모듈을 가져오기만 해도 DB 파일이 생기지 않도록 메모리 DB를 쓰는 테스트에서만 켭니다
+    # (개발 서버는 python app.py 로 실행할 때, 그 밖에는 flask --app app init-db 로 만듭니다)
+    CREATE_SCHEMA = False
+
+    PLAYER_STATS_CACHE_SIZE = 1024
+    # ETag 를 붙이는 목록 API의 Cache-Control (http_cache.py). no-cache 는 저장은 하되 매번 If-None-Match 로 확인합니다
+    CACHE_CONTROL = 'private, no-cache'
+    # 응답 형식이 바뀌는 배포에서 값을 바꾸면 이전 ETag 가 모두 무효화됩니다
+    ETAG_VERSION = '1'
+    IDEMPOTENCY_TTL_SECONDS = 24 * 60 * 60
+    # 응답을 저장하지 못한 처리 중 예약을 재시도가 넘겨받기까지의 시간 (idempotency.py)
+    IDEMPOTENCY_LEASE_SECONDS = 60
+    QUERY_REPEAT_THRESHOLD = 5
+    # 레이팅 조회가 재계산이 필요함을 발견하면 백그라운드 스레드에서 재계산합니다 (ratings.py)
+    RATINGS_BACKGROUND_REPLAY = True
+    LOG_LEVEL = 'INFO'
+    LOG_ASYNC = True
+    LOG_ACCESS = True
+    LOG_SAMPLE_RATE = 0.01
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+
+
+class ProductionConfig(Config):
+    DEBUG = False
+    SECRET_KEY = os.environ.get('SECRET_KEY')
+    LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', 0.0))
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': _env_int('DB_POOL_SIZE', 5),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', 10),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': True,
+    }
+    SQLITE_PRAGMAS = dict(
+        Config.SQLITE_PRAGMAS,
+        cache_size=-64000,            # 64MB (음수는 KiB 단위)
+        mmap_size=256 * 1024 * 1024,
+    )
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    CREATE_SCHEMA = True
+    LOG_ASYNC = False
+    LOG_ACCESS = False
+    # 메모리 DB 는 스레드마다 다른 연결이므로 테스트에서는 재계산을 직접 실행합니다
+    RATINGS_BACKGROUND_REPLAY = False
+
+
+PROFILES = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+    'testing': TestingConfig,
+}
+
+
+def get_config(name=None):
+    """프로필 이름(없으면 APP_ENV)에 해당하는 설정 클래스를 반환합니다."""
+    name = name or os.environ.get('APP_ENV', 'development')
+    if name not in PROFILES:
+        raise ValueError(f'알 수 없는 실행 환경입니다: {name}')
+    return PROFILES[name]
@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from "react";
 import { useParams, Link, useNavigate } from "react-router-dom";
 import { playerApi, statsApi } from "../../services/api";
-import { Player } from "../../types";
+import { Player, PlayerGameHistory } from "../../types";
 import { Bar } from "react-chartjs-2";
 import {
   Chart as ChartJS,
@@ -44,6 +44,9 @@ const PlayerDetail: React.FC = () => {
   const navigate = useNavigate();
   const [player, setPlayer] = useState<Player | null>(null);
   const [playerStats, setPlayerStats] = useState<PlayerStats | null>(null);
+  const [history, setHistory] = useState<PlayerGameHistory[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | undefined>();
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -71,6 +74,8 @@ const PlayerDetail: React.FC = () => {
 
         setPlayer(playerData);
         setPlayerStats(statsData);
+        setHistory(playerData.game_history || []);
+        setNextCursor(playerData.next_cursor || undefined);
         setError(null);
       } catch (err) {
         console.error("Error fetching player details:", err);
@@ -83,6 +88,25 @@ const PlayerDetail: React.FC = () => {
     fetchData();
   }, [playerId]);
 
+  // 게임 히스토리 다음 페이지 불러오기 (next_cursor)
+  const handleLoadMore = async () => {
+    if (!player || !nextCursor) {
+      return;
+    }
+
+    try {
+      setLoadingMore(true);
+      const page = await playerApi.getHistoryPage(player.id, nextCursor);
+      setHistory((previous) => [...previous, ...page.history]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error("Error fetching player history:", err);
+      setError("게임 기록을 불러오는데 실패했습니다.");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleDelete = async () => {
     if (
       !player ||
@@ -341,6 +365,81 @@ const PlayerDetail: React.FC = () => {
               )}
             </div>
           </div>
+
+          <div className="card mb-4">
+            <div className="card-header">
+              <h4 className="mb-0">게임 기록</h4>
+            </div>
+            <div className="card-body">
+              {history.length > 0 ? (
+                <>
+                  <div className="table-responsive">
+                    <table className="table table-striped table-hover">
+                      <thead>
+                        <tr>
+                          <th>날짜</th>
+                          <th>게임명</th>
+                          <th>모임</th>
+                          <th>점수</th>
+                          <th>결과</th>
+                        </tr>
+                      </thead>
+                      <tbody>
+                        {history.map((record) => (
+                          <tr key={record.id}>
+                            <td>{record.date}</td>
+                            <td>
+                              <Link
+                                to={`/games/${record.game_id}`}
+                                className="text-decoration-none"
+                              >
+                                {record.game_name}
+                              </Link>
+                            </td>
+                            <td>
+                              {record.meeting_id ? (
+                                <Link
+                                  to={`/meetings/${record.meeting_id}`}
+                                  className="text-decoration-none"
+                                >
+                                  {record.meeting_location || record.meeting_date}
+                                </Link>
+                              ) : (
+                                "-"
+                              )}
+                            </td>
+                            <td>{record.score}</td>
+                            <td>
+                              {record.is_winner ? (
+                                <span className="badge bg-success">승리</span>
+                              ) : (
+                                <span className="badge bg-secondary">패배</span>
+                              )}
+                            </td>
+                          </tr>
+                        ))}
+                      </tbody>
+                    </table>
+                  </div>
+                  {nextCursor && (
+                    <div className="text-center">
+                      <button
+                        className="btn btn-outline-secondary"
+                        onClick={handleLoadMore}
+                        disabled={loadingMore}
+                      >
+                        {loadingMore ? "불러오는 중..." : "더 보기"}
+                      </button>
+                    </div>
+                  )}
+                </>
+              ) : (
+                <div className="alert alert-info">
+                  아직 게임 기록이 없습니다.
+                </div>
+              )}
+            </div>
+          </div>
         </div>
       </div>
     </div>
@@ -2,6 +2,7 @@ import axios from "axios";
 import {
   Player,
   PlayerForm,
+  PlayerGameHistory,
   Meeting,
   MeetingForm,
   Game,
@@ -70,6 +71,21 @@ export const playerApi = {
     return data;
   },
 
+  // 게임 히스토리 다음 페이지 (응답의 next_cursor 를 따라 조회)
+  getHistoryPage: async (
+    id: number,
+    cursor?: string,
+    limit?: number
+  ): Promise<{ history: PlayerGameHistory[]; nextCursor?: string }> => {
+    const { data } = await api.get(`/players/${id}`, {
+      params: { cursor, limit },
+    });
+    return {
+      history: data.game_history || [],
+      nextCursor: data.next_cursor || undefined,
+    };
+  },
+
   create: async (player: PlayerForm): Promise<Player> => {
     const { data } = await api.post("/players", player);
     return data;
@@ -87,9 +103,29 @@ export const playerApi = {
 
 // 미팅 API
 export const meetingApi = {
+  // 커서(X-Next-Cursor)를 따라 모든 페이지를 가져옴
   getAll: async (): Promise<Meeting[]> => {
-    const { data } = await api.get("/meetings");
-    return data;
+    const meetings: Meeting[] = [];
+    let cursor: string | undefined;
+    do {
+      const page = await meetingApi.getPage(cursor);
+      meetings.push(...page.meetings);
+      cursor = page.nextCursor;
+    } while (cursor);
+    return meetings;
+  },
+
+  getPage: async (
+    cursor?: string,
+    limit?: number
+  ): Promise<{ meetings: Meeting[]; nextCursor?: string }> => {
+    const response = await api.get("/meetings", {
+      params: { cursor, limit },
+    });
+    return {
+      meetings: response.data,
+      nextCursor: response.headers["x-next-cursor"] || undefined,
+    };
   },
 
   getById: async (id: number): Promise<MeetingDetail> => {
@@ -198,13 +234,24 @@ export const gameResultApi = {
 
 // 통계 API
 export const statsApi = {
-  getStats: async () => {
-    const response = await api.get("/stats");
+  // from/to (YYYY-MM-DD)를 주면 해당 기간의 통계
+  getStats: async (from?: string, to?: string) => {
+    const response = await api.get("/stats", { params: { from, to } });
+    return response.data;
+  },
+
+  getPlayerStats: async (playerId: number, from?: string, to?: string) => {
+    const response = await api.get(`/stats/player/${playerId}`, {
+      params: { from, to },
+    });
     return response.data;
   },
 
-  getPlayerStats: async (playerId: number) => {
-    const response = await api.get(`/stats/player/${playerId}`);
+  // 상대 전적 (opponentId 로 한 상대만, gameId 로 게임별)
+  getHeadToHead: async (playerId: number, opponentId?: number, gameId?: number) => {
+    const response = await api.get(`/stats/head-to-head/${playerId}`, {
+      params: { opponent_id: opponentId, game_id: gameId },
+    });
     return response.data;
   },
 };
@@ -219,6 +266,14 @@ export const gameRecordApi = {
     return data;
   },
 
+  // 여러 게임 기록을 한 번에 추가 (기록별 성공/오류 반환)
+  createBatch: async (records: any[]): Promise<any> => {
+    const { data } = await api.post(`/game-records/batch`, { records }, {
+      validateStatus: (status) => status === 201 || status === 207 || status === 400,
+    });
+    return data;
+  },
+
   getByMeetingId: async (meetingId: number): Promise<any> => {
     const { data } = await api.get(`/meetings/${meetingId}/records`);
     return data;
@@ -7,7 +7,22 @@ export interface Player {
   location: string;
   nickname?: string;
   comment?: string;
-  game_history?: GameResult[];
+  game_history?: PlayerGameHistory[];
+  next_cursor?: string | null;
+}
+
+// 플레이어 게임 히스토리 항목 (기록 날짜 최신순, next_cursor 로 다음 페이지 조회)
+export interface PlayerGameHistory {
+  id: number;
+  game_record_id: number;
+  date: string | null;
+  game_id: number;
+  game_name: string | null;
+  score: number;
+  is_winner: boolean;
+  meeting_id: number | null;
+  meeting_date: string | null;
+  meeting_location: string | null;
 }
 
 export interface PlayerForm {
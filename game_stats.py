@@ -0,0 +1,69 @@
+from sqlalchemy import func, case, desc
+from models import db, Player, GameRecord, GameResult
+
+# 게임 상세 통계 집계
+# 게임 기록 수와 관계없이 세 개의 집계 쿼리로 계산합니다. (리더보드는 플레이어별 통계를 정렬해 만듭니다)
+
+DEFAULT_TOP_N = 10
+
+
+def _win_rate(wins, plays):
+    return round((wins / plays) * 100, 1) if plays > 0 else 0
+
+
+def game_summary(game_id, top_n=DEFAULT_TOP_N):
+    """
+    게임의 전체 통계와 플레이어별 통계, 상위 N명 리더보드를 반환합니다.
+    점수가 없는(NULL) 결과는 평균 점수 계산에서 제외합니다.
+    """
+    # 1. 게임 기록 수
+    total_plays = db.session.query(func.count(GameRecord.id)).filter(
+        GameRecord.game_id == game_id
+    ).scalar() or 0
+
+    # 2. 결과 수와 평균 점수
+    total_results, average_score = db.session.query(
+        func.count(GameResult.id),
+        func.avg(GameResult.score)
+    ).join(
+        GameRecord, GameResult.game_record_id == GameRecord.id
+    ).filter(
+        GameRecord.game_id == game_id
+    ).one()
+
+    # 3. 등록된 플레이어별 승리/플레이 수
+    wins = func.sum(case((GameResult.is_winner, 1), else_=0))
+    plays = func.count(GameResult.id)
+    player_rows = db.session.query(
+        Player.id, Player.name, plays.label('plays'), wins.label('wins')
+    ).join(
+        GameResult, GameResult.player_id == Player.id
+    ).join(
+        GameRecord, GameResult.game_record_id == GameRecord.id
+    ).filter(
+        GameRecord.game_id == game_id
+    ).group_by(Player.id).order_by(desc('plays'), Player.id).all()
+
+    player_stats = [{
+        'player_id': row.id,
+        'player_name': row.name,
+        'wins': row.wins,
+        'plays': row.plays,
+        'win_rate': _win_rate(row.wins, row.plays)
+    } for row in player_rows]
+
+    # 리더보드: 3의 플레이어별 통계를 승리 수, 승률 순으로 정렬한 상위 N명 (추가 쿼리 없음)
+    leaderboard = sorted(
+        player_stats, key=lambda stats: (-stats['wins'], -stats['win_rate'], stats['player_id'])
+    )[:top_n]
+
+    total_wins = sum(stats['wins'] for stats in player_stats)
+
+    return {
+        'total_plays': total_plays,
+        'total_players': len(player_stats),
+        'win_rate': _win_rate(total_wins, total_results),
+        'average_score': round(average_score, 1) if average_score is not None else 0,
+        'player_stats': player_stats,
+        'leaderboard': leaderboard
+    }
@@ -0,0 +1,128 @@
+from functools import wraps
+import hashlib
+from flask import request, make_response, current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from models import db, TableVersion
+
+# 조건부 GET (ETag / If-None-Match)
+# 목록 API에 @conditional(모델 또는 테이블, ...) 을 붙이면 그 테이블들의 변경 카운터(TableVersion)와 요청 경로로 만든
+# 강한 ETag 와 Cache-Control 을 응답에 붙이고, If-None-Match 가 현재 ETag 와 같으면 뷰를 실행하지 않고 304 를 돌려줍니다.
+# (304 응답에 드는 쿼리는 카운터 조회 하나입니다)
+#
+# 카운터는 세션이 커밋될 때 그 트랜잭션에서 바뀐 테이블만 같은 트랜잭션에서 올리므로 여러 워커 프로세스에서도 안전합니다.
+# 바뀐 테이블은 flush 되는 ORM 객체와 Session.execute 로 실행한 INSERT/UPDATE/DELETE(일괄 저장, 롤업 갱신,
+# query.delete())에서 모읍니다. Session 을 거치지 않는 변경(sqlite3 로 직접 실행하는 도구 등)은 감지하지 않습니다.
+#
+# 카운터는 뷰보다 먼저 읽습니다. 그 사이에 커밋된 변경은 새 데이터에 이전 ETag 가 붙을 뿐이라
+# 다음 요청에서 ETag 가 달라져 다시 받게 되고, 오래된 데이터가 304 로 남지는 않습니다.
+
+DEFAULT_CACHE_CONTROL = 'private, no-cache'
+CHANGED_TABLES_KEY = 'changed_tables'
+
+
+def _table_name(target):
+    return getattr(target, '__tablename__', None) or target.name
+
+
+def _changed_tables(session):
+    return session.info.setdefault(CHANGED_TABLES_KEY, set())
+
+
+def table_versions(table_names):
+    """{테이블 이름: 버전} (변경된 적 없는 테이블은 0)"""
+    rows = db.session.query(TableVersion.table_name, TableVersion.version).filter(
+        TableVersion.table_name.in_(list(table_names))
+    ).all()
+    versions = dict.fromkeys(table_names, 0)
+    versions.update(rows)
+    return versions
+
+
+def bump_tables(connection, table_names):
+    """테이블 버전을 올립니다. 호출한 쪽의 트랜잭션에서 함께 커밋됩니다."""
+    table_names = sorted(table_names)
+    table = TableVersion.__table__
+    result = connection.execute(
+        table.update().where(table.c.table_name.in_(table_names)).values(version=table.c.version + 1)
+    )
+    if result.rowcount == len(table_names):
+        return
+    existing = set(connection.execute(
+        db.select(table.c.table_name).where(table.c.table_name.in_(table_names))
+    ).scalars())
+    missing = [name for name in table_names if name not in existing]
+    if missing:
+        connection.execute(table.insert(), [{'table_name': name, 'version': 1} for name in missing])
+
+
+def etag_for(table_names):
+    versions = table_versions(table_names)
+    digest = hashlib.sha1()
+    digest.update(current_app.config.get('ETAG_VERSION', '').encode())
+    digest.update(b'\0')
+    digest.update(request.full_path.encode())
+    for name in sorted(versions):
+        digest.update(f'\0{name}={versions[name]}'.encode())
+    return digest.hexdigest()
+
+
+def conditional(*tables):
+    """응답이 tables(모델 클래스 또는 Table)의 내용에만 의존하는 GET 뷰에 ETag 와 304 응답을 붙입니다."""
+    table_names = sorted({_table_name(table) for table in tables})
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = etag_for(table_names)
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = current_app.config.get('CACHE_CONTROL', DEFAULT_CACHE_CONTROL)
+            return response
+        return wrapper
+    return decorator
+
+
+# ORM 객체의 추가/변경/삭제 (다대다 연결 테이블 포함)
+@event.listens_for(Session, 'before_flush')
+def _collect_flushed_tables(session, flush_context, instances):
+    changed = _changed_tables(session)
+    deleted = session.deleted
+    for obj in [*session.new, *deleted, *(obj for obj in session.dirty if session.is_modified(obj))]:
+        state = inspect(obj)
+        changed.update(table.name for table in state.mapper.tables)
+        for relationship in state.mapper.relationships:
+            if relationship.secondary is None:
+                continue
+            # 삭제되는 객체의 연결 행은 함께 지워지고, 그 밖에는 컬렉션이 바뀐 경우만 연결 테이블이 바뀝니다
+            if obj in deleted or state.attrs[relationship.key].history.has_changes():
+                changed.add(relationship.secondary.name)
+
+
+# Session.execute 로 실행한 INSERT/UPDATE/DELETE (Core 문, 일괄 처리)
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_executed_tables(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, 'table', None)
+        if table is not None:
+            _changed_tables(orm_execute_state.session).add(table.name)
+
+
+@event.listens_for(Session, 'before_commit')
+def _bump_changed_tables(session):
+    # 커밋 때 flush 될 객체의 테이블도 포함되도록 먼저 flush 합니다
+    session.flush()
+    changed = session.info.pop(CHANGED_TABLES_KEY, None)
+    changed = (changed or set()) - {TableVersion.__tablename__}
+    if changed:
+        bump_tables(session.connection(), changed)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_changed_tables(session):
+    session.info.pop(CHANGED_TABLES_KEY, None)
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+from functools import wraps
+import hashlib
+from flask import request, jsonify, make_response, current_app
+from sqlalchemy.exc import IntegrityError
+from models import db, IdempotencyKey
+
+# Idempotency-Key 헤더 처리
+# 생성(POST) 엔드포인트에 @idempotent 를 붙이면 같은 키로 재시도된 요청은 새로 저장하지 않고
+# 처음 요청의 응답을 그대로 돌려줍니다. 키는 IDEMPOTENCY_TTL_SECONDS 이후 만료됩니다.
+#
+# 키는 뷰를 실행하기 전에 예약(status_code 없음)하고 응답은 뷰가 커밋한 뒤 저장합니다. 그 사이에 프로세스가
+# 종료되면 예약이 남으므로, 처리 중인 예약은 IDEMPOTENCY_LEASE_SECONDS 동안만 유효하고 그 뒤의 재시도는
+# 예약을 넘겨받아 요청을 다시 처리합니다. (임대 시간은 가장 느린 생성 요청보다 길어야 합니다)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_LEASE_SECONDS = 60
+MAX_KEY_LENGTH = 255
+
+
+def _fingerprint():
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(b'\0')
+    digest.update(request.path.encode())
+    digest.update(b'\0')
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def _replay(stored):
+    response = make_response(stored.response_body or '', stored.status_code)
+    if stored.content_type:
+        response.headers['Content-Type'] = stored.content_type
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _release(key):
+    # 처리 실패 시 예약을 지워 다시 시도할 수 있게 합니다
+    db.session.rollback()
+    IdempotencyKey.query.filter_by(key=key).delete()
+    db.session.commit()
+
+
+def _take_over(stored, now):
+    # 임대 시간이 지난 예약을 넘겨받습니다. 동시에 재시도한 요청 중 하나만 성공합니다
+    taken = IdempotencyKey.query.filter_by(
+        key=stored.key, status_code=None, created_at=stored.created_at
+    ).update({'created_at': now}, synchronize_session=False)
+    db.session.commit()
+    return taken == 1
+
+
+def idempotent(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({'error': f'{IDEMPOTENCY_HEADER}는 {MAX_KEY_LENGTH}자 이하여야 합니다.'}), 400
+
+        fingerprint = _fingerprint()
+        now = datetime.utcnow()
+
+        stored = db.session.get(IdempotencyKey, key)
+        if stored is not None and stored.expires_at <= now:
+            db.session.delete(stored)
+            db.session.commit()
+            stored = None
+
+        if stored is not None:
+            if stored.fingerprint != fingerprint:
+                return jsonify({'error': '같은 멱등성 키가 다른 요청에 이미 사용되었습니다.'}), 422
+            if stored.status_code is not None:
+                return _replay(stored)
+            lease = current_app.config.get('IDEMPOTENCY_LEASE_SECONDS', DEFAULT_LEASE_SECONDS)
+            if stored.created_at + timedelta(seconds=lease) > now or not _take_over(stored, now):
+                return jsonify({'error': '같은 요청이 아직 처리 중입니다.'}), 409
+        else:
+            # 키 예약 (만료된 키도 함께 정리)
+            ttl = current_app.config.get('IDEMPOTENCY_TTL_SECONDS', DEFAULT_TTL_SECONDS)
+            IdempotencyKey.query.filter(IdempotencyKey.expires_at <= now).delete()
+            db.session.add(IdempotencyKey(
+                key=key, fingerprint=fingerprint, created_at=now, expires_at=now + timedelta(seconds=ttl)
+            ))
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # 동시에 같은 키로 들어온 요청이 먼저 예약함
+                db.session.rollback()
+                return jsonify({'error': '같은 요청이 아직 처리 중입니다.'}), 409
+
+        try:
+            response = make_response(view(*args, **kwargs))
+        except Exception:
+            _release(key)
+            raise
+
+        # 서버 오류는 저장하지 않고 재시도를 허용
+        if response.status_code >= 500:
+            _release(key)
+            return response
+
+        stored = db.session.get(IdempotencyKey, key)
+        if stored is not None:
+            stored.status_code = response.status_code
+            stored.content_type = response.headers.get('Content-Type')
+            stored.response_body = response.get_data(as_text=True)
+            db.session.commit()
+        return response
+    return wrapper
@@ -0,0 +1,129 @@
+import time
+from bisect import bisect_left
+from threading import Lock
+from flask import g, request, Response
+
+# 엔드포인트별 요청 지표 (Prometheus 텍스트 형식, GET /metrics)
+# 요청마다 응답 시간, 응답 크기, DB 시간(query_stats 의 SQLAlchemy 커서 이벤트 합계)을
+# 고정 버킷 히스토그램에 누적합니다. 값은 프로세스별로 메모리에 유지됩니다.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    """레이블 조합별 고정 버킷 히스토그램"""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.series = {}  # 레이블 튜플 -> [버킷별 개수..., 초과 개수, 합계, 개수]
+
+    def observe(self, labels, value):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 3)
+        # 누적 분포는 출력할 때 계산하고, 여기서는 해당 버킷 하나만 올립니다
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self, label_names):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for labels, series in sorted(self.series.items()):
+            base = _labels(label_names, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {series[-1]}')
+            lines.append(f'{self.name}_sum{{{base}}} {series[-2]}')
+            lines.append(f'{self.name}_count{{{base}}} {series[-1]}')
+        return lines
+
+
+class Counter:
+    """레이블 조합별 카운터"""
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.series = {}
+
+    def inc(self, labels, value=1):
+        self.series[labels] = self.series.get(labels, 0) + value
+
+    def render(self, label_names):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        for labels, value in sorted(self.series.items()):
+            lines.append(f'{self.name}{{{_labels(label_names, labels)}}} {value}')
+        return lines
+
+
+def _labels(names, values):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+ENDPOINT_LABELS = ('blueprint', 'endpoint', 'method')
+
+_lock = Lock()
+request_duration = Histogram('http_request_duration_seconds', '요청 처리 시간 (초)', LATENCY_BUCKETS)
+response_size = Histogram('http_response_size_bytes', '응답 본문 크기 (바이트)', SIZE_BUCKETS)
+db_duration = Histogram('http_request_db_seconds', '요청당 SQL 실행 시간 합계 (초)', LATENCY_BUCKETS)
+requests_total = Counter('http_requests_total', '상태 코드별 요청 수')
+db_queries_total = Counter('http_request_db_queries_total', '실행한 SQL 쿼리 수')
+
+
+def _start_timer():
+    g.metrics_started = time.perf_counter()
+
+
+def _record(response):
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    labels = (request.blueprint or '', request.endpoint or 'unmatched', request.method)
+    # 스트리밍 응답은 길이를 알 수 없으므로 크기를 기록하지 않습니다 (응답 시간도 첫 응답까지만 측정됩니다)
+    size = response.content_length if not response.is_streamed else None
+    stats = g.get('query_stats')
+
+    with _lock:
+        request_duration.observe(labels, elapsed)
+        requests_total.inc(labels + (response.status_code,))
+        if size is not None:
+            response_size.observe(labels, size)
+        if stats is not None:
+            db_duration.observe(labels, stats.total_time)
+            db_queries_total.inc(labels, stats.count)
+    return response
+
+
+def render():
+    """현재까지의 지표를 Prometheus 텍스트 형식으로 반환합니다."""
+    with _lock:
+        lines = []
+        lines += request_duration.render(ENDPOINT_LABELS)
+        lines += requests_total.render(ENDPOINT_LABELS + ('status',))
+        lines += response_size.render(ENDPOINT_LABELS)
+        lines += db_duration.render(ENDPOINT_LABELS)
+        lines += db_queries_total.render(ENDPOINT_LABELS)
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view():
+    return Response(render(), content_type=CONTENT_TYPE)
+
+
+def init_app(app):
+    """요청 지표 수집 훅과 /metrics 엔드포인트를 등록합니다."""
+    app.before_request(_start_timer)
+    app.after_request(_record)
+    app.add_url_rule('/metrics', 'metrics', metrics_view, methods=['GET'])
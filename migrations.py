@@ -0,0 +1,469 @@
+import math
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+from sqlalchemy import MetaData
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+# 버전 관리 스키마 마이그레이션 (python migrate_db.py / flask --app app migrate)
+# 적용한 단계는 schema_version 테이블에 기록하고, 아직 적용하지 않은 단계만 버전 순서대로 실행합니다.
+# 큰 테이블의 데이터 변경(backfill)은 id 범위 청크마다 별도 트랜잭션으로 커밋하므로
+# 쓰기 잠금은 청크 하나를 처리하는 동안만 유지됩니다. 대기 중인 쓰기는 busy_timeout 안에서 재시도하므로
+# 운영 중에는 청크 사이에 잠시 쉬도록(pause) 해야 재시도가 잠금을 얻을 수 있습니다.
+# 모든 단계는 다시 실행해도 안전하게 작성되어 있어 중간에 중단되면 같은 명령으로 이어서 진행합니다.
+#
+# dry run 은 DB를 임시 파일로 온라인 백업한 복사본에서 단계를 실행하고 복사본을 지웁니다. 청크 작업은
+# 앞쪽 몇 개 청크만 실행해 청크당 시간으로 전체 시간을 추정하고, 인덱스 생성 같은 단일 문장은 실제 시간을 잽니다.
+
+DEFAULT_CHUNK_SIZE = 5000
+DRY_RUN_SAMPLE_CHUNKS = 3
+PROGRESS_INTERVAL = 1.0  # 초
+
+# 이전 버전에서 만든 뒤 다른 인덱스로 대체된 인덱스
+OBSOLETE_INDEXES = ['ix_game_result_record']
+
+MIGRATIONS = []
+
+
+def migration(version, name):
+    """마이그레이션 단계를 등록합니다. 함수는 MigrationContext 를 받습니다."""
+    def decorator(func):
+        MIGRATIONS.append((version, name, func))
+        MIGRATIONS.sort(key=lambda step: step[0])
+        return func
+    return decorator
+
+
+class MigrationContext:
+    """마이그레이션 단계가 DB를 변경할 때 쓰는 연결과 청크 실행 도구"""
+
+    def __init__(self, conn, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False, pause=0.0, report=print):
+        self.conn = conn
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.pause = pause
+        self.report = report
+        self.estimated = 0.0  # 단계 실행 시간 (dry run 에서는 청크 작업을 추정한 값, 초)
+
+    def tables(self):
+        return {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+
+    def indexes(self):
+        return {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+
+    def columns(self, table):
+        return [row[1] for row in self.conn.execute(f'PRAGMA table_info("{table}")')]
+
+    def execute(self, *statements):
+        """문장들을 하나의 트랜잭션으로 실행합니다."""
+        started = time.perf_counter()
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            for sql, params in statements:
+                self.conn.execute(sql, params)
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+        self.conn.execute('COMMIT')
+        self.estimated += time.perf_counter() - started
+
+    def batched(self, table, sql, label=None):
+        """
+        :lo <= id < :hi 범위 조건이 들어간 sql 을 id 범위 청크마다 별도 트랜잭션으로 실행합니다.
+        처리한(변경된) 행 수를 반환합니다. dry run 이면 앞쪽 몇 개 청크만 실행합니다.
+        """
+        label = label or table
+        if table not in self.tables():
+            return 0
+        low, high = self.conn.execute(f'SELECT MIN(id), MAX(id) FROM "{table}"').fetchone()
+        if low is None:
+            return 0
+        total_chunks = math.ceil((high - low + 1) / self.chunk_size)
+        chunks = min(total_chunks, DRY_RUN_SAMPLE_CHUNKS) if self.dry_run else total_chunks
+
+        changed = 0
+        started = time.perf_counter()
+        last_report = started
+        for index in range(chunks):
+            lo = low + index * self.chunk_size
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                changed += self.conn.execute(sql, {'lo': lo, 'hi': lo + self.chunk_size}).rowcount
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+            self.conn.execute('COMMIT')
+
+            now = time.perf_counter()
+            if not self.dry_run and (now - last_report >= PROGRESS_INTERVAL or index + 1 == chunks):
+                elapsed = now - started
+                remaining = elapsed / (index + 1) * (chunks - index - 1)
+                self.report(f"  {label}: {index + 1}/{chunks} 청크 ({(index + 1) * 100 // chunks}%), "
+                            f"변경 {changed}행, 경과 {elapsed:.1f}초, 남은 시간 약 {remaining:.1f}초")
+                last_report = now
+            if self.pause and index + 1 < chunks:
+                time.sleep(self.pause)
+
+        elapsed = time.perf_counter() - started
+        if not self.dry_run:
+            self.estimated += elapsed
+        else:
+            per_chunk = elapsed / chunks
+            self.estimated += per_chunk * total_chunks + self.pause * (total_chunks - 1)
+            self.report(f"  {label}: {total_chunks}개 청크 예상 (청크당 {per_chunk * 1000:.1f}ms, "
+                        f"표본 {chunks}개 청크에서 변경 {changed}행)")
+        return changed
+
+
+def _model_tables():
+    from models import db
+    return db.metadata.sorted_tables
+
+
+# 1. 모델에 있는 테이블 중 없는 테이블 생성 (기존 테이블의 컬럼은 이후 단계에서 변경합니다)
+@migration(1, 'create_missing_tables')
+def create_missing_tables(ctx):
+    existing = ctx.tables()
+    statements = []
+    for table in _model_tables():
+        if table.name not in existing:
+            statements.append((str(CreateTable(table).compile(dialect=sqlite.dialect())), ()))
+            statements.extend(
+                (str(CreateIndex(index).compile(dialect=sqlite.dialect())), ()) for index in table.indexes
+            )
+            ctx.report(f"  {table.name} 테이블 생성")
+    if statements:
+        ctx.execute(*statements)
+
+
+# 2. meeting.host_id 추가
+# 테이블 전체를 복사하지 않고 ALTER TABLE ADD COLUMN 으로 추가합니다. (기존 행을 다시 쓰지 않는 스키마 변경)
+@migration(2, 'meeting_host_id')
+def meeting_host_id(ctx):
+    if 'meeting' not in ctx.tables() or 'host_id' in ctx.columns('meeting'):
+        return
+    first_player = ctx.conn.execute('SELECT MIN(id) FROM player').fetchone()[0]
+    default_host_id = int(first_player or 1)
+    ctx.execute((
+        f'ALTER TABLE meeting ADD COLUMN host_id INTEGER NOT NULL DEFAULT {default_host_id} REFERENCES player (id)',
+        ()
+    ))
+    ctx.report(f"  meeting.host_id 추가 (기본 호스트 {default_host_id})")
+
+
+# 3. YY-MM-DD 형식으로 저장된 날짜를 YYYY-MM-DD 로 변환
+# 기간 통계는 날짜를 문자열로 비교하므로 모든 날짜가 같은 형식이어야 합니다.
+@migration(3, 'iso_dates')
+def iso_dates(ctx):
+    for table in ('meeting', 'game_record'):
+        ctx.batched(table, f'''
+            UPDATE "{table}" SET date = '20' || date
+            WHERE id >= :lo AND id < :hi AND date GLOB '[0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'
+        ''', label=f'{table}.date')
+
+
+# 4. 같은 모임의 중복 참가 기록 정리 (가장 최근 id만 남김). 5단계의 고유 인덱스를 만들기 위한 준비입니다.
+# 지울 id 는 테이블을 한 번 그룹화해 임시 테이블에 모아 두고, 청크마다 그 범위의 id 만 지웁니다.
+# (청크마다 전체 그룹화를 다시 하지 않습니다. 임시 테이블은 이 연결에만 보이며 메인 DB를 잠그지 않습니다)
+@migration(4, 'dedupe_meeting_participants')
+def dedupe_meeting_participants(ctx):
+    if 'meeting_participant' not in ctx.tables():
+        return
+    started = time.perf_counter()
+    ctx.conn.execute('DROP TABLE IF EXISTS temp.duplicate_participant')
+    ctx.conn.execute('CREATE TEMP TABLE duplicate_participant (id INTEGER PRIMARY KEY)')
+    ctx.conn.execute('''
+        INSERT INTO temp.duplicate_participant (id)
+        SELECT id FROM meeting_participant
+        WHERE id NOT IN (SELECT MAX(id) FROM meeting_participant GROUP BY meeting_id, player_id)
+    ''')
+    ctx.estimated += time.perf_counter() - started
+    try:
+        duplicates = ctx.conn.execute('SELECT COUNT(*) FROM temp.duplicate_participant').fetchone()[0]
+        if not duplicates:
+            return
+        deleted = ctx.batched('meeting_participant', '''
+            DELETE FROM meeting_participant
+            WHERE id >= :lo AND id < :hi AND id IN (
+                SELECT id FROM temp.duplicate_participant WHERE id >= :lo AND id < :hi
+            )
+        ''', label='meeting_participant 중복')
+        if deleted and not ctx.dry_run:
+            ctx.report(f"  중복 참가 기록 {deleted}건 삭제")
+    finally:
+        ctx.conn.execute('DROP TABLE temp.duplicate_participant')
+
+
+# 5. models.py 에 선언된 인덱스 생성. 컬럼 구성이 바뀐 인덱스는 다시 만듭니다.
+# SQLite 의 CREATE INDEX 는 나눠서 실행할 수 없으므로 인덱스마다 한 트랜잭션으로 실행합니다.
+@migration(5, 'model_indexes')
+def model_indexes(ctx):
+    tables = ctx.tables()
+    existing = ctx.indexes()
+    for name in OBSOLETE_INDEXES:
+        if name in existing:
+            ctx.execute((f'DROP INDEX "{name}"', ()))
+            ctx.report(f"  사용하지 않는 인덱스 {name} 삭제")
+
+    for table in _model_tables():
+        if table.name not in tables:
+            continue
+        table_columns = set(ctx.columns(table.name))
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            columns = [column.name for column in index.columns]
+            if not table_columns.issuperset(columns):
+                continue  # 컬럼을 추가하는 이후 단계에서 만듭니다
+            statements = []
+            if index.name in existing:
+                current = [row[2] for row in ctx.conn.execute(f'PRAGMA index_info("{index.name}")')]
+                if current == columns:
+                    continue
+                statements.append((f'DROP INDEX "{index.name}"', ()))
+            statements.append((str(CreateIndex(index).compile(dialect=sqlite.dialect())), ()))
+            started = time.perf_counter()
+            try:
+                ctx.execute(*statements)
+                # 새 인덱스의 통계를 쿼리 플래너에 반영합니다 (인덱스마다 따로 실행해 잠금 시간을 나눕니다)
+                ctx.execute((f'ANALYZE "{index.name}"', ()))
+            except sqlite3.IntegrityError:
+                if not ctx.dry_run:
+                    raise
+                # dry run 에서는 앞 단계(중복 정리)를 일부 청크만 실행하므로 고유 인덱스를 만들 수 없을 수 있습니다
+                ctx.report(f"  인덱스 {index.name}: 중복 데이터가 있어 시간을 잴 수 없습니다 (4단계 적용 후 생성)")
+                continue
+            ctx.report(f"  인덱스 {index.name} ON {table.name} ({', '.join(columns)}) "
+                       f"{time.perf_counter() - started:.1f}초")
+            if ctx.pause:
+                time.sleep(ctx.pause)
+
+
+# 6. 테이블별 변경 카운터 (ETag 용, http_cache.py)
+# 1단계 이후에 모델에 추가된 테이블을 만듭니다.
+@migration(6, 'table_version')
+def table_version(ctx):
+    create_missing_tables(ctx)
+
+
+# 7. 통계 롤업 테이블 채우기
+# 롤업 테이블이 추가되기 전에 만든 DB는 1단계에서 빈 롤업 테이블이 만들어지므로 원본 데이터에서 한 번 계산합니다.
+# 롤업 테이블끼리 값이 맞아야 하므로 청크로 나누지 않고 한 트랜잭션으로 실행합니다.
+# 레이팅은 다음 조회 때 전체를 다시 계산하도록 표시하고, 통계 API의 ETag 가 바뀌도록 변경 카운터를 올립니다.
+@migration(7, 'rebuild_rollups')
+def rebuild_rollups(ctx):
+    import rollup
+    if 'game_result' not in ctx.tables():
+        return
+    statements = [
+        (str(statement.compile(dialect=sqlite.dialect(), compile_kwargs={'literal_binds': True})), ())
+        for statement in rollup.rebuild_statements()
+    ]
+    statements.append(('''
+        INSERT INTO rating_state (id, last_date, last_record_id, dirty) VALUES (1, NULL, 0, 1)
+        ON CONFLICT (id) DO UPDATE SET dirty = 1
+    ''', ()))
+    statements.extend(('''
+        INSERT INTO table_version (table_name, version) VALUES (?, 1)
+        ON CONFLICT (table_name) DO UPDATE SET version = version + 1
+    ''', (model.__tablename__,)) for model in rollup.ROLLUP_MODELS)
+    ctx.execute(*statements)
+    results = ctx.conn.execute('SELECT COUNT(*) FROM game_result').fetchone()[0]
+    ctx.report(f"  게임 결과 {results}건으로 롤업 재계산, 레이팅 재계산 예약")
+
+
+# 8. game_result.record_date 추가 (플레이어 히스토리 페이지네이션용 기록 날짜 복사본)
+# 컬럼은 ALTER TABLE ADD COLUMN 으로 추가하고, 값은 id 범위 청크로 채운 뒤 (player_id, record_date, id) 인덱스를 만듭니다.
+@migration(8, 'game_result_record_date')
+def game_result_record_date(ctx):
+    if 'game_result' not in ctx.tables():
+        return
+    if 'record_date' not in ctx.columns('game_result'):
+        ctx.execute(('ALTER TABLE game_result ADD COLUMN record_date DATE', ()))
+        ctx.report("  game_result.record_date 추가")
+    filled = ctx.batched('game_result', '''
+        UPDATE game_result
+        SET record_date = (SELECT date FROM game_record WHERE game_record.id = game_result.game_record_id)
+        WHERE id >= :lo AND id < :hi AND record_date IS NULL
+    ''', label='game_result.record_date')
+    if filled and not ctx.dry_run:
+        ctx.report(f"  기록 날짜 {filled}건 복사")
+    model_indexes(ctx)
+
+
+# 9. 숫자가 아닌 점수 정리
+# 점수 검증(record_ingest._as_score) 이전에 저장된 문자열 점수는 분석/레이팅 계산을 실패하게 하므로 점수 없음(NULL)으로 바꿉니다.
+# INTEGER 컬럼이라 숫자 문자열은 저장할 때 이미 숫자로 바뀌었고, 실수 점수(2.5 등)는 계산에 문제가 없으므로 그대로 둡니다.
+# 되돌릴 수 없는 변경이므로 바꾸는 결과 ID 와 원래 값을 보고합니다.
+@migration(9, 'clear_invalid_scores')
+def clear_invalid_scores(ctx):
+    invalid = ctx.conn.execute(
+        "SELECT id, score FROM game_result WHERE typeof(score) IN ('text', 'blob') ORDER BY id"
+    ).fetchall()
+    if not invalid:
+        return
+    ctx.report(f"  숫자가 아닌 점수 {len(invalid)}건 (결과 ID=원래 값)")
+    for i in range(0, len(invalid), 20):
+        ctx.report('    ' + ', '.join(f'{result_id}={score!r}' for result_id, score in invalid[i:i + 20]))
+    cleared = ctx.batched('game_result', '''
+        UPDATE game_result SET score = NULL
+        WHERE id >= :lo AND id < :hi AND typeof(score) IN ('text', 'blob')
+    ''', label='game_result.score')
+    if cleared and not ctx.dry_run:
+        ctx.report(f"  숫자가 아닌 점수 {cleared}건을 NULL 로 변경")
+
+
+# 10. game_result.record_date 를 NOT NULL 로 변경
+# SQLite 는 기존 컬럼에 NOT NULL 을 추가할 수 없으므로 모델 정의로 새 테이블을 만들어 복사하고 원래 이름으로 바꾼 뒤
+# 인덱스를 다시 만듭니다. 8단계 이후 이전 버전 앱이 날짜 없이 저장한 결과는 복사하면서 기록 날짜로 채웁니다.
+# 복사와 교체, 인덱스 생성은 한 트랜잭션이라 그동안 game_result 쓰기는 기다리므로 --dry-run 으로 시간을 확인하세요.
+# 이 단계 이후에는 기록 날짜를 저장하지 않는 이전 버전 앱의 결과 저장이 실패합니다.
+@migration(10, 'game_result_record_date_not_null')
+def game_result_record_date_not_null(ctx):
+    from models import GameResult
+    if 'game_result' not in ctx.tables():
+        return
+    not_null = {row[1]: row[3] for row in ctx.conn.execute('PRAGMA table_info("game_result")')}
+    if not_null.get('record_date'):
+        return
+    orphans = [row[0] for row in ctx.conn.execute('''
+        SELECT id FROM game_result
+        WHERE record_date IS NULL
+          AND NOT EXISTS (SELECT 1 FROM game_record WHERE game_record.id = game_result.game_record_id)
+        ORDER BY id
+    ''')]
+    if orphans:
+        raise ValueError(f"게임 기록이 없어 기록 날짜를 채울 수 없는 게임 결과 {len(orphans)}건: "
+                         f"{', '.join(map(str, orphans[:20]))}{' ...' if len(orphans) > 20 else ''}")
+
+    table = GameResult.__table__
+    metadata = MetaData()
+    for other in table.metadata.sorted_tables:
+        if other is not table:
+            other.to_metadata(metadata)
+    new_table = table.to_metadata(metadata, name='game_result_new')
+
+    record_date = '(SELECT date FROM game_record WHERE game_record.id = game_result.game_record_id)'
+    if 'record_date' in not_null:
+        record_date = f'COALESCE(record_date, {record_date})'
+    columns = [column.name for column in table.columns if column.name in not_null or column.name == 'record_date']
+    values = [record_date if name == 'record_date' else name for name in columns]
+    dropped = sorted(set(not_null) - {column.name for column in table.columns})
+    if dropped:
+        ctx.report(f"  모델에 없는 컬럼은 복사하지 않습니다: {', '.join(dropped)}")
+
+    started = time.perf_counter()
+    ctx.execute(
+        (str(CreateTable(new_table).compile(dialect=sqlite.dialect())), ()),
+        (f'INSERT INTO game_result_new ({", ".join(columns)}) SELECT {", ".join(values)} FROM game_result', ()),
+        ('DROP TABLE game_result', ()),
+        ('ALTER TABLE game_result_new RENAME TO game_result', ()),
+        *((str(CreateIndex(index).compile(dialect=sqlite.dialect())), ()) for index in table.indexes),
+    )
+    ctx.execute(('ANALYZE game_result', ()))
+    ctx.report(f"  game_result 테이블 재작성 (record_date NOT NULL) {time.perf_counter() - started:.1f}초")
+
+
+def connect(db_path, busy_timeout=5000):
+    # 트랜잭션은 MigrationContext 가 직접 BEGIN/COMMIT 합니다
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute(f'PRAGMA busy_timeout = {int(busy_timeout)}')
+    return conn
+
+
+def _ensure_version_table(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL,
+            duration_ms INTEGER NOT NULL
+        )
+    ''')
+
+
+def applied_versions(conn):
+    """적용한 마이그레이션 {버전: (이름, 적용 시각)}"""
+    _ensure_version_table(conn)
+    return {row[0]: (row[1], row[2]) for row in conn.execute('SELECT version, name, applied_at FROM schema_version')}
+
+
+def _backup(db_path):
+    # 온라인 백업은 원본의 쓰기를 막지 않습니다. 복사본은 원본과 같은 디렉토리에 만듭니다
+    fd, path = tempfile.mkstemp(prefix='migrate-dry-run-', suffix='.db', dir=os.path.dirname(os.path.abspath(db_path)))
+    os.close(fd)
+    source = connect(db_path)
+    target = sqlite3.connect(path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+    return path
+
+
+def _remove(path):
+    for suffix in ('', '-wal', '-shm', '-journal'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def migrate(db_path, target=None, dry_run=False, chunk_size=DEFAULT_CHUNK_SIZE, pause=0.0, report=print):
+    """
+    적용하지 않은 마이그레이션을 target 버전(없으면 마지막)까지 실행합니다.
+    [(버전, 이름, 실행 또는 예상 시간(초))] 을 반환합니다.
+    dry run 은 DB 복사본에서 실행하므로 원본을 바꾸지 않습니다.
+    """
+    if not dry_run:
+        return _run(db_path, target, False, chunk_size, pause, report)
+
+    started = time.perf_counter()
+    copy_path = _backup(db_path)
+    report(f"복사본 생성 {time.perf_counter() - started:.2f}초")
+    try:
+        return _run(copy_path, target, True, chunk_size, pause, report)
+    finally:
+        _remove(copy_path)
+
+
+def _run(db_path, target, dry_run, chunk_size, pause, report):
+    conn = connect(db_path)
+    try:
+        applied = applied_versions(conn)
+        steps = [step for step in MIGRATIONS
+                 if step[0] not in applied and (target is None or step[0] <= target)]
+        if not steps:
+            report("적용할 마이그레이션이 없습니다.")
+            return []
+
+        results = []
+        for number, (version, name, func) in enumerate(steps, 1):
+            report(f"[{number}/{len(steps)}] {version:03d}_{name}{' (dry run)' if dry_run else ''}")
+            ctx = MigrationContext(conn, chunk_size=chunk_size, dry_run=dry_run, pause=pause, report=report)
+            started = time.perf_counter()
+            func(ctx)
+            elapsed = ctx.estimated if dry_run else time.perf_counter() - started
+            if not dry_run:
+                conn.execute(
+                    'INSERT INTO schema_version (version, name, applied_at, duration_ms) VALUES (?, ?, ?, ?)',
+                    (version, name, datetime.utcnow().isoformat(timespec='seconds'), int(elapsed * 1000))
+                )
+            report(f"  {'예상' if dry_run else '완료'} {elapsed:.2f}초")
+            results.append((version, name, elapsed))
+
+        if dry_run:
+            report(f"예상 총 소요 시간: {sum(result[2] for result in results):.2f}초")
+        return results
+    finally:
+        conn.close()
+
+
+def status(db_path):
+    """[(버전, 이름, 적용 시각 또는 None)]"""
+    conn = connect(db_path)
+    try:
+        applied = applied_versions(conn)
+    finally:
+        conn.close()
+    return [(version, name, applied.get(version, (None, None))[1]) for version, name, _ in MIGRATIONS]
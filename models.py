@@ -1,9 +1,27 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 from datetime import datetime
 
 # 데이터베이스 인스턴스 생성
 db = SQLAlchemy()
 
+def init_db(app):
+    """앱에 db 를 연결하고, SQLite 이면 연결마다 SQLITE_PRAGMAS 설정을 적용합니다."""
+    db.init_app(app)
+    pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+    with app.app_context():
+        engine = db.engine
+    if pragmas and engine.dialect.name == 'sqlite':
+        # busy_timeout 을 먼저 적용해야 다른 연결이 쓰는 중에도 journal_mode 등이 잠금 오류 없이 기다립니다
+        ordered = sorted(pragmas.items(), key=lambda item: item[0] != 'busy_timeout')
+
+        @event.listens_for(engine, 'connect')
+        def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in ordered:
+                cursor.execute(f'PRAGMA {name}={value}')
+            cursor.close()
+
 class Player(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -25,6 +43,13 @@ class Meeting(db.Model):
     planned_games = db.relationship('Game', secondary='meeting_planned_games')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # 모임 목록 키셋 페이지 (date DESC, id DESC)
+        db.Index('ix_meeting_date_id', 'date', 'id'),
+        # 플레이어 삭제 시 주최 모임 조회 (hosted_meetings)
+        db.Index('ix_meeting_host', 'host_id'),
+    )
+
     def __repr__(self):
         return f'<Meeting {self.date} at {self.location}>'
 
@@ -50,9 +75,24 @@ class GameRecord(db.Model):
     # 관계 설정
     results = db.relationship('GameResult', backref='game_record', cascade='all, delete-orphan', lazy=True)
     
+    __table_args__ = (
+        # 기간 통계의 경계 월 조회
+        db.Index('ix_game_record_date', 'date'),
+        # 게임 상세(날짜순 기록), 게임 통계, 게임 삭제
+        db.Index('ix_game_record_game_date', 'game_id', 'date'),
+        # 모임 목록의 게임 수 집계와 모임 상세 (COUNT(id)는 rowid 이므로 인덱스만 읽습니다)
+        db.Index('ix_game_record_meeting', 'meeting_id'),
+    )
+    
     def __repr__(self):
         return f'<GameRecord {self.id}>'
 
+def _record_date_default(context):
+    # 기록 날짜를 지정하지 않고 저장한 결과(ORM, Core INSERT 모두)에는 게임 기록의 날짜를 복사합니다
+    return context.connection.execute(
+        db.select(GameRecord.date).where(GameRecord.id == context.get_current_parameters()['game_record_id'])
+    ).scalar()
+
 # 게임 결과 모델
 class GameResult(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -61,6 +101,19 @@ class GameResult(db.Model):
     player_name = db.Column(db.String(100), nullable=True)  # 미등록 플레이어용
     score = db.Column(db.Integer, default=0)
     is_winner = db.Column(db.Boolean, default=False)
+    # 기록 날짜(game_record.date) 복사본. 플레이어 히스토리를 조인 없이 인덱스 순서로 페이지네이션하기 위해 저장합니다
+    # 저장할 때 지정하지 않으면 기록에서 채우고, 기록 날짜가 바뀌면 _sync_result_record_date 가 함께 바꿉니다
+    record_date = db.Column(db.Date, nullable=False, default=_record_date_default)
+    
+    __table_args__ = (
+        # 플레이어별 게임 기록 조회 (플레이어 통계, 플레이어 삭제)
+        db.Index('ix_game_result_player_record', 'player_id', 'game_record_id'),
+        # 플레이어 상세 히스토리 (기록 날짜 최신순 키셋 페이지네이션, 기간 필터)
+        db.Index('ix_game_result_player_date', 'player_id', 'record_date', 'id'),
+        # 게임 기록별 결과 조회 (기록 상세, 내보내기). player_id, is_winner 까지 포함해
+        # 게임 통계의 플레이어별 승리 집계와 롤업 갱신이 테이블을 읽지 않게 합니다
+        db.Index('ix_game_result_record_player', 'game_record_id', 'player_id', 'is_winner'),
+    )
     
     def __repr__(self):
         if self.player:
@@ -69,6 +122,14 @@ class GameResult(db.Model):
             player_info = f'Unregistered: {self.player_name}'
         return f'<GameResult {self.id}, {player_info}, Score: {self.score}, Winner: {self.is_winner}>'
 
+# ORM 으로 기록 날짜를 바꾸면 같은 flush 에서 결과의 기록 날짜 복사본도 바꿉니다
+@event.listens_for(GameRecord, 'after_update')
+def _sync_result_record_date(mapper, connection, target):
+    if db.inspect(target).attrs.date.history.has_changes():
+        connection.execute(
+            GameResult.__table__.update().where(GameResult.game_record_id == target.id).values(record_date=target.date)
+        )
+
 # 모임 예정 게임 테이블
 meeting_planned_games = db.Table('meeting_planned_games',
     db.Column('meeting_id', db.Integer, db.ForeignKey('meeting.id'), primary_key=True),
@@ -86,5 +147,180 @@ class MeetingParticipant(db.Model):
     meeting = db.relationship('Meeting', backref='participants')
     player = db.relationship('Player', backref='meeting_participations')
 
+    __table_args__ = (
+        # 모임당 플레이어는 한 번만 참가합니다. 참가자 추가 시 기존 참가 조회와 모임 상세에도 쓰입니다
+        db.Index('uq_meeting_participant_pair', 'meeting_id', 'player_id', unique=True),
+        # 모임 목록의 확정 참가자 수 집계 (meeting_id IN ... AND status = 'confirmed')
+        db.Index('ix_meeting_participant_status', 'meeting_id', 'status'),
+        # 플레이어 삭제 시 참가 기록 조회 (meeting_participations)
+        db.Index('ix_meeting_participant_player', 'player_id'),
+    )
+
+    def __repr__(self):
+        return f'<MeetingParticipant {self.player.name} at {self.meeting.date}>'
+
+# 통계 롤업 테이블
+# /api/stats 를 전체 테이블 집계 없이 제공하기 위해 게임 기록 추가/삭제 시 같은 트랜잭션에서 갱신됩니다.
+# 값이 어긋난 경우 `flask --app app rebuild-stats` 로 처음부터 다시 계산할 수 있습니다.
+
+# 게임별 플레이 횟수
+class GameStat(db.Model):
+    game_id = db.Column(db.Integer, db.ForeignKey('game.id'), primary_key=True)
+    play_count = db.Column(db.Integer, nullable=False, default=0, index=True)
+
+    def __repr__(self):
+        return f'<GameStat game={self.game_id} plays={self.play_count}>'
+
+# 플레이어별 승리/플레이 횟수 및 참여 모임 수
+class PlayerStat(db.Model):
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), primary_key=True)
+    plays = db.Column(db.Integer, nullable=False, default=0)
+    wins = db.Column(db.Integer, nullable=False, default=0, index=True)
+    meeting_count = db.Column(db.Integer, nullable=False, default=0, index=True)
+
+    def __repr__(self):
+        return f'<PlayerStat player={self.player_id} wins={self.wins}/{self.plays}>'
+
+# 플레이어-모임 쌍별 결과 수 (참여 모임 수의 중복 제거용)
+class PlayerMeetingStat(db.Model):
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), primary_key=True)
+    meeting_id = db.Column(db.Integer, db.ForeignKey('meeting.id'), primary_key=True)
+    result_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<PlayerMeetingStat player={self.player_id} meeting={self.meeting_id}>'
+
+# 게임 기록별 플레이어 수
+class GameRecordStat(db.Model):
+    game_record_id = db.Column(db.Integer, db.ForeignKey('game_record.id'), primary_key=True)
+    player_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<GameRecordStat record={self.game_record_id} players={self.player_count}>'
+
+# 플레이어 수별 게임 기록 수
+class PlayerCountStat(db.Model):
+    player_count = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    record_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<PlayerCountStat {self.player_count}명: {self.record_count}>'
+
+# 월별 통계 롤업 테이블 (기간 통계용)
+# month 는 GameRecord.date 의 연월을 YYYYMM 정수로 나타냅니다. (예: 202403)
+
+# 월별 게임 플레이 횟수
+class MonthlyGameStat(db.Model):
+    month = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    game_id = db.Column(db.Integer, db.ForeignKey('game.id'), primary_key=True)
+    play_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<MonthlyGameStat {self.month} game={self.game_id} plays={self.play_count}>'
+
+# 월별 플레이어-게임 승리/플레이 횟수
+class MonthlyPlayerGameStat(db.Model):
+    month = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), primary_key=True)
+    game_id = db.Column(db.Integer, db.ForeignKey('game.id'), primary_key=True)
+    plays = db.Column(db.Integer, nullable=False, default=0)
+    wins = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # 플레이어 통계의 기간 조회
+        db.Index('ix_monthly_player_game_stat_player', 'player_id', 'month'),
+    )
+
+    def __repr__(self):
+        return f'<MonthlyPlayerGameStat {self.month} player={self.player_id} game={self.game_id}>'
+
+# 월별 플레이어-모임 쌍별 결과 수 (기간 내 참여 모임 수의 중복 제거용)
+class MonthlyPlayerMeetingStat(db.Model):
+    month = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), primary_key=True)
+    meeting_id = db.Column(db.Integer, db.ForeignKey('meeting.id'), primary_key=True)
+    result_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<MonthlyPlayerMeetingStat {self.month} player={self.player_id} meeting={self.meeting_id}>'
+
+# 월별 플레이어 수별 게임 기록 수
+class MonthlyPlayerCountStat(db.Model):
+    month = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    player_count = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    record_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<MonthlyPlayerCountStat {self.month} {self.player_count}명: {self.record_count}>'
+
+# 플레이어 상대 전적 (희소 행렬)
+# 같은 게임 기록에 함께 참여한 등록 플레이어 쌍마다 양방향으로 한 행씩 저장합니다. game_id=0 은 전체 게임 합계입니다.
+# wins: player 가 이기고 opponent 가 진 기록 수, losses: 그 반대 (둘 다 이기거나 진 기록은 무승부)
+class HeadToHeadStat(db.Model):
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), primary_key=True)
+    opponent_id = db.Column(db.Integer, db.ForeignKey('player.id'), primary_key=True)
+    game_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    plays = db.Column(db.Integer, nullable=False, default=0)
+    wins = db.Column(db.Integer, nullable=False, default=0)
+    losses = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<HeadToHeadStat {self.player_id} vs {self.opponent_id} game={self.game_id}: {self.wins}-{self.losses}/{self.plays}>'
+
+# 플레이어별 데이터 버전
+# 플레이어의 GameResult가 추가/변경/삭제될 때마다 증가하며 플레이어 통계 캐시 무효화에 사용됩니다.
+class PlayerVersion(db.Model):
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<PlayerVersion player={self.player_id} v{self.version}>'
+
+# 테이블별 변경 카운터
+# 테이블의 행을 추가/변경/삭제한 트랜잭션이 커밋될 때 같은 트랜잭션에서 증가하며 목록 API의 ETag 에 사용됩니다. (http_cache.py)
+# 분석 스냅샷의 결과 삭제 카운터(analytics.RESULTS_REMOVED)도 같은 테이블에 테이블이 아닌 이름으로 저장합니다.
+class TableVersion(db.Model):
+    table_name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<TableVersion {self.table_name} v{self.version}>'
+
+# 멱등성 키 (Idempotency-Key 헤더)
+# 같은 키로 재시도된 생성 요청에 저장된 응답을 그대로 돌려주기 위해 사용합니다. status_code가 없으면 처리 중입니다.
+class IdempotencyKey(db.Model):
+    key = db.Column(db.String(255), primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)  # 메서드, 경로, 요청 본문의 해시
+    status_code = db.Column(db.Integer, nullable=True)
+    content_type = db.Column(db.String(100), nullable=True)
+    response_body = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<IdempotencyKey {self.key} {self.status_code}>'
+
+# 플레이어 레이팅 (Elo). game_id 가 0 이면 전체 레이팅입니다.
+class PlayerRating(db.Model):
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), primary_key=True)
+    game_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    rating = db.Column(db.Float, nullable=False)
+    games = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # 게임별 레이팅 순위 조회
+        db.Index('ix_player_rating_game_rating', 'game_id', 'rating'),
+    )
+
+    def __repr__(self):
+        return f'<PlayerRating player={self.player_id} game={self.game_id} {self.rating:.0f}>'
+
+# 레이팅 처리 상태: 마지막으로 반영한 (기록 날짜, 기록 ID)와 전체 재계산 필요 여부
+class RatingState(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    last_date = db.Column(db.Date, nullable=True)
+    last_record_id = db.Column(db.Integer, nullable=False, default=0)
+    dirty = db.Column(db.Boolean, nullable=False, default=False)
+
     def __repr__(self):
-        return f'<MeetingParticipant {self.player.name} at {self.meeting.date}>'
\ No newline at end of file
+        return f'<RatingState {self.last_date} #{self.last_record_id} dirty={self.dirty}>'
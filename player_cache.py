@@ -0,0 +1,102 @@
+from collections import OrderedDict
+from threading import Lock
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from models import db, GameResult, PlayerVersion
+
+# 플레이어 통계 캐시
+# 플레이어 ID와 PlayerVersion.version 을 함께 키로 사용하므로, 결과가 바뀌어 버전이 올라가면
+# 이전 항목은 자연스럽게 무효화됩니다. 버전은 DB에 있으므로 여러 워커 프로세스에서도 안전합니다.
+
+DEFAULT_MAX_SIZE = 1024
+
+
+class PlayerStatsCache:
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # player_id -> (version, payload)
+        self._lock = Lock()
+
+    def get(self, player_id, version):
+        with self._lock:
+            entry = self._entries.get(player_id)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(player_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, player_id, version, payload):
+        with self._lock:
+            self._entries[player_id] = (version, payload)
+            self._entries.move_to_end(player_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round((self.hits / total) * 100, 1) if total > 0 else 0
+            }
+
+
+player_stats_cache = PlayerStatsCache()
+
+
+def bump_versions(player_ids, session=None):
+    """플레이어들의 데이터 버전을 올립니다. 호출한 쪽의 트랜잭션에서 함께 커밋됩니다."""
+    player_ids = {int(player_id) for player_id in player_ids if player_id}
+    if not player_ids:
+        return
+    if session is None:
+        session = db.session
+    # 아직 flush되지 않은 버전 행이 있으면 그대로 사용합니다
+    existing = {row.player_id: row for row in session.new if isinstance(row, PlayerVersion)}
+    with session.no_autoflush:
+        existing.update({
+            row.player_id: row
+            for row in session.query(PlayerVersion).filter(PlayerVersion.player_id.in_(list(player_ids))).all()
+        })
+    for player_id in player_ids:
+        row = existing.get(player_id)
+        if row is None:
+            session.add(PlayerVersion(player_id=player_id, version=1))
+        else:
+            row.version += 1
+
+
+# ORM을 통한 GameResult 추가/변경(클레임 포함)/삭제는 flush 시점에 자동으로 버전을 올립니다.
+# query.delete() 같은 일괄 삭제는 이 이벤트를 거치지 않으므로 rollup 모듈에서 직접 bump_versions를 호출합니다.
+@event.listens_for(Session, 'before_flush')
+def _bump_on_result_changes(session, flush_context, instances):
+    player_ids = set()
+    for obj in session.new:
+        if isinstance(obj, GameResult):
+            player_ids.add(obj.player_id)
+    for obj in session.deleted:
+        if isinstance(obj, GameResult):
+            player_ids.add(obj.player_id)
+    for obj in session.dirty:
+        if isinstance(obj, GameResult) and session.is_modified(obj):
+            history = inspect(obj).attrs.player_id.history
+            player_ids.update(history.added or ())
+            player_ids.update(history.deleted or ())
+            player_ids.add(obj.player_id)
+    player_ids.discard(None)
+    if player_ids:
+        bump_versions(player_ids, session)
@@ -0,0 +1,139 @@
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from flask import g, request, current_app
+from sqlalchemy import event
+from models import db
+from request_log import JsonMessage
+
+# 요청별 SQL 쿼리 계측
+# db 엔진의 커서 이벤트로 쿼리 수와 SQL 실행 시간을 모아 응답 헤더로 내보냅니다. (접근 로그에도 포함: request_log.py)
+# 한 요청 안에서 같은 SQL 문(바인드 값만 다른)이 QUERY_REPEAT_THRESHOLD 번 이상 실행되면 N+1 의심으로 표시합니다.
+#
+# 응답 헤더:
+#   X-Query-Count     - 실행한 쿼리 수
+#   X-Query-Time-Ms   - SQL 실행 시간 합계 (밀리초)
+#   X-Query-Repeated  - 반복 실행된 SQL 문 수 (있을 때만)
+
+DEFAULT_REPEAT_THRESHOLD = 5
+
+logger = logging.getLogger('query_stats')
+
+_local = threading.local()
+
+
+class QueryStats:
+    """쿼리 수, 실행 시간, SQL 문별 실행 횟수"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.statements = Counter()
+
+    def record(self, statement, elapsed):
+        self.count += 1
+        self.total_time += elapsed
+        self.statements[statement] += 1
+
+    def repeated(self, threshold=DEFAULT_REPEAT_THRESHOLD):
+        """threshold 번 이상 실행된 SQL 문: [(statement, 횟수), ...] 많은 순"""
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+    @property
+    def total_ms(self):
+        return round(self.total_time * 1000, 2)
+
+
+def _collectors():
+    if not hasattr(_local, 'collectors'):
+        _local.collectors = []
+    return _local.collectors
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_start_time'].pop()
+    elapsed = time.perf_counter() - started
+    for stats in _collectors():
+        stats.record(statement, elapsed)
+
+
+@contextmanager
+def collect_queries():
+    """블록 안에서 현재 스레드가 실행한 쿼리를 QueryStats 로 모읍니다."""
+    stats = QueryStats()
+    _collectors().append(stats)
+    try:
+        yield stats
+    finally:
+        _collectors().remove(stats)
+
+
+@contextmanager
+def query_budget(max_queries, label=''):
+    """
+    블록 안에서 실행한 쿼리가 max_queries 를 넘으면 AssertionError 를 발생시킵니다. (테스트용)
+
+        with query_budget(5, 'meeting detail'):
+            client.get('/api/meetings/1')
+    """
+    with collect_queries() as stats:
+        yield stats
+    if stats.count > max_queries:
+        details = '\n'.join(f'  {count}x {statement}' for statement, count in stats.statements.most_common(5))
+        raise AssertionError(f'{label or "query budget"}: {stats.count}개 쿼리 실행 (허용 {max_queries}개)\n{details}')
+
+
+def _start_request():
+    g.query_stats = QueryStats()
+    _collectors().append(g.query_stats)
+
+
+def _finish_request(response):
+    # g.query_stats 는 요청이 끝날 때까지 남겨 두어 다른 훅(metrics)이 읽을 수 있게 합니다
+    stats = g.get('query_stats')
+    if stats is None or stats not in _collectors():
+        return response
+    _collectors().remove(stats)
+
+    threshold = current_app.config.get('QUERY_REPEAT_THRESHOLD', DEFAULT_REPEAT_THRESHOLD)
+    repeated = stats.repeated(threshold)
+
+    response.headers['X-Query-Count'] = str(stats.count)
+    response.headers['X-Query-Time-Ms'] = str(stats.total_ms)
+    if repeated:
+        response.headers['X-Query-Repeated'] = str(len(repeated))
+
+    if repeated:
+        logger.warning('N+1 의심 %s', JsonMessage({
+            'method': request.method,
+            'path': request.path,
+            'queries': stats.count,
+            'sql_ms': stats.total_ms,
+            'repeated': [{'count': count, 'sql': statement[:200]} for statement, count in repeated],
+        }))
+    return response
+
+
+def _discard_request(exception=None):
+    # 예외로 after_request 를 거치지 않은 요청의 수집기를 정리합니다
+    stats = g.pop('query_stats', None)
+    if stats is not None and stats in _collectors():
+        _collectors().remove(stats)
+
+
+def init_app(app):
+    """앱의 db 엔진에 쿼리 계측 이벤트를 등록하고 요청 훅을 연결합니다."""
+    with app.app_context():
+        engine = db.engine
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_discard_request)
@@ -0,0 +1,281 @@
+from itertools import groupby
+from threading import Lock, Thread
+import logging
+import os
+import numpy as np
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from http_cache import table_versions
+from models import db, GameRecord, GameResult, PlayerRating, RatingState
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# 플레이어 레이팅 엔진 (다인전 Elo)
+# 한 게임 기록 안의 모든 등록 플레이어 쌍을 비교합니다. 승자가 패자보다 위이고, 모든 결과에 점수가 있으면
+# 같은 승패 안에서는 점수가 높은 쪽이 위입니다. 전체 레이팅(game_id=0)과 게임별 레이팅을 함께 갱신합니다.
+#
+# 새 기록은 (날짜, 기록 ID) 순서상 마지막 처리 지점 이후라면 저장하는 트랜잭션에서 바로 반영합니다.
+# 과거 날짜의 기록이 추가되거나 결과가 삭제/수정되면 상태를 dirty로 표시합니다. 전체 재계산은 조회 요청에서 하지 않고,
+# 조회는 기존 레이팅을 stale 표시와 함께 바로 돌려주면서 백그라운드 재계산을 예약합니다. (RATINGS_BACKGROUND_REPLAY)
+# 재계산은 프로세스마다 스레드 하나, 워커 프로세스 사이에서는 인스턴스 폴더의 잠금 파일로 한 번에 하나만 실행합니다.
+# 백그라운드 재계산을 끈 환경에서는 `flask --app app rebuild-ratings --if-dirty` 를 주기적으로 실행하세요.
+
+INITIAL_RATING = 1500.0
+K_FACTOR = 32.0
+REPLAY_CHUNK_SIZE = 10000
+GLOBAL_GAME_ID = 0
+
+# 재계산하는 동안 바뀌었는지 확인하는 원본 테이블 (http_cache 의 테이블 변경 카운터)
+SOURCE_TABLES = (GameRecord.__tablename__, GameResult.__tablename__)
+REPLAY_LOCK_FILE = 'ratings-replay.lock'
+
+logger = logging.getLogger(__name__)
+
+_replay_running = Lock()
+
+
+def elo_deltas(ratings, winners, scores):
+    """
+    한 기록의 플레이어 레이팅 변화량을 계산합니다. (NumPy 벡터화)
+    ratings: 현재 레이팅 배열, winners: 승리 여부 배열, scores: 순위 비교용 점수 배열
+    """
+    n = len(ratings)
+    # expected[i, j]: i가 j보다 위일 기대값
+    expected = 1.0 / (1.0 + 10.0 ** ((ratings[None, :] - ratings[:, None]) / 400.0))
+    above = (winners[:, None] > winners[None, :]) | (
+        (winners[:, None] == winners[None, :]) & (scores[:, None] > scores[None, :])
+    )
+    tie = (winners[:, None] == winners[None, :]) & (scores[:, None] == scores[None, :])
+    actual = np.where(above, 1.0, np.where(tie, 0.5, 0.0))
+    np.fill_diagonal(expected, 0.5)
+    np.fill_diagonal(actual, 0.5)
+    return K_FACTOR / (n - 1) * (actual - expected).sum(axis=1)
+
+
+def _prepare(results):
+    # results: [(player_id, is_winner, score)] -> (player_ids, winners, scores) 또는 비교할 수 없으면 None
+    seen = set()
+    unique = []
+    for player_id, is_winner, score in results:
+        if player_id and player_id not in seen:
+            seen.add(player_id)
+            unique.append((player_id, is_winner, score))
+    if len(unique) < 2:
+        return None
+    use_scores = all(score is not None for _, _, score in unique)
+    player_ids = np.array([p for p, _, _ in unique], dtype=np.int64)
+    winners = np.array([1 if w else 0 for _, w, _ in unique], dtype=np.int8)
+    scores = np.array([s if use_scores else 0 for _, _, s in unique], dtype=np.float64)
+    if winners.min() == winners.max() and scores.min() == scores.max():
+        return None  # 모두 동률이면 정보가 없음
+    return player_ids, winners, scores
+
+
+def _state():
+    state = db.session.get(RatingState, 1)
+    if state is None:
+        # 처음 사용할 때는 기존 기록 전체를 재계산해야 합니다
+        state = RatingState(id=1, last_date=None, last_record_id=0, dirty=True)
+        db.session.add(state)
+    return state
+
+
+def mark_dirty(session=None):
+    """기록 순서가 바뀌거나 결과가 삭제/수정되어 전체 재계산이 필요함을 표시합니다."""
+    session = session if session is not None else db.session
+    with session.no_autoflush:
+        state = session.get(RatingState, 1)
+    if state is None:
+        state = RatingState(id=1, last_date=None, last_record_id=0, dirty=True)
+        session.add(state)
+    state.dirty = True
+
+
+def records_added(records):
+    """
+    새로 저장한 기록을 레이팅에 반영합니다. 호출한 쪽의 트랜잭션에서 함께 커밋됩니다.
+    records: {'record_id', 'game_id', 'date', 'results': [(player_id, is_winner, score)]} 목록
+    """
+    state = _state()
+    if state.dirty or not records:
+        return
+    records = sorted(records, key=lambda r: (r['date'], r['record_id']))
+    first = records[0]
+    if state.last_date is not None and (first['date'], first['record_id']) < (state.last_date, state.last_record_id):
+        # 과거 날짜의 기록: 이후 기록의 레이팅이 모두 달라지므로 전체 재계산
+        state.dirty = True
+        return
+
+    prepared = [(record, _prepare(record['results'])) for record in records]
+    player_ids = {int(p) for _, data in prepared if data for p in data[0]}
+    game_ids = {GLOBAL_GAME_ID} | {int(record['game_id']) for record, data in prepared if data}
+    store = {}
+    if player_ids:
+        store = {
+            (row.player_id, row.game_id): row
+            for row in PlayerRating.query.filter(
+                PlayerRating.player_id.in_(list(player_ids)), PlayerRating.game_id.in_(list(game_ids))
+            ).all()
+        }
+
+    for record, data in prepared:
+        if data is None:
+            continue
+        ids, winners, scores = data
+        for game_id in (GLOBAL_GAME_ID, int(record['game_id'])):
+            rows = []
+            for player_id in ids:
+                row = store.get((int(player_id), game_id))
+                if row is None:
+                    row = PlayerRating(player_id=int(player_id), game_id=game_id, rating=INITIAL_RATING, games=0)
+                    db.session.add(row)
+                    store[(int(player_id), game_id)] = row
+                rows.append(row)
+            deltas = elo_deltas(np.array([row.rating for row in rows]), winners, scores)
+            for row, delta in zip(rows, deltas):
+                row.rating = float(row.rating + delta)
+                row.games += 1
+
+    last = records[-1]
+    state.last_date = last['date']
+    state.last_record_id = last['record_id']
+
+
+def replay():
+    """
+    전체 기록을 날짜순으로 다시 처리하여 레이팅 테이블을 새로 만듭니다. 커밋은 호출한 쪽에서 합니다.
+    레이팅은 메모리의 NumPy 배열에 누적하고 마지막에 한 번에 저장합니다.
+    """
+    state = _state()
+    result = db.session.execute(db.select(
+        GameRecord.id, GameRecord.date, GameRecord.game_id,
+        GameResult.player_id, GameResult.is_winner, GameResult.score
+    ).join(
+        GameResult, GameResult.game_record_id == GameRecord.id
+    ).where(
+        GameResult.player_id.isnot(None)
+    ).order_by(
+        GameRecord.date, GameRecord.id, GameResult.id
+    ).execution_options(stream_results=True, yield_per=REPLAY_CHUNK_SIZE))
+
+    ratings = {}  # game_id -> (레이팅 배열, 게임 수 배열), 플레이어 ID로 인덱싱
+    last_date, last_record_id = None, 0
+
+    def arrays(game_id, max_player_id):
+        current = ratings.get(game_id)
+        if current is None or len(current[0]) <= max_player_id:
+            size = max(max_player_id + 1, 64 if current is None else len(current[0]) * 2)
+            grown = (np.full(size, INITIAL_RATING), np.zeros(size, dtype=np.int64))
+            if current is not None:
+                grown[0][:len(current[0])] = current[0]
+                grown[1][:len(current[1])] = current[1]
+            ratings[game_id] = current = grown
+        return current
+
+    for (record_id, record_date, game_id), rows in groupby(result, key=lambda row: (row[0], row[1], row[2])):
+        last_date, last_record_id = record_date, record_id
+        data = _prepare([(row.player_id, row.is_winner, row.score) for row in rows])
+        if data is None:
+            continue
+        ids, winners, scores = data
+        max_player_id = int(ids.max())
+        for key in (GLOBAL_GAME_ID, game_id):
+            values, games = arrays(key, max_player_id)
+            values[ids] += elo_deltas(values[ids], winners, scores)
+            games[ids] += 1
+
+    PlayerRating.query.delete()
+    params = []
+    for game_id, (values, games) in ratings.items():
+        for player_id in np.nonzero(games)[0]:
+            params.append({
+                'player_id': int(player_id), 'game_id': int(game_id),
+                'rating': float(values[player_id]), 'games': int(games[player_id])
+            })
+    for i in range(0, len(params), REPLAY_CHUNK_SIZE):
+        db.session.execute(PlayerRating.__table__.insert(), params[i:i + REPLAY_CHUNK_SIZE])
+
+    state.last_date = last_date
+    state.last_record_id = last_record_id
+    state.dirty = False
+    return len(params)
+
+
+def is_stale():
+    """전체 재계산을 기다리는 중이면 True (아직 한 번도 계산하지 않은 경우 포함)"""
+    state = db.session.get(RatingState, 1)
+    return state is None or state.dirty
+
+
+def refresh():
+    """
+    재계산이 필요하면 전체를 다시 계산하고 커밋합니다. 저장한 레이팅 수를 반환하고, 필요 없으면 None 을 반환합니다.
+    계산하는 동안 다른 요청이 기록/결과를 바꿨으면 그 변경이 빠진 결과이므로 롤백하고 dirty 로 남겨 둡니다. (None)
+    """
+    if not is_stale():
+        return None
+    before = table_versions(SOURCE_TABLES)
+    count = replay()
+    # replay 의 DELETE 로 쓰기 잠금을 잡은 뒤에 다시 읽으므로 이후의 변경은 이 트랜잭션이 끝날 때까지 커밋될 수 없습니다
+    if table_versions(SOURCE_TABLES) != before:
+        db.session.rollback()
+        return None
+    db.session.commit()
+    return count
+
+
+def _replay_job(app):
+    try:
+        with app.app_context():
+            os.makedirs(app.instance_path, exist_ok=True)
+            with open(os.path.join(app.instance_path, REPLAY_LOCK_FILE), 'w') as lock_file:
+                if fcntl:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        return  # 다른 워커 프로세스가 재계산 중
+                count = refresh()
+                if count is not None:
+                    logger.info('레이팅 재계산 완료: %d개 레이팅', count)
+    except Exception:
+        logger.exception('레이팅 백그라운드 재계산 실패')
+    finally:
+        _replay_running.release()
+
+
+def schedule_replay(app):
+    """백그라운드 스레드에서 전체 재계산을 시작합니다. 이 프로세스에서 이미 실행 중이면 None 을 반환합니다."""
+    if not _replay_running.acquire(blocking=False):
+        return None
+    thread = Thread(target=_replay_job, args=(app,), name='ratings-replay', daemon=True)
+    thread.start()
+    return thread
+
+
+def request_refresh():
+    """
+    조회 요청에서 호출합니다. 재계산을 기다리는 중이면 백그라운드 재계산을 예약하고 True 를 반환합니다.
+    조회는 재계산을 기다리지 않고 기존 레이팅을 응답하며, 반환값을 응답의 stale 로 알려 줍니다.
+    """
+    if not is_stale():
+        return False
+    if current_app.config.get('RATINGS_BACKGROUND_REPLAY', True):
+        schedule_replay(current_app._get_current_object())
+    return True
+
+
+# ORM을 통한 결과 수정(클레임 등)이나 삭제는 과거 레이팅을 바꾸므로 재계산을 표시합니다.
+@event.listens_for(Session, 'before_flush')
+def _mark_dirty_on_result_changes(session, flush_context, instances):
+    for obj in session.deleted:
+        if isinstance(obj, GameResult):
+            mark_dirty(session)
+            return
+    for obj in session.dirty:
+        if isinstance(obj, GameResult) and session.is_modified(obj):
+            mark_dirty(session)
+            return
@@ -0,0 +1,229 @@
+from datetime import datetime
+from models import db, Game, Player, Meeting, GameRecord, GameResult
+from rollup import records_added, IN_CHUNK_SIZE
+import ratings
+
+# 게임 기록 검증/저장 모듈
+# 여러 기록이 참조하는 게임/플레이어/모임 ID를 IN 쿼리로 한 번에 확인하고,
+# 기록과 결과를 일괄 INSERT ... RETURNING 으로 저장합니다. 커밋은 호출한 쪽에서 합니다.
+
+# 점수는 SQLite INTEGER(부호 있는 64비트) 범위여야 합니다
+MIN_SCORE = -2 ** 63
+MAX_SCORE = 2 ** 63 - 1
+
+# 미등록 플레이어 이름의 최대 길이 (GameResult.player_name 컬럼 크기)
+MAX_PLAYER_NAME_LENGTH = 100
+
+
+class RecordError(Exception):
+    """게임 기록 검증 실패. status_code는 API 응답 코드로 사용합니다."""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def _as_id(value, message):
+    # 정수 또는 숫자 문자열(폼 입력)을 ID로 변환합니다. 값이 없으면 None
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool):
+        raise RecordError(message)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise RecordError(message)
+
+
+def _as_score(value):
+    # 정수, 정수 값의 실수, 숫자 문자열(폼 입력)을 점수로 변환합니다. 값이 없으면 None (점수 없음)
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise RecordError(f'잘못된 점수: {value}')
+    try:
+        score = int(value)
+    except (TypeError, ValueError):
+        raise RecordError(f'잘못된 점수: {value}')
+    if not MIN_SCORE <= score <= MAX_SCORE:
+        raise RecordError(f'잘못된 점수: {value}')
+    return score
+
+
+def _as_player_name(value):
+    # 미등록 플레이어 이름은 문자열만 받습니다. 비어 있거나 공백뿐이면 None (이름 없음)
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise RecordError('플레이어 이름 형식이 올바르지 않습니다.')
+    value = value.strip()
+    if len(value) > MAX_PLAYER_NAME_LENGTH:
+        raise RecordError(f'플레이어 이름은 {MAX_PLAYER_NAME_LENGTH}자 이하여야 합니다.')
+    return value or None
+
+
+def parse_record(data, meeting_id=None, default_date=None):
+    """
+    요청 데이터 한 건을 정규화된 딕셔너리로 변환합니다. (DB 조회 없음)
+    meeting_id를 주면 요청 본문의 meeting_id 대신 사용합니다. 0 이하는 모임 없음으로 처리합니다.
+    """
+    if not isinstance(data, dict) or 'game_id' not in data or 'results' not in data:
+        raise RecordError('필수 데이터가 누락되었습니다.')
+
+    record_date = data.get('date') or default_date or datetime.now().strftime('%Y-%m-%d')
+    try:
+        parsed_date = datetime.strptime(record_date, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise RecordError('날짜 형식이 올바르지 않습니다.')
+
+    game_id = _as_id(data['game_id'], '잘못된 게임 ID입니다.')
+    if meeting_id is None:
+        meeting_id = _as_id(data.get('meeting_id'), '잘못된 모임 ID입니다.')
+    if not meeting_id or meeting_id <= 0:
+        meeting_id = None
+
+    results = data['results']
+    if not isinstance(results, list):
+        raise RecordError('게임 결과 형식이 올바르지 않습니다.')
+    if len(results) == 0:
+        raise RecordError('최소 한 명 이상의 플레이어를 추가해야 합니다.')
+
+    parsed_results = []
+    for result_data in results:
+        if not isinstance(result_data, dict):
+            raise RecordError('게임 결과 형식이 올바르지 않습니다.')
+        player_id = _as_id(result_data.get('player_id'), f"잘못된 플레이어 ID: {result_data.get('player_id')}")
+        player_name = _as_player_name(result_data.get('player_name'))
+
+        # player_id가 0 이하이거나 없으면 미등록 플레이어로 간주
+        if not player_id or player_id <= 0:
+            player_id = None
+            # 플레이어 정보가 없는 경우
+            if not player_name:
+                continue
+
+        parsed_results.append({
+            'player_id': player_id,
+            'player_name': player_name if not player_id else None,
+            'score': _as_score(result_data.get('score', 0)),
+            'is_winner': bool(result_data.get('is_winner', False))
+        })
+
+    return {
+        'game_id': game_id,
+        'meeting_id': meeting_id,
+        'date': parsed_date,
+        'date_str': record_date,
+        'results': parsed_results
+    }
+
+
+def _existing_ids(model, ids):
+    existing = set()
+    ids = list(ids)
+    for i in range(0, len(ids), IN_CHUNK_SIZE):
+        existing.update(
+            row_id for (row_id,) in db.session.query(model.id).filter(model.id.in_(ids[i:i + IN_CHUNK_SIZE]))
+        )
+    return existing
+
+
+def validate_records(records):
+    """
+    정규화된 기록 목록이 참조하는 ID가 존재하는지 테이블별 IN 쿼리 한 번으로 확인합니다.
+    각 항목에 대해 기록 자체 또는 RecordError를 담은 목록을 반환합니다.
+    """
+    games = _existing_ids(Game, {r['game_id'] for r in records})
+    meetings = _existing_ids(Meeting, {r['meeting_id'] for r in records if r['meeting_id']})
+    players = _existing_ids(Player, {
+        result['player_id'] for r in records for result in r['results'] if result['player_id']
+    })
+
+    validated = []
+    for record in records:
+        if record['game_id'] not in games:
+            validated.append(RecordError('존재하지 않는 게임입니다.', 404))
+            continue
+        if record['meeting_id'] and record['meeting_id'] not in meetings:
+            validated.append(RecordError('존재하지 않는 모임입니다.', 404))
+            continue
+        missing = [result['player_id'] for result in record['results']
+                   if result['player_id'] and result['player_id'] not in players]
+        if missing:
+            validated.append(RecordError(f'존재하지 않는 플레이어 ID: {missing[0]}', 404))
+            continue
+        validated.append(record)
+    return validated
+
+
+def _insert_returning_ids(table, params):
+    # 다중 행 INSERT ... RETURNING id 로 저장하고 ID를 입력 순서대로 반환합니다.
+    # SQLite는 한 문장 안의 행에 VALUES 순서대로 증가하는 rowid를 부여하지만 RETURNING 순서는 보장하지 않으므로
+    # 정렬하여 입력 순서에 맞춥니다. (sort_by_parameter_order 는 SQLite에서 행마다 INSERT를 실행합니다)
+    return sorted(db.session.scalars(table.insert().returning(table.c.id), params).all())
+
+
+def insert_records(records):
+    """
+    검증된 기록과 결과를 일괄 삽입하고 통계 롤업과 레이팅을 갱신합니다.
+    각 기록에 대해 (game_record_id, [game_result_id, ...]) 목록을 입력 순서대로 반환합니다.
+    """
+    if not records:
+        return []
+
+    record_ids = _insert_returning_ids(
+        GameRecord.__table__,
+        [{'game_id': r['game_id'], 'meeting_id': r['meeting_id'], 'date': r['date']} for r in records]
+    )
+
+    result_params = []
+    for record_id, record in zip(record_ids, records):
+        for result in record['results']:
+            result_params.append({
+                'game_record_id': record_id,
+                'player_id': result['player_id'],
+                'player_name': result['player_name'],
+                'score': result['score'],
+                'is_winner': result['is_winner'],
+                'record_date': record['date']
+            })
+
+    result_ids = []
+    if result_params:
+        result_ids = _insert_returning_ids(GameResult.__table__, result_params)
+
+    # 통계 롤업 갱신 (같은 트랜잭션)
+    records_added([
+        (record_id, record['game_id'], record['meeting_id'], record['date'],
+         [(result['player_id'], result['is_winner']) for result in record['results']])
+        for record_id, record in zip(record_ids, records)
+    ])
+
+    # 레이팅 갱신 (같은 트랜잭션, 과거 날짜 기록이면 재계산 표시)
+    ratings.records_added([{
+        'record_id': record_id,
+        'game_id': record['game_id'],
+        'date': record['date'],
+        'results': [(result['player_id'], result['is_winner'], result['score']) for result in record['results']]
+    } for record_id, record in zip(record_ids, records)])
+
+    saved = []
+    offset = 0
+    for record_id, record in zip(record_ids, records):
+        count = len(record['results'])
+        saved.append((record_id, list(result_ids[offset:offset + count])))
+        offset += count
+    return saved
+
+
+def save_record(data, meeting_id=None):
+    """
+    기록 한 건을 정규화, 검증, 저장합니다. 검증 실패 시 RecordError를 발생시킵니다.
+    (game_record_id, [game_result_id, ...], 정규화된 기록)을 반환합니다.
+    """
+    validated = validate_records([parse_record(data, meeting_id=meeting_id)])[0]
+    if isinstance(validated, RecordError):
+        raise validated
+    record_id, result_ids = insert_records([validated])[0]
+    return record_id, result_ids, validated
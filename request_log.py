@@ -0,0 +1,115 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import time
+from flask import g, request, current_app
+
+# 요청 로깅 설정
+# 메시지 포맷은 로그를 남긴 스레드에서(요청 컨텍스트 안에서) 하고, 출력만 큐를 거쳐 별도 스레드(QueueListener)에서 처리합니다.
+# 레벨이 꺼져 있는 로그는 QueueHandler 에 도달하지 않으므로 포맷 비용이 들지 않습니다.
+# 요청마다 한 줄의 JSON 접근 로그(메서드, 경로, 상태, 처리 시간, 응답 크기, SQL 쿼리 수/시간)를 남기고,
+# 헤더와 본문은 LOG_SAMPLE_RATE 비율의 요청에만 포함합니다.
+#
+# 설정:
+#   LOG_LEVEL        - 루트 로거 레벨 (기본 INFO)
+#   LOG_ASYNC        - 큐 기반 비동기 출력 사용 여부 (기본 True)
+#   LOG_ACCESS       - 접근 로그 사용 여부 (기본 True)
+#   LOG_SAMPLE_RATE  - 헤더/본문을 함께 기록할 요청 비율 (0.0 ~ 1.0, 기본 0.01, 운영 환경은 같은 이름의 환경 변수, 기본 0.0)
+
+LOG_FORMAT = '%(asctime)s %(levelname)s %(name)s %(message)s'
+BODY_LIMIT = 1024
+HIDDEN_HEADERS = {'authorization', 'cookie', 'idempotency-key'}
+
+access_logger = logging.getLogger('access')
+
+_listener = None
+
+
+class JsonMessage:
+    """str() 할 때 JSON으로 직렬화되는 로그 인자. 레벨이 꺼져 있으면 직렬화하지 않습니다."""
+
+    def __init__(self, fields):
+        self.fields = fields
+
+    def __str__(self):
+        return json.dumps(self.fields, ensure_ascii=False, default=str)
+
+
+def configure_logging(app):
+    """LOG_* 설정에 따라 루트 로거의 핸들러를 구성합니다."""
+    global _listener
+    level = app.config.get('LOG_LEVEL', 'INFO')
+    root = logging.getLogger()
+    root.setLevel(level)
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    if app.config.get('LOG_ASYNC', True):
+        log_queue = queue.SimpleQueue()
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+    else:
+        root.addHandler(stream_handler)
+
+
+@atexit.register
+def _stop_listener():
+    # 종료 시 큐에 남은 레코드를 모두 출력합니다
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _start_request():
+    g.request_log_started = time.perf_counter()
+
+
+def _sampled_details():
+    details = {
+        'headers': {key: value for key, value in request.headers.items() if key.lower() not in HIDDEN_HEADERS}
+    }
+    if request.method in ('POST', 'PUT', 'PATCH'):
+        details['body'] = request.get_data(cache=True, as_text=True)[:BODY_LIMIT]
+    return details
+
+
+def _access_log(response):
+    started = g.pop('request_log_started', None)
+    if started is None or not access_logger.isEnabledFor(logging.INFO):
+        return response
+    fields = {
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'ms': round((time.perf_counter() - started) * 1000, 2),
+        'bytes': response.content_length,
+    }
+    stats = g.get('query_stats')
+    if stats is not None:
+        fields['queries'] = stats.count
+        fields['sql_ms'] = stats.total_ms
+    sample_rate = current_app.config.get('LOG_SAMPLE_RATE', 0.0)
+    if sample_rate and random.random() < sample_rate:
+        fields.update(_sampled_details())
+    access_logger.info('%s', JsonMessage(fields))
+    return response
+
+
+def init_app(app):
+    """로깅을 구성하고 접근 로그 훅을 등록합니다."""
+    configure_logging(app)
+    if app.config.get('LOG_ACCESS', True):
+        app.before_request(_start_request)
+        app.after_request(_access_log)
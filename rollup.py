@@ -0,0 +1,495 @@
+from collections import defaultdict
+from sqlalchemy import func, case, distinct, extract, inspect, literal, tuple_
+from player_cache import bump_versions
+import analytics
+import ratings
+from models import (db, GameRecord, GameResult, GameStat, PlayerStat, PlayerMeetingStat,
+                    GameRecordStat, PlayerCountStat, MonthlyGameStat, MonthlyPlayerGameStat,
+                    MonthlyPlayerMeetingStat, MonthlyPlayerCountStat, HeadToHeadStat)
+
+# 통계 롤업 테이블 유지 모듈
+# 모든 함수는 호출한 라우트와 같은 세션(트랜잭션)에서 동작하며 커밋은 호출한 쪽에서 합니다.
+
+# SQLite 바인드 변수 제한을 넘지 않도록 IN 절을 나누는 크기
+IN_CHUNK_SIZE = 500
+
+# 상대 전적의 전체 게임 합계 행 game_id
+ALL_GAMES_ID = 0
+
+
+def month_key(value):
+    """날짜를 월별 롤업 키(YYYYMM 정수)로 변환합니다."""
+    return value.year * 100 + value.month
+
+
+def _chunks(values, size=IN_CHUNK_SIZE):
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def _load(model, column, keys):
+    # 키 목록에 해당하는 롤업 행을 IN 쿼리로 한 번에 불러옵니다
+    rows = {}
+    for chunk in _chunks(keys):
+        for row in model.query.filter(column.in_(chunk)).all():
+            rows[getattr(row, column.key)] = row
+    return rows
+
+
+def _drop(row):
+    if inspect(row).pending:
+        db.session.expunge(row)
+    else:
+        db.session.delete(row)
+
+
+def _add_counts(model, key_names, value_names, deltas):
+    """
+    복합 키 롤업 테이블에 증감분을 반영합니다. 첫 번째 값이 0 이하가 되면 행을 삭제합니다.
+    deltas: {키 튜플: 값 증감 튜플}
+    """
+    key_columns = [getattr(model, name) for name in key_names]
+    rows = {}
+    for chunk in _chunks(deltas.keys()):
+        # SQLite 는 행 값 IN 목록에 인덱스를 쓰지 않으므로 첫 번째 키 컬럼 IN 조건을 함께 걸어
+        # 기본 키 인덱스로 범위를 좁힙니다
+        for row in model.query.filter(
+            key_columns[0].in_({key[0] for key in chunk}), tuple_(*key_columns).in_(chunk)
+        ).all():
+            rows[tuple(getattr(row, name) for name in key_names)] = row
+    for key, values in deltas.items():
+        if not any(values):
+            continue
+        row = rows.get(key)
+        if row is None:
+            row = model(**dict(zip(key_names, key)), **{name: 0 for name in value_names})
+            db.session.add(row)
+        for name, delta in zip(value_names, values):
+            setattr(row, name, getattr(row, name) + delta)
+        if getattr(row, value_names[0]) <= 0:
+            _drop(row)
+
+
+def _apply(game_deltas, player_deltas, pair_deltas, record_deltas, monthly):
+    """
+    롤업 테이블에 증감분을 반영합니다.
+
+    game_deltas: {game_id: 플레이 횟수 증감}
+    player_deltas: {player_id: [플레이 증감, 승리 증감]}
+    pair_deltas: {(player_id, meeting_id): 결과 수 증감}
+    record_deltas: {game_record_id: 플레이어 수 증감}
+    monthly: 월별 롤업 증감분 (_Monthly)
+    """
+    # 게임별 플레이 횟수
+    games = _load(GameStat, GameStat.game_id, game_deltas.keys())
+    for game_id, delta in game_deltas.items():
+        stat = games.get(game_id)
+        if stat is None:
+            stat = GameStat(game_id=game_id, play_count=0)
+            db.session.add(stat)
+        stat.play_count += delta
+        if stat.play_count <= 0:
+            _drop(stat)
+
+    # 플레이어-모임 쌍: 0 <-> 1 전환이 참여 모임 수를 바꿉니다
+    meeting_deltas = defaultdict(int)
+    by_player = defaultdict(dict)
+    for (player_id, meeting_id), delta in pair_deltas.items():
+        by_player[player_id][meeting_id] = delta
+    # 관련 플레이어와 모임의 쌍을 한 번에 불러옵니다 (필요 이상의 쌍은 무시)
+    meeting_ids = list({meeting_id for _, meeting_id in pair_deltas.keys()})
+    existing = {}
+    for chunk in _chunks(by_player.keys()):
+        for pair in PlayerMeetingStat.query.filter(
+            PlayerMeetingStat.player_id.in_(chunk),
+            PlayerMeetingStat.meeting_id.in_(meeting_ids)
+        ).all():
+            existing[(pair.player_id, pair.meeting_id)] = pair
+    for player_id, deltas in by_player.items():
+        for meeting_id, delta in deltas.items():
+            pair = existing.get((player_id, meeting_id))
+            if pair is None:
+                pair = PlayerMeetingStat(player_id=player_id, meeting_id=meeting_id, result_count=0)
+                db.session.add(pair)
+            before = pair.result_count
+            pair.result_count += delta
+            if before <= 0 < pair.result_count:
+                meeting_deltas[player_id] += 1
+            elif pair.result_count <= 0 < before:
+                meeting_deltas[player_id] -= 1
+            if pair.result_count <= 0:
+                _drop(pair)
+
+    # 플레이어별 승리/플레이/참여 모임 수
+    player_ids = set(player_deltas.keys()) | set(meeting_deltas.keys())
+    players = _load(PlayerStat, PlayerStat.player_id, player_ids)
+    for player_id in player_ids:
+        plays, wins = player_deltas.get(player_id, (0, 0))
+        stat = players.get(player_id)
+        if stat is None:
+            stat = PlayerStat(player_id=player_id, plays=0, wins=0, meeting_count=0)
+            db.session.add(stat)
+        stat.plays += plays
+        stat.wins += wins
+        stat.meeting_count += meeting_deltas.get(player_id, 0)
+        if stat.plays <= 0:
+            _drop(stat)
+
+    # 게임 기록별 플레이어 수와 플레이어 수별 히스토그램
+    records = _load(GameRecordStat, GameRecordStat.game_record_id, record_deltas.keys())
+    histogram_deltas = defaultdict(int)
+    for record_id, delta in record_deltas.items():
+        if delta == 0:
+            continue
+        stat = records.get(record_id)
+        if stat is None:
+            stat = GameRecordStat(game_record_id=record_id, player_count=0)
+            db.session.add(stat)
+        before = stat.player_count
+        stat.player_count += delta
+        month = monthly.record_months[record_id]
+        if before > 0:
+            histogram_deltas[before] -= 1
+            monthly.histogram[(month, before)][0] -= 1
+        if stat.player_count > 0:
+            histogram_deltas[stat.player_count] += 1
+            monthly.histogram[(month, stat.player_count)][0] += 1
+        else:
+            _drop(stat)
+
+    buckets = _load(PlayerCountStat, PlayerCountStat.player_count, histogram_deltas.keys())
+    for player_count, delta in histogram_deltas.items():
+        if delta == 0:
+            continue
+        bucket = buckets.get(player_count)
+        if bucket is None:
+            bucket = PlayerCountStat(player_count=player_count, record_count=0)
+            db.session.add(bucket)
+        bucket.record_count += delta
+        if bucket.record_count <= 0:
+            _drop(bucket)
+
+    # 월별 롤업 (기간 통계용)
+    _add_counts(MonthlyGameStat, ('month', 'game_id'), ('play_count',), monthly.games)
+    _add_counts(MonthlyPlayerGameStat, ('month', 'player_id', 'game_id'), ('plays', 'wins'), monthly.player_games)
+    _add_counts(MonthlyPlayerMeetingStat, ('month', 'player_id', 'meeting_id'), ('result_count',), monthly.pairs)
+    _add_counts(MonthlyPlayerCountStat, ('month', 'player_count'), ('record_count',), monthly.histogram)
+
+
+def _head_to_head_deltas(records, sign, only_player=None):
+    """
+    게임 기록들의 플레이어 쌍별 상대 전적 증감분을 계산합니다.
+    records: (game_id, [(player_id, is_winner), ...]) 목록. only_player를 주면 그 플레이어가 포함된 쌍만 계산합니다.
+    반환: {(player_id, opponent_id, game_id): [플레이 증감, 승리 증감, 패배 증감]}
+    """
+    deltas = defaultdict(lambda: [0, 0, 0])
+    for game_id, results in records:
+        # 한 기록에 같은 플레이어가 여러 번 있으면 한 번만 (한 번이라도 이겼으면 승리)
+        winners = {}
+        for player_id, is_winner in results:
+            if player_id:
+                player_id = int(player_id)
+                winners[player_id] = winners.get(player_id, False) or bool(is_winner)
+        for player_id, won in winners.items():
+            for opponent_id, opponent_won in winners.items():
+                if player_id == opponent_id:
+                    continue
+                if only_player is not None and only_player not in (player_id, opponent_id):
+                    continue
+                for key_game_id in (ALL_GAMES_ID, int(game_id)):
+                    delta = deltas[(player_id, opponent_id, key_game_id)]
+                    delta[0] += sign
+                    if won and not opponent_won:
+                        delta[1] += sign
+                    elif opponent_won and not won:
+                        delta[2] += sign
+    return deltas
+
+
+def _apply_head_to_head(deltas):
+    _add_counts(HeadToHeadStat, ('player_id', 'opponent_id', 'game_id'), ('plays', 'wins', 'losses'), deltas)
+
+
+def _group_by_record(rows):
+    # _removed_rows 결과를 기록별 (game_id, [(player_id, is_winner), ...]) 목록으로 묶습니다
+    records = {}
+    for record_id, _, player_id, is_winner, game_id, _ in rows:
+        records.setdefault(record_id, (game_id, []))[1].append((player_id, is_winner))
+    return list(records.values())
+
+
+class _Monthly:
+    # 월별 롤업 증감분. 키의 첫 번째 값은 month_key 입니다.
+    def __init__(self):
+        self.record_months = {}                          # game_record_id -> month
+        self.games = defaultdict(lambda: [0])            # (month, game_id)
+        self.player_games = defaultdict(lambda: [0, 0])  # (month, player_id, game_id)
+        self.pairs = defaultdict(lambda: [0])            # (month, player_id, meeting_id)
+        self.histogram = defaultdict(lambda: [0])        # (month, player_count)
+
+    def add_record(self, record_id, game_id, record_date, sign):
+        month = month_key(record_date)
+        self.record_months[record_id] = month
+        self.games[(month, int(game_id))][0] += sign
+
+
+def _result_deltas(rows, sign, monthly):
+    # rows: (game_record_id, meeting_id, player_id, is_winner, game_id, date) 튜플 목록
+    player_deltas = defaultdict(lambda: [0, 0])
+    pair_deltas = defaultdict(int)
+    record_deltas = defaultdict(int)
+    for record_id, meeting_id, player_id, is_winner, game_id, record_date in rows:
+        record_deltas[record_id] += sign
+        month = month_key(record_date)
+        monthly.record_months[record_id] = month
+        if not player_id:
+            continue
+        player_id = int(player_id)  # 폼 입력은 문자열로 들어옵니다
+        player_deltas[player_id][0] += sign
+        monthly.player_games[(month, player_id, int(game_id))][0] += sign
+        if is_winner:
+            player_deltas[player_id][1] += sign
+            monthly.player_games[(month, player_id, int(game_id))][1] += sign
+        if meeting_id:
+            pair_deltas[(player_id, meeting_id)] += sign
+            monthly.pairs[(month, player_id, meeting_id)][0] += sign
+    return player_deltas, pair_deltas, record_deltas
+
+
+def record_added(record, results):
+    """
+    새 게임 기록과 그 결과를 롤업에 반영합니다.
+    record는 ID가 할당된(flush된) GameRecord, results는 함께 저장한 GameResult 목록입니다.
+    """
+    records_added([(record.id, record.game_id, record.meeting_id, record.date,
+                    [(result.player_id, result.is_winner) for result in results])])
+
+
+def records_added(records):
+    """
+    일괄 삽입한 게임 기록들을 롤업에 반영합니다.
+    records: (game_record_id, game_id, meeting_id, date, [(player_id, is_winner), ...]) 튜플 목록
+    """
+    game_deltas = defaultdict(int)
+    monthly = _Monthly()
+    rows = []
+    for record_id, game_id, meeting_id, record_date, results in records:
+        game_deltas[int(game_id)] += 1
+        monthly.add_record(record_id, game_id, record_date, 1)
+        rows.extend((record_id, meeting_id, player_id, is_winner, game_id, record_date)
+                    for player_id, is_winner in results)
+    player_deltas, pair_deltas, record_deltas = _result_deltas(rows, 1, monthly)
+    _apply(game_deltas, player_deltas, pair_deltas, record_deltas, monthly)
+    _apply_head_to_head(_head_to_head_deltas(
+        [(game_id, results) for _, game_id, _, _, results in records], 1
+    ))
+    # 일괄 삽입은 flush 이벤트를 거치지 않으므로 플레이어 데이터 버전을 직접 올립니다
+    bump_versions(player_deltas.keys())
+
+
+def _removed_rows(condition):
+    # 삭제될 결과를 _result_deltas 형식으로 조회합니다
+    return db.session.query(
+        GameResult.game_record_id, GameRecord.meeting_id, GameResult.player_id, GameResult.is_winner,
+        GameRecord.game_id, GameRecord.date
+    ).join(
+        GameRecord, GameResult.game_record_id == GameRecord.id
+    ).filter(condition).all()
+
+
+def records_removed(record_ids):
+    """게임 기록을 삭제하기 전에 호출하여 해당 기록과 결과를 롤업에서 제외합니다."""
+    record_ids = list(record_ids)
+    game_deltas = defaultdict(int)
+    monthly = _Monthly()
+    rows = []
+    for chunk in _chunks(record_ids):
+        for record_id, game_id, record_date in db.session.query(
+            GameRecord.id, GameRecord.game_id, GameRecord.date
+        ).filter(GameRecord.id.in_(chunk)):
+            game_deltas[game_id] -= 1
+            monthly.add_record(record_id, game_id, record_date, -1)
+        rows.extend(_removed_rows(GameResult.game_record_id.in_(chunk)))
+    player_deltas, pair_deltas, record_deltas = _result_deltas(rows, -1, monthly)
+    _apply(game_deltas, player_deltas, pair_deltas, record_deltas, monthly)
+    _apply_head_to_head(_head_to_head_deltas(_group_by_record(rows), -1))
+    # 일괄 삭제는 flush 이벤트를 거치지 않으므로 플레이어 데이터 버전을 직접 올리고 레이팅 재계산과
+    # 분석 스냅샷 재생성을 표시합니다
+    bump_versions(player_deltas.keys())
+    ratings.mark_dirty()
+    analytics.results_removed()
+
+
+def player_results_removed(player_id):
+    """플레이어의 게임 결과를 삭제하기 전에 호출하여 롤업에서 제외합니다."""
+    rows = _removed_rows(GameResult.player_id == player_id)
+    monthly = _Monthly()
+    player_deltas, pair_deltas, record_deltas = _result_deltas(rows, -1, monthly)
+    _apply({}, player_deltas, pair_deltas, record_deltas, monthly)
+    # 상대 전적은 같은 기록의 다른 플레이어 결과도 필요합니다
+    record_rows = _removed_rows(GameResult.game_record_id.in_(
+        db.select(GameResult.game_record_id).filter(GameResult.player_id == player_id)
+    ))
+    _apply_head_to_head(_head_to_head_deltas(_group_by_record(record_rows), -1, only_player=player_id))
+    bump_versions([player_id])
+    ratings.mark_dirty()
+    analytics.results_removed()
+
+
+def snapshot():
+    """현재 롤업 테이블 내용을 비교 가능한 딕셔너리로 반환합니다."""
+    return {
+        'game_stat': {r.game_id: r.play_count for r in GameStat.query.all()},
+        'player_stat': {r.player_id: (r.plays, r.wins, r.meeting_count) for r in PlayerStat.query.all()},
+        'player_meeting_stat': {(r.player_id, r.meeting_id): r.result_count for r in PlayerMeetingStat.query.all()},
+        'game_record_stat': {r.game_record_id: r.player_count for r in GameRecordStat.query.all()},
+        'player_count_stat': {r.player_count: r.record_count for r in PlayerCountStat.query.all()},
+        'monthly_game_stat': {(r.month, r.game_id): r.play_count for r in MonthlyGameStat.query.all()},
+        'monthly_player_game_stat': {
+            (r.month, r.player_id, r.game_id): (r.plays, r.wins) for r in MonthlyPlayerGameStat.query.all()
+        },
+        'monthly_player_meeting_stat': {
+            (r.month, r.player_id, r.meeting_id): r.result_count for r in MonthlyPlayerMeetingStat.query.all()
+        },
+        'monthly_player_count_stat': {
+            (r.month, r.player_count): r.record_count for r in MonthlyPlayerCountStat.query.all()
+        },
+        'head_to_head_stat': {
+            (r.player_id, r.opponent_id, r.game_id): (r.plays, r.wins, r.losses) for r in HeadToHeadStat.query.all()
+        },
+    }
+
+
+ROLLUP_MODELS = (GameStat, PlayerStat, PlayerMeetingStat, GameRecordStat, PlayerCountStat,
+                 MonthlyGameStat, MonthlyPlayerGameStat, MonthlyPlayerMeetingStat, MonthlyPlayerCountStat,
+                 HeadToHeadStat)
+
+
+def rebuild():
+    """원본 테이블에서 롤업 테이블 전체를 다시 계산합니다. 커밋은 호출한 쪽에서 합니다."""
+    for statement in rebuild_statements():
+        db.session.execute(statement)
+
+
+def rebuild_statements():
+    """
+    롤업 테이블을 비우고 다시 채우는 Core 문 목록 (실행 순서대로)
+    세션 없이 SQL로 컴파일해 실행할 수 있습니다. (migrations.py)
+    """
+    statements = [model.__table__.delete() for model in ROLLUP_MODELS]
+
+    statements.append(GameStat.__table__.insert().from_select(
+        ['game_id', 'play_count'],
+        db.select(GameRecord.game_id, func.count(GameRecord.id)).group_by(GameRecord.game_id)
+    ))
+
+    statements.append(PlayerMeetingStat.__table__.insert().from_select(
+        ['player_id', 'meeting_id', 'result_count'],
+        db.select(GameResult.player_id, GameRecord.meeting_id, func.count(GameResult.id)).join(
+            GameRecord, GameResult.game_record_id == GameRecord.id
+        ).filter(
+            GameResult.player_id.isnot(None), GameRecord.meeting_id.isnot(None)
+        ).group_by(GameResult.player_id, GameRecord.meeting_id)
+    ))
+
+    statements.append(PlayerStat.__table__.insert().from_select(
+        ['player_id', 'plays', 'wins', 'meeting_count'],
+        db.select(
+            GameResult.player_id,
+            func.count(GameResult.id),
+            func.sum(case((GameResult.is_winner, 1), else_=0)),
+            func.count(distinct(GameRecord.meeting_id))
+        ).join(
+            GameRecord, GameResult.game_record_id == GameRecord.id
+        ).filter(
+            GameResult.player_id.isnot(None)
+        ).group_by(GameResult.player_id)
+    ))
+
+    statements.append(GameRecordStat.__table__.insert().from_select(
+        ['game_record_id', 'player_count'],
+        db.select(GameResult.game_record_id, func.count(GameResult.id)).group_by(GameResult.game_record_id)
+    ))
+
+    statements.append(PlayerCountStat.__table__.insert().from_select(
+        ['player_count', 'record_count'],
+        db.select(GameRecordStat.player_count, func.count(GameRecordStat.game_record_id)).group_by(
+            GameRecordStat.player_count
+        )
+    ))
+
+    # 월별 롤업
+    month = (extract('year', GameRecord.date) * 100 + extract('month', GameRecord.date)).label('month')
+    wins = func.sum(case((GameResult.is_winner, 1), else_=0))
+
+    statements.append(MonthlyGameStat.__table__.insert().from_select(
+        ['month', 'game_id', 'play_count'],
+        db.select(month, GameRecord.game_id, func.count(GameRecord.id)).group_by(month, GameRecord.game_id)
+    ))
+
+    statements.append(MonthlyPlayerGameStat.__table__.insert().from_select(
+        ['month', 'player_id', 'game_id', 'plays', 'wins'],
+        db.select(month, GameResult.player_id, GameRecord.game_id, func.count(GameResult.id), wins).join(
+            GameRecord, GameResult.game_record_id == GameRecord.id
+        ).filter(
+            GameResult.player_id.isnot(None)
+        ).group_by(month, GameResult.player_id, GameRecord.game_id)
+    ))
+
+    statements.append(MonthlyPlayerMeetingStat.__table__.insert().from_select(
+        ['month', 'player_id', 'meeting_id', 'result_count'],
+        db.select(month, GameResult.player_id, GameRecord.meeting_id, func.count(GameResult.id)).join(
+            GameRecord, GameResult.game_record_id == GameRecord.id
+        ).filter(
+            GameResult.player_id.isnot(None), GameRecord.meeting_id.isnot(None)
+        ).group_by(month, GameResult.player_id, GameRecord.meeting_id)
+    ))
+
+    per_record = db.select(month, func.count(GameResult.id).label('player_count')).join(
+        GameRecord, GameResult.game_record_id == GameRecord.id
+    ).group_by(GameResult.game_record_id).subquery()
+    statements.append(MonthlyPlayerCountStat.__table__.insert().from_select(
+        ['month', 'player_count', 'record_count'],
+        db.select(per_record.c.month, per_record.c.player_count, func.count()).group_by(
+            per_record.c.month, per_record.c.player_count
+        )
+    ))
+
+    # 상대 전적: 기록별로 플레이어를 중복 제거한 뒤 같은 기록의 플레이어끼리 자기 조인합니다
+    participants = db.select(
+        GameResult.game_record_id, GameRecord.game_id, GameResult.player_id,
+        func.max(case((GameResult.is_winner, 1), else_=0)).label('won')
+    ).join(
+        GameRecord, GameResult.game_record_id == GameRecord.id
+    ).filter(
+        GameResult.player_id.isnot(None)
+    ).group_by(GameResult.game_record_id, GameResult.player_id).subquery()
+    me = participants.alias('me')
+    opponent = participants.alias('opponent')
+    pair_wins = func.sum(case(((me.c.won == 1) & (opponent.c.won == 0), 1), else_=0))
+    pair_losses = func.sum(case(((me.c.won == 0) & (opponent.c.won == 1), 1), else_=0))
+    pairs = db.select(me.c.player_id, opponent.c.player_id, me.c.game_id, func.count(), pair_wins, pair_losses).join(
+        opponent, (opponent.c.game_record_id == me.c.game_record_id) & (opponent.c.player_id != me.c.player_id)
+    )
+    columns = ['player_id', 'opponent_id', 'game_id', 'plays', 'wins', 'losses']
+    statements.append(HeadToHeadStat.__table__.insert().from_select(
+        columns, pairs.group_by(me.c.player_id, opponent.c.player_id, me.c.game_id)
+    ))
+    statements.append(HeadToHeadStat.__table__.insert().from_select(
+        columns,
+        pairs.with_only_columns(
+            me.c.player_id, opponent.c.player_id, literal(ALL_GAMES_ID), func.count(), pair_wins, pair_losses
+        ).group_by(me.c.player_id, opponent.c.player_id)
+    ))
+    return statements
+
+
+def diff(before, after):
+    """두 snapshot 사이에 값이 다른 키 수를 테이블별로 반환합니다."""
+    result = {}
+    for table, rows in after.items():
+        old = before.get(table, {})
+        keys = set(old.keys()) | set(rows.keys())
+        result[table] = sum(1 for key in keys if old.get(key) != rows.get(key))
+    return result
@@ -1,10 +1,21 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
-from models import db, Game, GameRecord, GameResult
+from sqlalchemy import tuple_
+from sqlalchemy.orm import selectinload
+from models import db, Game, GameRecord, GameResult, Player
+from idempotency import idempotent
+from http_cache import conditional
+from game_stats import game_summary, DEFAULT_TOP_N
+from rollup import records_removed
+from utils import encode_cursor, decode_cursor
 
 game = Blueprint('game', __name__)
 
+# 게임 상세 화면에 한 번에 보여 줄 게임 기록 수
+GAME_RECORD_PAGE_SIZE = 20
+
 # API 엔드포인트: 게임 목록 조회
 @game.route('/api/games', methods=['GET'])
+@conditional(Game)
 def api_game_list():
     games = Game.query.all()
     result = []
@@ -22,59 +33,23 @@ def api_game_list():
 @game.route('/api/games/<int:game_id>', methods=['GET'])
 def api_game_detail(game_id):
     game = Game.query.get_or_404(game_id)
-    game_records = GameRecord.query.filter_by(game_id=game_id).all()
+    top_n = request.args.get('top', DEFAULT_TOP_N, type=int)
+    
+    # 통계는 SQL 집계로 계산 (기록 수와 무관하게 고정된 쿼리 수)
+    summary = game_summary(game_id, top_n=max(top_n, 0))
     
-    # 게임 기본 정보
     result = {
         'id': game.id,
         'name': game.name,
-        'description': game.description,
-        'total_plays': len(game_records),
-        'total_players': 0,
-        'win_rate': 0,
-        'average_score': 0
+        'description': game.description
     }
-    
-    # 플레이어별 승률 통계
-    player_stats = {}
-    total_score = 0
-    total_results = 0
-    
-    for record in game_records:
-        for result_obj in record.results:
-            total_results += 1
-            total_score += result_obj.score
-            
-            player_id = result_obj.player_id
-            if player_id:  # 등록된 플레이어만 통계에 포함
-                if player_id not in player_stats:
-                    player_stats[player_id] = {
-                        'player_id': player_id,
-                        'player_name': result_obj.player.name if result_obj.player else "알 수 없음",
-                        'wins': 0, 
-                        'plays': 0
-                    }
-                
-                player_stats[player_id]['plays'] += 1
-                if result_obj.is_winner:
-                    player_stats[player_id]['wins'] += 1
-    
-    # 통계 계산
-    result['total_players'] = len(player_stats)
-    result['average_score'] = round(total_score / total_results, 1) if total_results > 0 else 0
-    
-    # 승률 계산
-    total_wins = 0
-    for player_id, stats in player_stats.items():
-        stats['win_rate'] = round((stats['wins'] / stats['plays']) * 100, 1) if stats['plays'] > 0 else 0
-        total_wins += stats['wins']
-    
-    result['win_rate'] = round((total_wins / total_results) * 100, 1) if total_results > 0 else 0
+    result.update(summary)
     
     return jsonify(result)
 
 # API 엔드포인트: 게임 추가
 @game.route('/api/games', methods=['POST'])
+@idempotent
 def api_add_game():
     data = request.json
     
@@ -156,33 +131,48 @@ def add_game():
     
     return render_template('game/add.html')
 
+# 게임 기록은 날짜 최신순 키셋 페이지(?cursor=)로 GAME_RECORD_PAGE_SIZE 개씩 불러오고, 다음 페이지 커서를 next_cursor 로 넘깁니다.
+# (game_id, date) 인덱스를 순서대로 읽으므로 기록이 많은 게임도 페이지 크기만큼만 조회합니다
 @game.route('/games/<int:game_id>')
 def game_detail(game_id):
     game = Game.query.get_or_404(game_id)
-    game_records = GameRecord.query.filter_by(game_id=game_id).all()
+    try:
+        after = decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+    except ValueError:
+        flash('잘못된 페이지입니다.', 'danger')
+        return redirect(url_for('game.game_detail', game_id=game_id))
     
-    # 게임 통계
-    play_count = len(game_records)
+    query = GameRecord.query.filter_by(game_id=game_id)
+    if after:
+        query = query.filter(tuple_(GameRecord.date, GameRecord.id) < tuple_(*after))
+    game_records = query.options(
+        selectinload(GameRecord.results).joinedload(GameResult.player)
+    ).order_by(GameRecord.date.desc(), GameRecord.id.desc()).limit(GAME_RECORD_PAGE_SIZE + 1).all()
+    next_cursor = None
+    if len(game_records) > GAME_RECORD_PAGE_SIZE:
+        game_records = game_records[:GAME_RECORD_PAGE_SIZE]
+        next_cursor = encode_cursor(game_records[-1].date, game_records[-1].id)
+    
+    # 게임 통계 (API와 같은 집계 사용)
+    summary = game_summary(game_id)
+    play_count = summary['total_plays']
     
     # 플레이어별 승률
-    player_stats = {}
-    for record in game_records:
-        for result in record.results:
-            if result.player_id not in player_stats:
-                player_stats[result.player_id] = {'player': result.player, 'wins': 0, 'plays': 0}
-            
-            player_stats[result.player_id]['plays'] += 1
-            if result.is_winner:
-                player_stats[result.player_id]['wins'] += 1
-    
-    for stats in player_stats.values():
-        stats['win_rate'] = (stats['wins'] / stats['plays']) * 100 if stats['plays'] > 0 else 0
+    players = {}
+    if summary['player_stats']:
+        players = {p.id: p for p in Player.query.filter(
+            Player.id.in_([stats['player_id'] for stats in summary['player_stats']])
+        ).all()}
+    player_stats = []
+    for stats in summary['player_stats']:
+        player_stats.append(dict(stats, player=players.get(stats['player_id'])))
     
     return render_template('game/detail.html', 
                           game=game, 
                           game_records=game_records, 
+                          next_cursor=next_cursor, 
                           play_count=play_count, 
-                          player_stats=player_stats.values())
+                          player_stats=player_stats)
 
 @game.route('/games/<int:game_id>/edit', methods=['GET', 'POST'])
 def edit_game(game_id):
@@ -210,7 +200,12 @@ def delete_game(game_id):
     game = Game.query.get_or_404(game_id)
     
     # 게임 기록 삭제
-    for record in GameRecord.query.filter_by(game_id=game_id).all():
+    game_records = GameRecord.query.filter_by(game_id=game_id).all()
+    
+    # 통계 롤업에서 제외 (같은 트랜잭션)
+    records_removed([record.id for record in game_records])
+    
+    for record in game_records:
         # 게임 결과 먼저 삭제
         GameResult.query.filter_by(game_record_id=record.id).delete()
         db.session.delete(record)
@@ -1,6 +1,9 @@
-from flask import Blueprint, render_template, redirect, url_for, request, flash, jsonify
-from models import db, GameRecord, GameResult, Game, Player, Meeting
+from flask import Blueprint, render_template, redirect, url_for, request, flash, jsonify, Response, stream_with_context
+from models import db, Game, Player, Meeting, GameRecord, GameResult
+from idempotency import idempotent
 from datetime import datetime, date
+import json
+from record_ingest import RecordError, parse_record, validate_records, insert_records, save_record
 
 game_record = Blueprint('game_record', __name__)
 
@@ -57,51 +60,40 @@ def add_game_record():
             meeting_id = new_meeting.id
             flash(f'"{meeting_location}" 모임이 추가되었습니다.', 'success')
             
-        # 새 게임 기록 생성
-        game_record = GameRecord(
-            game_id=game_id,
-            meeting_id=meeting_id,
-            date=datetime.strptime(record_date, '%Y-%m-%d').date()
-        )
-        db.session.add(game_record)
-        db.session.flush()  # ID 할당을 위해 flush
-        
         # 등록된 플레이어 결과 처리
         registered_players = request.form.getlist('player_id')
         registered_scores = request.form.getlist('player_score')
         registered_winners = request.form.getlist('player_winner')
         
-        for i, player_id in enumerate(registered_players):
-            if player_id:  # 플레이어가 선택된 경우에만
-                score = registered_scores[i] if registered_scores[i] else None
-                is_winner = True if str(i) in registered_winners else False
-                
-                result = GameResult(
-                    game_record_id=game_record.id,
-                    player_id=player_id,
-                    score=score,
-                    is_winner=is_winner
-                )
-                db.session.add(result)
-        
-        # 미등록 플레이어 결과 처리
-        unregistered_names = request.form.getlist('unregistered_name')
-        unregistered_scores = request.form.getlist('unregistered_score')
-        unregistered_winners = request.form.getlist('unregistered_winner')
-        
-        for i, name in enumerate(unregistered_names):
-            if name.strip():  # 이름이 있는 경우에만
-                score = unregistered_scores[i] if unregistered_scores[i] else None
-                is_winner = True if str(i) in unregistered_winners else False
-                
-                result = GameResult(
-                    game_record_id=game_record.id,
-                    player_id=None,
-                    player_name=name.strip(),
-                    score=score,
-                    is_winner=is_winner
-                )
-                db.session.add(result)
+        results = []
+        try:
+            for i, player_id in enumerate(registered_players):
+                if player_id:  # 플레이어가 선택된 경우에만
+                    results.append({
+                        'player_id': player_id,
+                        'score': int(registered_scores[i]) if registered_scores[i] else None,
+                        'is_winner': str(i) in registered_winners
+                    })
+            
+            # 미등록 플레이어 결과 처리
+            unregistered_names = request.form.getlist('unregistered_name')
+            unregistered_scores = request.form.getlist('unregistered_score')
+            unregistered_winners = request.form.getlist('unregistered_winner')
+            
+            for i, name in enumerate(unregistered_names):
+                if name.strip():  # 이름이 있는 경우에만
+                    results.append({
+                        'player_name': name.strip(),
+                        'score': int(unregistered_scores[i]) if unregistered_scores[i] else None,
+                        'is_winner': str(i) in unregistered_winners
+                    })
+            
+            # 새 게임 기록 생성 (검증 후 일괄 저장, 통계 롤업도 같은 트랜잭션에서 갱신)
+            save_record({'game_id': game_id, 'date': record_date, 'results': results}, meeting_id=meeting_id or 0)
+        except (RecordError, ValueError) as e:
+            db.session.rollback()
+            flash(e.message if isinstance(e, RecordError) else '점수는 숫자로 입력해주세요.', 'danger')
+            return render_template(GAME_RECORD_ADD_TEMPLATE, games=games, players=players, today=date.today())
         
         db.session.commit()
         flash('게임 기록이 추가되었습니다.', 'success')
@@ -116,6 +108,7 @@ def add_game_record():
 
 # API 엔드포인트: 독립형 게임 기록 추가 (모임 없이)
 @game_record.route('/api/game-records', methods=['POST'])
+@idempotent
 def api_add_standalone_game_record():
     data = request.json
     
@@ -124,74 +117,25 @@ def api_add_standalone_game_record():
         return jsonify({'error': '필수 데이터가 누락되었습니다.'}), 400
     
     try:
-        game_id = data['game_id']
-        record_date = data['date']
-        results = data['results']
-        
-        # 날짜 확인 및 변환
-        try:
-            parsed_date = datetime.strptime(record_date, '%Y-%m-%d').date()
-        except ValueError:
-            return jsonify({'error': '날짜 형식이 올바르지 않습니다.'}), 400
-        
-        # 게임 존재 확인
-        game = Game.query.get(game_id)
-        if not game:
-            return jsonify({'error': '존재하지 않는 게임입니다.'}), 404
-        
-        # 최소 한 명 이상의 결과 확인
-        if not results or len(results) == 0:
-            return jsonify({'error': '최소 한 명 이상의 플레이어를 추가해야 합니다.'}), 400
-        
         # 새 게임 기록 생성 (모임 없이)
-        game_record = GameRecord(
-            game_id=game_id,
-            meeting_id=None,  # 모임 없음
-            date=parsed_date
-        )
-        db.session.add(game_record)
-        db.session.flush()  # ID 할당을 위해 flush
-        
-        # 게임 결과 처리
-        result_ids = []
-        for result_data in results:
-            # 등록된 플레이어 또는 미등록 플레이어 처리
-            player_id = result_data.get('player_id')
-            player_name = result_data.get('player_name')
-            score = result_data.get('score', 0)
-            is_winner = result_data.get('is_winner', False)
-            
-            # 등록된 플레이어인 경우 player_id 확인
-            if player_id:
-                player = Player.query.get(player_id)
-                if not player:
-                    return jsonify({'error': f'존재하지 않는 플레이어 ID: {player_id}'}), 404
-            
-            # 결과 저장
-            result = GameResult(
-                game_record_id=game_record.id,
-                player_id=player_id,
-                player_name=player_name if not player_id and player_name else None,
-                score=score,
-                is_winner=is_winner
-            )
-            db.session.add(result)
-            db.session.flush()
-            result_ids.append(result.id)
-        
+        record_id, result_ids, record = save_record(data, meeting_id=0)
         db.session.commit()
         
         # 성공 응답
         response_data = {
-            'id': game_record.id,
-            'game_id': game_record.game_id,
-            'date': record_date,
+            'id': record_id,
+            'game_id': record['game_id'],
+            'date': record['date_str'],
             'result_ids': result_ids,
             'message': '게임 기록이 성공적으로 추가되었습니다.'
         }
         
         return jsonify(response_data), 201
     
+    except RecordError as e:
+        db.session.rollback()
+        return jsonify({'error': e.message}), e.status_code
+    
     except Exception as e:
         # 오류 발생 시 롤백
         db.session.rollback()
@@ -201,6 +145,7 @@ def api_add_standalone_game_record():
 
 # API 엔드포인트: 미팅별 게임 기록 추가
 @game_record.route('/api/meetings/<int:meeting_id>/records', methods=['POST'])
+@idempotent
 def api_add_meeting_game_record(meeting_id):
     data = request.json
     
@@ -209,91 +154,164 @@ def api_add_meeting_game_record(meeting_id):
         return jsonify({'error': '필수 데이터가 누락되었습니다.'}), 400
     
     try:
-        game_id = data['game_id']
-        results = data['results']
-        record_date = data.get('date', datetime.now().strftime('%Y-%m-%d'))
-        
-        # 날짜 형식 확인 및 변환
-        try:
-            parsed_date = datetime.strptime(record_date, '%Y-%m-%d').date()
-        except ValueError:
-            return jsonify({'error': '날짜 형식이 올바르지 않습니다.'}), 400
-        
-        # 게임 존재 확인
-        game = Game.query.get(game_id)
-        if not game:
-            return jsonify({'error': '존재하지 않는 게임입니다.'}), 404
-        
-        # 미팅 존재 확인 (미팅 ID가 0이면 독립형 게임 기록으로 처리)
-        meeting = None
-        if meeting_id > 0:
-            meeting = Meeting.query.get(meeting_id)
-            if not meeting:
-                return jsonify({'error': '존재하지 않는 모임입니다.'}), 404
-        
-        # 플레이어 확인
-        if not results or len(results) == 0:
-            return jsonify({'error': '최소 한 명 이상의 플레이어를 추가해야 합니다.'}), 400
-        
-        # 새 게임 기록 생성
-        game_record = GameRecord(
-            game_id=game_id,
-            meeting_id=meeting_id if meeting_id > 0 else None,
-            date=parsed_date
-        )
-        db.session.add(game_record)
-        db.session.flush()  # ID 할당을 위해 flush
-        
-        # 게임 결과 처리
-        result_ids = []
-        for result_data in results:
-            # 등록된 플레이어 또는 미등록 플레이어 처리
-            player_id = result_data.get('player_id')
-            player_name = result_data.get('player_name')
-            score = result_data.get('score', 0)
-            is_winner = result_data.get('is_winner', False)
-            
-            # player_id가 0이면 미등록 플레이어로 간주
-            if player_id == 0 and player_name:
-                player_id = None
-            # 등록된 플레이어인 경우 player_id 확인
-            elif player_id and player_id > 0:
-                player = Player.query.get(player_id)
-                if not player:
-                    return jsonify({'error': f'존재하지 않는 플레이어 ID: {player_id}'}), 404
-            # 플레이어 정보가 없는 경우
-            elif not player_name:
-                continue
-            
-            # 결과 저장
-            result = GameResult(
-                game_record_id=game_record.id,
-                player_id=player_id if player_id and player_id > 0 else None,
-                player_name=player_name if not player_id or player_id == 0 else None,
-                score=score,
-                is_winner=is_winner
-            )
-            db.session.add(result)
-            db.session.flush()
-            result_ids.append(result.id)
-        
+        # 새 게임 기록 생성 (미팅 ID가 0이면 독립형 게임 기록으로 처리)
+        record_id, result_ids, record = save_record(data, meeting_id=meeting_id)
         db.session.commit()
         
         # 성공 응답
         response_data = {
-            'id': game_record.id,
-            'game_id': game_record.game_id,
-            'meeting_id': game_record.meeting_id,
-            'date': record_date,
+            'id': record_id,
+            'game_id': record['game_id'],
+            'meeting_id': record['meeting_id'],
+            'date': record['date_str'],
             'result_ids': result_ids,
             'message': '게임 기록이 성공적으로 추가되었습니다.'
         }
         
         return jsonify(response_data), 201
     
+    except RecordError as e:
+        db.session.rollback()
+        return jsonify({'error': e.message}), e.status_code
+    
     except Exception as e:
         # 오류 발생 시 롤백
         db.session.rollback()
         
         # 오류 응답
-        return jsonify({'error': f'게임 기록 저장 중 오류가 발생했습니다: {str(e)}'}), 500
\ No newline at end of file
+        return jsonify({'error': f'게임 기록 저장 중 오류가 발생했습니다: {str(e)}'}), 500
+
+# 한 번의 일괄 요청에서 받을 수 있는 최대 기록 수
+MAX_BATCH_RECORDS = 500
+
+# API 엔드포인트: 게임 기록 일괄 추가
+# 요청: {"records": [{"game_id", "date", "meeting_id"(선택), "results": [...]}, ...]}
+# 유효한 기록은 한 트랜잭션에서 일괄 저장하고, 기록별 성공/오류를 반환합니다.
+@game_record.route('/api/game-records/batch', methods=['POST'])
+@idempotent
+def api_add_game_records_batch():
+    data = request.get_json(silent=True)
+    
+    # 필수 데이터 확인 (본문은 records 목록을 담은 객체여야 합니다)
+    if not isinstance(data, dict) or not isinstance(data.get('records'), list) or len(data['records']) == 0:
+        return jsonify({'error': '필수 데이터가 누락되었습니다.'}), 400
+    if len(data['records']) > MAX_BATCH_RECORDS:
+        return jsonify({'error': f'한 번에 최대 {MAX_BATCH_RECORDS}개의 기록만 추가할 수 있습니다.'}), 400
+    
+    # 1. 형식 검증 (DB 조회 없음)
+    outcomes = []
+    for record_data in data['records']:
+        try:
+            outcomes.append(parse_record(record_data))
+        except RecordError as e:
+            outcomes.append(e)
+    
+    try:
+        # 2. 참조 ID 검증 (테이블별 IN 쿼리)
+        parsed = [(i, record) for i, record in enumerate(outcomes) if not isinstance(record, RecordError)]
+        for (i, _), validated in zip(parsed, validate_records([record for _, record in parsed])):
+            outcomes[i] = validated
+        
+        # 3. 유효한 기록 일괄 저장
+        valid = [(i, record) for i, record in enumerate(outcomes) if not isinstance(record, RecordError)]
+        saved = insert_records([record for _, record in valid])
+        db.session.commit()
+    except Exception as e:
+        # 오류 발생 시 롤백
+        db.session.rollback()
+        return jsonify({'error': f'게임 기록 저장 중 오류가 발생했습니다: {str(e)}'}), 500
+    
+    saved_by_index = {i: ids for (i, _), ids in zip(valid, saved)}
+    records = []
+    for i, outcome in enumerate(outcomes):
+        if isinstance(outcome, RecordError):
+            records.append({'index': i, 'status': 'error', 'error': outcome.message})
+        else:
+            record_id, result_ids = saved_by_index[i]
+            records.append({
+                'index': i,
+                'status': 'created',
+                'id': record_id,
+                'game_id': outcome['game_id'],
+                'meeting_id': outcome['meeting_id'],
+                'date': outcome['date_str'],
+                'result_ids': result_ids
+            })
+    
+    created = len(saved_by_index)
+    failed = len(outcomes) - created
+    
+    # 모두 성공 201, 일부 실패 207, 모두 실패 400
+    status = 201 if failed == 0 else (207 if created > 0 else 400)
+    return jsonify({'created': created, 'failed': failed, 'records': records}), status
+
+# 내보내기 시 서버 측에서 한 번에 가져오는 행 수
+EXPORT_CHUNK_SIZE = 1000
+
+def _export_lines(since):
+    # 게임 기록과 결과를 조인한 행을 기록 ID 순으로 나누어 가져와 기록 단위로 한 줄씩 만듭니다
+    query = db.session.query(
+        GameRecord.id, GameRecord.date, GameRecord.game_id, GameRecord.meeting_id,
+        Game.name.label('game_name'),
+        Meeting.date.label('meeting_date'), Meeting.location.label('meeting_location'),
+        GameResult.id.label('result_id'), GameResult.player_id, GameResult.player_name,
+        Player.name.label('registered_name'), GameResult.score, GameResult.is_winner
+    ).outerjoin(
+        GameResult, GameResult.game_record_id == GameRecord.id
+    ).outerjoin(
+        Player, Player.id == GameResult.player_id
+    ).outerjoin(
+        Game, Game.id == GameRecord.game_id
+    ).outerjoin(
+        Meeting, Meeting.id == GameRecord.meeting_id
+    )
+    if since:
+        query = query.filter(GameRecord.date >= since)
+    query = query.order_by(GameRecord.id, GameResult.id).execution_options(
+        stream_results=True, yield_per=EXPORT_CHUNK_SIZE
+    )
+    
+    current = None
+    for row in query:
+        if current is None or current['id'] != row.id:
+            if current is not None:
+                yield json.dumps(current, ensure_ascii=False) + '\n'
+            current = {
+                'id': row.id,
+                'date': row.date.strftime('%Y-%m-%d') if row.date else None,
+                'game': {'id': row.game_id, 'name': row.game_name},
+                'meeting': {
+                    'id': row.meeting_id,
+                    'date': row.meeting_date.strftime('%Y-%m-%d') if row.meeting_date else None,
+                    'location': row.meeting_location
+                } if row.meeting_id else None,
+                'results': []
+            }
+        if row.result_id is not None:
+            current['results'].append({
+                'id': row.result_id,
+                'player_id': row.player_id,
+                'player_name': row.registered_name if row.player_id else row.player_name,
+                'registered': row.player_id is not None,
+                'score': row.score,
+                'is_winner': row.is_winner
+            })
+    if current is not None:
+        yield json.dumps(current, ensure_ascii=False) + '\n'
+
+# API 엔드포인트: 전체 플레이 기록 내보내기 (NDJSON 스트리밍)
+# 게임 기록 한 건이 한 줄이며 결과, 게임, 모임 정보를 포함합니다. ?since=YYYY-MM-DD 로 기록 날짜를 필터링합니다.
+@game_record.route('/api/export/game-records', methods=['GET'])
+def api_export_game_records():
+    since = request.args.get('since')
+    if since:
+        try:
+            since = datetime.strptime(since, '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'error': '날짜 형식이 올바르지 않습니다.'}), 400
+    
+    return Response(
+        stream_with_context(_export_lines(since)),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': 'attachment; filename=game_records.ndjson'}
+    )
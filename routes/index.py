@@ -1,7 +1,15 @@
-from flask import Blueprint, render_template, jsonify
-from models import db, Player, Game, GameRecord, GameResult, Meeting
+from flask import Blueprint, render_template, jsonify, abort, request, current_app
+from models import db, Player, Game, GameRecord, GameResult, Meeting, GameStat, PlayerStat, PlayerCountStat, PlayerVersion, PlayerRating, HeadToHeadStat
+from models import MonthlyGameStat, MonthlyPlayerGameStat, MonthlyPlayerMeetingStat, MonthlyPlayerCountStat
+from http_cache import conditional
+from player_cache import player_stats_cache
+import analytics
+import ratings
+import rollup
+import window_stats
+import os
 from datetime import datetime
-from sqlalchemy import func, extract, case, desc
+from sqlalchemy import case
 
 index = Blueprint('index', __name__)
 
@@ -22,20 +30,83 @@ def home():
                           players=players, 
                           popular_games=popular_games)
 
+def _parse_window():
+    # ?from=YYYY-MM-DD&to=YYYY-MM-DD 기간 파라미터. 둘 다 없으면 None (전체 기간)
+    date_from = request.args.get('from')
+    date_to = request.args.get('to')
+    if not date_from and not date_to:
+        return None
+    date_from = datetime.strptime(date_from, '%Y-%m-%d').date() if date_from else None
+    date_to = datetime.strptime(date_to, '%Y-%m-%d').date() if date_to else None
+    if date_from and date_to and date_from > date_to:
+        raise ValueError('from > to')
+    return window_stats.Window(date_from, date_to)
+
+def _windowed_stats(window):
+    # 기간 통계: 월별 롤업과 경계 달의 원본 기록을 합산합니다 (window_stats.py)
+    game_counts = window_stats.game_play_counts(window)
+    popular = sorted(game_counts.items(), key=lambda item: (-item[1], item[0]))[:10]
+    
+    totals = window_stats.player_totals(window)
+    winners = sorted(
+        [(player_id, plays, wins) for player_id, (plays, wins) in totals.items() if plays >= 1],
+        key=lambda item: (-item[2], item[0])
+    )[:10]
+    
+    active = window_stats.player_meeting_counts(window, limit=10)
+    
+    game_names = analytics.game_names({game_id for game_id, _ in popular})
+    player_ids = {player_id for player_id, _, _ in winners} | {player_id for player_id, _ in active}
+    player_names = {}
+    if player_ids:
+        player_names = dict(db.session.query(Player.id, Player.name).filter(Player.id.in_(list(player_ids))).all())
+    
+    popular_games = [{'id': game_id, 'name': game_names.get(game_id), 'count': count} for game_id, count in popular]
+    winners_data = [{
+        'id': player_id,
+        'name': player_names.get(player_id),
+        'win_rate': round((wins / plays) * 100, 1),
+        'wins': wins,
+        'plays': plays
+    } for player_id, plays, wins in winners]
+    active_players_data = [{
+        'id': player_id,
+        'name': player_names.get(player_id),
+        'meeting_count': meeting_count
+    } for player_id, meeting_count in active]
+    return popular_games, winners_data, active_players_data, window_stats.player_count_histogram(window)
+
 @index.route('/api/stats', methods=['GET'])
+@conditional(Game, Player, GameRecord, GameResult, GameStat, PlayerStat, PlayerCountStat,
+             MonthlyGameStat, MonthlyPlayerGameStat, MonthlyPlayerMeetingStat, MonthlyPlayerCountStat)
 def get_stats():
+    # 모든 통계는 게임 기록 추가/삭제 시 갱신되는 롤업 테이블(rollup.py)에서 읽습니다.
+    # ?from=YYYY-MM-DD&to=YYYY-MM-DD 를 주면 해당 기간의 통계를 월별 롤업에서 계산합니다.
+    try:
+        window = _parse_window()
+    except ValueError:
+        return jsonify({'error': '날짜 형식이 올바르지 않습니다. (YYYY-MM-DD)'}), 400
+    if window is not None:
+        popular_games, winners_data, active_players_data, histogram = _windowed_stats(window)
+        return jsonify(_stats_response(popular_games, winners_data, active_players_data, histogram))
+
     # 1. 가장 많이 플레이된 게임
     popular_games = db.session.query(
-        Game.id, Game.name, db.func.count(GameRecord.id).label('play_count')
-    ).join(GameRecord).group_by(Game.id).order_by(db.func.count(GameRecord.id).desc()).limit(10).all()
+        Game.id, Game.name, GameStat.play_count
+    ).join(
+        GameStat, GameStat.game_id == Game.id
+    ).filter(
+        GameStat.play_count > 0
+    ).order_by(GameStat.play_count.desc()).limit(10).all()
     
     # 2. 가장 많이 이긴 플레이어
     top_winners = db.session.query(
-        Player.id,
-        Player.name,
-        db.func.sum(case((GameResult.is_winner, 1), else_=0)).label('wins'),
-        db.func.count(GameResult.id).label('plays')
-    ).join(GameResult).group_by(Player.id).having(db.func.count(GameResult.id) >= 1).order_by(desc('wins')).limit(10).all()
+        Player.id, Player.name, PlayerStat.wins, PlayerStat.plays
+    ).join(
+        PlayerStat, PlayerStat.player_id == Player.id
+    ).filter(
+        PlayerStat.plays >= 1
+    ).order_by(PlayerStat.wins.desc()).limit(10).all()
     
     winners_data = []
     for player in top_winners:
@@ -50,14 +121,12 @@ def get_stats():
     
     # 3. 가장 참여를 많이 한 플레이어
     active_players = db.session.query(
-        Player.id,
-        Player.name,
-        db.func.count(db.distinct(GameRecord.meeting_id)).label('meeting_count')
+        Player.id, Player.name, PlayerStat.meeting_count
     ).join(
-        GameResult, Player.id == GameResult.player_id
-    ).join(
-        GameRecord, GameResult.game_record_id == GameRecord.id
-    ).group_by(Player.id).order_by(desc('meeting_count')).limit(10).all()
+        PlayerStat, PlayerStat.player_id == Player.id
+    ).filter(
+        PlayerStat.plays >= 1
+    ).order_by(PlayerStat.meeting_count.desc()).limit(10).all()
     
     active_players_data = []
     for player in active_players:
@@ -68,67 +137,95 @@ def get_stats():
         })
     
     # 플레이어 수별 게임 통계 (유지)
-    player_count_stats = db.session.query(
-        func.count(GameResult.id).label('player_count'),
-        func.count(GameRecord.id).label('game_count')
-    ).join(
-        GameRecord, GameResult.game_record_id == GameRecord.id
-    ).group_by(GameRecord.id).all()
+    histogram = {stat.player_count: stat.record_count for stat in PlayerCountStat.query.all()}
     
+    return jsonify(_stats_response(
+        [{'id': g.id, 'name': g.name, 'count': g.play_count} for g in popular_games],
+        winners_data, active_players_data, histogram
+    ))
+
+def _stats_response(popular_games, winners_data, active_players_data, histogram):
     # 플레이어 수별 데이터 구성
     player_counts = {2: 0, 3: 0, 4: 0, 5: 0, '6+': 0}
-    for stat in player_count_stats:
-        count = stat.player_count
+    for count, record_count in histogram.items():
         if count <= 5:
-            player_counts[count] = player_counts.get(count, 0) + 1
+            player_counts[count] = player_counts.get(count, 0) + record_count
         else:
-            player_counts['6+'] = player_counts.get('6+', 0) + 1
+            player_counts['6+'] = player_counts.get('6+', 0) + record_count
     
     # 최종 통계 데이터
-    return jsonify({
-        'popular_games': [{'id': g.id, 'name': g.name, 'count': g.play_count} for g in popular_games],
+    return {
+        'popular_games': popular_games,
         'top_winners': winners_data,
         'active_players': active_players_data,
         'player_counts': {
             'labels': list(map(str, player_counts.keys())),
             'data': list(player_counts.values())
         }
-    })
+    }
 
 @index.route('/api/stats/player/<int:player_id>', methods=['GET'])
 def get_player_stats(player_id):
-    # 플레이어 확인
-    player = Player.query.get_or_404(player_id)
+    try:
+        window = _parse_window()
+    except ValueError:
+        return jsonify({'error': '날짜 형식이 올바르지 않습니다. (YYYY-MM-DD)'}), 400
     
-    # 플레이어가 많이 한 게임 및 이긴 게임
-    player_games = db.session.query(
-        Game.id,
-        Game.name,
-        db.func.count(GameResult.id).label('plays'),
-        db.func.sum(case((GameResult.is_winner, 1), else_=0)).label('wins')
-    ).join(
-        GameRecord, Game.id == GameRecord.game_id
-    ).join(
-        GameResult, GameRecord.id == GameResult.game_record_id
+    # 플레이어 확인 및 데이터 버전 조회 (캐시 키)
+    row = db.session.query(
+        Player.id, PlayerVersion.version
+    ).outerjoin(
+        PlayerVersion, PlayerVersion.player_id == Player.id
     ).filter(
-        GameResult.player_id == player_id
-    ).group_by(Game.id).all()
+        Player.id == player_id
+    ).first()
+    if row is None:
+        abort(404)
+    version = row.version or 0
+    
+    # 플레이어가 많이 한 게임 및 이긴 게임 (게임 ID별 플레이/승리 수)
+    if window is not None:
+        # 기간 통계는 월별 롤업에서 계산하며 캐시하지 않습니다
+        per_game = [(game_id, plays, wins) for game_id, (plays, wins)
+                    in window_stats.player_game_stats(window, player_id).items()]
+    else:
+        per_game = player_stats_cache.get(player_id, version)
+    if per_game is None:
+        per_game = [(game_id, plays, wins) for game_id, plays, wins in db.session.query(
+            GameRecord.game_id,
+            db.func.count(GameResult.id).label('plays'),
+            db.func.sum(case((GameResult.is_winner, 1), else_=0)).label('wins')
+        ).join(
+            GameResult, GameRecord.id == GameResult.game_record_id
+        ).filter(
+            GameResult.player_id == player_id
+        ).group_by(GameRecord.game_id).all()]
+        player_stats_cache.put(player_id, version, per_game)
+    
+    # 게임 이름은 변경될 수 있으므로 캐시하지 않고 기본 키로 조회
+    game_names = {}
+    if per_game:
+        game_names = dict(db.session.query(Game.id, Game.name).filter(
+            Game.id.in_([game_id for game_id, _, _ in per_game])
+        ).all())
     
     games_data = []
     total_plays = 0
     total_wins = 0
     
-    for game in player_games:
-        win_rate = (game.wins / game.plays) * 100 if game.plays > 0 else 0
+    for game_id, plays, wins in per_game:
+        if game_id not in game_names:
+            continue
+        win_rate = (wins / plays) * 100 if plays > 0 else 0
         games_data.append({
-            'id': game.id,
-            'name': game.name,
-            'plays': game.plays,
-            'wins': game.wins,
+            'id': game_id,
+            'name': game_names[game_id],
+            'plays': plays,
+            'wins': wins,
             'win_rate': round(win_rate, 1)
         })
-        total_plays += game.plays
-        total_wins += game.wins
+        total_plays += plays
+        total_wins += wins
     
     # 최다 플레이 게임 순으로 정렬
     most_played_games = sorted(games_data, key=lambda x: x['plays'], reverse=True)
@@ -141,4 +238,145 @@ def get_player_stats(player_id):
         'total_plays': total_plays,
         'total_wins': total_wins,
         'win_rate': round(total_win_rate, 1)
-    })
\ No newline at end of file
+    })
+
+# 플레이어 레이팅 (전체 및 게임별)
+# 재계산을 기다리는 중이면 기존 레이팅을 stale: true 와 함께 돌려주고 백그라운드 재계산을 예약합니다. (ratings.py)
+@index.route('/api/stats/player/<int:player_id>/ratings', methods=['GET'])
+def get_player_ratings(player_id):
+    player = Player.query.get_or_404(player_id)
+    stale = ratings.request_refresh()
+    
+    rows = db.session.query(
+        PlayerRating.game_id, PlayerRating.rating, PlayerRating.games, Game.name
+    ).outerjoin(
+        Game, Game.id == PlayerRating.game_id
+    ).filter(
+        PlayerRating.player_id == player_id
+    ).all()
+    
+    overall = next((row for row in rows if row.game_id == ratings.GLOBAL_GAME_ID), None)
+    games_data = sorted([{
+        'id': row.game_id,
+        'name': row.name,
+        'rating': round(row.rating, 1),
+        'games': row.games
+    } for row in rows if row.game_id != ratings.GLOBAL_GAME_ID], key=lambda x: x['rating'], reverse=True)
+    
+    return jsonify({
+        'id': player.id,
+        'name': player.name,
+        'rating': round(overall.rating, 1) if overall else ratings.INITIAL_RATING,
+        'games': overall.games if overall else 0,
+        'game_ratings': games_data,
+        'stale': stale
+    })
+
+# 레이팅 순위 (?game_id= 로 게임별 순위, 없으면 전체). stale 은 위와 같습니다
+@index.route('/api/stats/ratings', methods=['GET'])
+def get_rating_leaderboard():
+    game_id = request.args.get('game_id', ratings.GLOBAL_GAME_ID, type=int)
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+    stale = ratings.request_refresh()
+    
+    rows = db.session.query(
+        Player.id, Player.name, PlayerRating.rating, PlayerRating.games
+    ).join(
+        PlayerRating, PlayerRating.player_id == Player.id
+    ).filter(
+        PlayerRating.game_id == game_id
+    ).order_by(PlayerRating.rating.desc()).limit(limit).all()
+    
+    return jsonify({
+        'game_id': game_id or None,
+        'ratings': [{
+            'id': row.id,
+            'name': row.name,
+            'rating': round(row.rating, 1),
+            'games': row.games
+        } for row in rows],
+        'stale': stale
+    })
+
+# 플레이어 상대 전적 (?opponent_id= 로 한 상대만, ?game_id= 로 게임별, 없으면 전체 게임)
+# 롤업 테이블(HeadToHeadStat)의 플레이어 행만 읽습니다.
+@index.route('/api/stats/head-to-head/<int:player_id>', methods=['GET'])
+def get_head_to_head(player_id):
+    player = Player.query.get_or_404(player_id)
+    game_id = request.args.get('game_id', rollup.ALL_GAMES_ID, type=int)
+    opponent_id = request.args.get('opponent_id', type=int)
+    
+    query = db.session.query(
+        HeadToHeadStat.opponent_id, Player.name, HeadToHeadStat.plays, HeadToHeadStat.wins, HeadToHeadStat.losses
+    ).join(
+        Player, Player.id == HeadToHeadStat.opponent_id
+    ).filter(
+        HeadToHeadStat.player_id == player_id,
+        HeadToHeadStat.game_id == game_id
+    )
+    if opponent_id is not None:
+        query = query.filter(HeadToHeadStat.opponent_id == opponent_id)
+    
+    opponents = sorted([{
+        'id': row.opponent_id,
+        'name': row.name,
+        'plays': row.plays,
+        'wins': row.wins,
+        'losses': row.losses,
+        'draws': row.plays - row.wins - row.losses,
+        'win_rate': round((row.wins / row.plays) * 100, 1) if row.plays > 0 else 0
+    } for row in query.all()], key=lambda x: (-x['plays'], x['id']))
+    
+    return jsonify({
+        'id': player.id,
+        'name': player.name,
+        'game_id': game_id or None,
+        'opponents': opponents
+    })
+
+# 플레이어 통계 캐시 상태 (적중/미스 카운터)
+@index.route('/api/stats/player-cache', methods=['GET'])
+def get_player_stats_cache():
+    return jsonify(player_stats_cache.stats())
+
+def analytics_snapshot_dir():
+    return current_app.config.get('ANALYTICS_SNAPSHOT_DIR') or os.path.join(current_app.instance_path, 'analytics')
+
+# 컬럼형 스냅샷 기반 통계 (인기 게임, 승률, 플레이어 수 분포, 게임별 점수 통계)
+# ?from=YYYY-MM-DD&to=YYYY-MM-DD 로 기록 날짜 범위를 지정할 수 있습니다.
+@index.route('/api/stats/analytics', methods=['GET'])
+def get_analytics_stats():
+    try:
+        date_from = datetime.strptime(request.args['from'], '%Y-%m-%d').date() if request.args.get('from') else None
+        date_to = datetime.strptime(request.args['to'], '%Y-%m-%d').date() if request.args.get('to') else None
+    except ValueError:
+        return jsonify({'error': '날짜 형식이 올바르지 않습니다.'}), 400
+    
+    snapshot = analytics.load_snapshot(analytics_snapshot_dir())
+    columns = snapshot.select(date_from, date_to)
+    
+    popularity = analytics.game_popularity(columns)
+    win_rates = analytics.player_win_rates(columns)[:10]
+    histogram = analytics.player_count_histogram(columns)
+    score_stats = analytics.game_score_stats(columns)
+    
+    names = analytics.game_names({game_id for game_id, _ in popularity} | set(score_stats.keys()))
+    player_names = {}
+    if win_rates:
+        player_names = dict(db.session.query(Player.id, Player.name).filter(
+            Player.id.in_([player_id for player_id, _, _, _ in win_rates])
+        ).all())
+    
+    return jsonify({
+        'rows': len(columns['result_id']),
+        'popular_games': [{'id': game_id, 'name': names.get(game_id), 'count': plays} for game_id, plays in popularity],
+        'top_winners': [{
+            'id': player_id,
+            'name': player_names.get(player_id),
+            'plays': plays,
+            'wins': wins,
+            'win_rate': win_rate
+        } for player_id, plays, wins, win_rate in win_rates],
+        'player_counts': {str(count): records for count, records in sorted(histogram.items())},
+        'score_stats': [dict(stats, id=game_id, name=names.get(game_id)) for game_id, stats in score_stats.items()]
+    })
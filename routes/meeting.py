@@ -1,66 +1,126 @@
 from flask import Blueprint, jsonify, request
-from models import db, Meeting, GameRecord, GameResult, Player, Game, MeetingParticipant
+from sqlalchemy import func, or_, and_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, selectinload
+from models import db, Meeting, GameRecord, GameResult, Player, Game, MeetingParticipant, meeting_planned_games
+from idempotency import idempotent
+from http_cache import conditional
 from datetime import datetime
+from utils import encode_cursor, decode_cursor
 import logging
 
 logger = logging.getLogger(__name__)
 
 meeting = Blueprint('meeting', __name__)
 
+# 모임 목록 페이지 크기
+MEETING_PAGE_SIZE = 50
+MEETING_MAX_PAGE_SIZE = 200
+
 # API 엔드포인트: 모임 목록 조회
+# 최신순 (date, id) 키셋 페이지네이션. 다음 페이지 커서는 X-Next-Cursor 헤더로 전달합니다.
 @meeting.route('/api/meetings', methods=['GET'])
+@conditional(Meeting, MeetingParticipant, GameRecord, Player, Game, meeting_planned_games)
 def api_meeting_list():
+    limit = request.args.get('limit', MEETING_PAGE_SIZE, type=int)
+    limit = min(max(limit, 1), MEETING_MAX_PAGE_SIZE)
+    cursor = request.args.get('cursor')
+    
     try:
-        logger.debug("Fetching all meetings")
-        meetings = Meeting.query.order_by(Meeting.date.desc()).all()
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        logger.debug("Fetching meetings page (limit=%s, cursor=%s)", limit, cursor)
+        
+        # 1. 페이지에 해당하는 모임 ID (date, id 내림차순)
+        page = db.select(Meeting.id)
+        if after:
+            after_date, after_id = after
+            page = page.where(or_(
+                Meeting.date < after_date,
+                and_(Meeting.date == after_date, Meeting.id < after_id)
+            ))
+        page = page.order_by(Meeting.date.desc(), Meeting.id.desc()).limit(limit + 1).subquery()
+        page_ids = db.select(page.c.id)
+        
+        # 페이지 안의 모임에 대해서만 게임 기록 수와 확정 참가자 수를 집계
+        game_counts = db.select(
+            GameRecord.meeting_id, func.count(GameRecord.id).label('game_count')
+        ).where(
+            GameRecord.meeting_id.in_(page_ids)
+        ).group_by(GameRecord.meeting_id).subquery()
+        
+        participant_counts = db.select(
+            MeetingParticipant.meeting_id, func.count(MeetingParticipant.id).label('participant_count')
+        ).where(
+            MeetingParticipant.meeting_id.in_(page_ids),
+            MeetingParticipant.status == 'confirmed'
+        ).group_by(MeetingParticipant.meeting_id).subquery()
+        
+        rows = db.session.execute(
+            db.select(
+                Meeting.id, Meeting.date, Meeting.location, Meeting.description, Meeting.host_id,
+                Player.name.label('host_name'),
+                func.coalesce(game_counts.c.game_count, 0).label('game_count'),
+                func.coalesce(participant_counts.c.participant_count, 0).label('participant_count')
+            ).join(
+                page, page.c.id == Meeting.id
+            ).outerjoin(
+                Player, Player.id == Meeting.host_id
+            ).outerjoin(
+                game_counts, game_counts.c.meeting_id == Meeting.id
+            ).outerjoin(
+                participant_counts, participant_counts.c.meeting_id == Meeting.id
+            ).order_by(Meeting.date.desc(), Meeting.id.desc())
+        ).all()
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        # 2. 예정 게임 일괄 조회
+        planned_games = {}
+        if rows:
+            planned_rows = db.session.execute(
+                db.select(meeting_planned_games.c.meeting_id, Game.id, Game.name).join(
+                    Game, Game.id == meeting_planned_games.c.game_id
+                ).where(
+                    meeting_planned_games.c.meeting_id.in_([row.id for row in rows])
+                )
+            ).all()
+            for meeting_id, game_id, game_name in planned_rows:
+                planned_games.setdefault(meeting_id, []).append({'id': game_id, 'name': game_name})
+        
         result = []
+        for m in rows:
+            result.append({
+                'id': m.id,
+                'date': m.date.strftime('%Y-%m-%d') if m.date else None,
+                'location': m.location,
+                'description': m.description,
+                'host_id': m.host_id,
+                'host': {'id': m.host_id, 'name': m.host_name} if m.host_name is not None else None,
+                'game_count': m.game_count,
+                'participant_count': m.participant_count,
+                'unregistered_count': 0,
+                'planned_games': planned_games.get(m.id, [])
+            })
         
-        for m in meetings:
-            try:
-                # 게임 기록 수 계산
-                game_count = GameRecord.query.filter_by(meeting_id=m.id).count()
-                
-                # 참가자 수 계산
-                participant_count = MeetingParticipant.query.filter_by(
-                    meeting_id=m.id,
-                    status='confirmed'
-                ).count()
-                
-                host_info = None
-                if m.host_id and m.host:
-                    host_info = {
-                        'id': m.host.id,
-                        'name': m.host.name
-                    }
-                
-                result.append({
-                    'id': m.id,
-                    'date': m.date.strftime('%Y-%m-%d') if m.date else None,
-                    'location': m.location,
-                    'description': m.description,
-                    'host_id': m.host_id,
-                    'host': host_info,
-                    'game_count': game_count,
-                    'participant_count': participant_count,
-                    'unregistered_count': 0,
-                    'planned_games': [{
-                        'id': game.id,
-                        'name': game.name
-                    } for game in m.planned_games] if hasattr(m, 'planned_games') else []
-                })
-            except Exception as e:
-                logger.error(f"Error processing meeting {m.id}: {str(e)}")
-                # 오류가 발생한 미팅은 건너뛰기
-                continue
+        response = jsonify(result)
+        if has_more:
+            last = rows[-1]
+            response.headers['X-Next-Cursor'] = encode_cursor(last.date, last.id)
         
-        logger.debug(f"Successfully fetched {len(result)} meetings")
-        return jsonify(result)
+        logger.debug("Successfully fetched %s meetings", len(result))
+        return response
     except Exception as e:
         logger.error(f"Error in api_meeting_list: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
 
 # API 엔드포인트: 모임 추가
 @meeting.route('/api/meetings', methods=['POST'])
+@idempotent
 def api_add_meeting():
     data = request.get_json()
     
@@ -109,15 +169,16 @@ def api_add_meeting():
     })
 
 # API 엔드포인트: 단일 모임 조회
+# 모임, 호스트, 참가자, 예정 게임, 게임 기록, 결과, 플레이어를 일괄 로딩하여 게임 수와 관계없이 고정된 쿼리 수로 조회합니다.
 @meeting.route('/api/meetings/<int:meeting_id>', methods=['GET'])
 def api_meeting_detail(meeting_id):
-    meeting = Meeting.query.get_or_404(meeting_id)
-    
-    # 게임 기록 조회
-    game_records = GameRecord.query.filter_by(meeting_id=meeting_id).all()
-    
-    # 참가자 목록 조회
-    participants = MeetingParticipant.query.filter_by(meeting_id=meeting_id).all()
+    meeting = Meeting.query.options(
+        joinedload(Meeting.host),
+        selectinload(Meeting.planned_games),
+        selectinload(Meeting.participants).joinedload(MeetingParticipant.player),
+        selectinload(Meeting.game_records).joinedload(GameRecord.game),
+        selectinload(Meeting.game_records).selectinload(GameRecord.results).joinedload(GameResult.player)
+    ).filter_by(id=meeting_id).first_or_404()
     
     result = {
         'id': meeting.id,
@@ -127,13 +188,14 @@ def api_meeting_detail(meeting_id):
         'host': {
             'id': meeting.host.id,
             'name': meeting.host.name
-        },
+        } if meeting.host else None,
         'participants': [{
             'id': p.player.id,
             'name': p.player.name,
             'arrival_time': p.arrival_time.strftime('%H:%M'),
-            'status': p.status
-        } for p in participants],
+            'status': p.status,
+            'registered': True
+        } for p in meeting.participants if p.player],
         'planned_games': [{
             'id': game.id,
             'name': game.name
@@ -142,25 +204,27 @@ def api_meeting_detail(meeting_id):
     }
     
     # 게임 기록 추가
-    for record in game_records:
-        game_results = GameResult.query.filter_by(game_record_id=record.id).all()
+    for record in sorted(meeting.game_records, key=lambda r: r.id):
         result['games'].append({
             'id': record.id,
-            'name': record.game.name,
+            'name': record.game.name if record.game else None,
             'results': [{
-                'id': result.id,
+                'id': game_result.id,
                 'player': {
-                    'id': result.player.id if result.player.registered else None,
-                    'name': result.player.name
+                    # 미등록 플레이어는 player_name 으로 표시
+                    'id': game_result.player.id if game_result.player else None,
+                    'name': game_result.player.name if game_result.player else game_result.player_name,
+                    'registered': game_result.player is not None
                 },
-                'score': result.score,
-                'is_winner': result.is_winner
-            } for result in game_results]
+                'score': game_result.score,
+                'is_winner': game_result.is_winner
+            } for game_result in sorted(record.results, key=lambda r: r.id)]
         })
     
     return jsonify(result)
 
 @meeting.route('/api/meetings/<int:meeting_id>/participants', methods=['POST'])
+@idempotent
 def api_add_participant(meeting_id):
     data = request.get_json()
     
@@ -197,7 +261,18 @@ def api_add_participant(meeting_id):
         )
         db.session.add(participant)
     
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # 같은 플레이어를 동시에 추가한 경우 (모임당 참가자 고유 인덱스) 먼저 들어간 행을 갱신합니다
+        db.session.rollback()
+        participant = MeetingParticipant.query.filter_by(
+            meeting_id=meeting_id,
+            player_id=data['player_id']
+        ).one()
+        participant.arrival_time = arrival_time
+        participant.status = data.get('status', 'confirmed')
+        db.session.commit()
     
     return jsonify({
         'id': participant.id,
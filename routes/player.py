@@ -1,10 +1,17 @@
 from flask import Blueprint, request, jsonify
-from models import Player, GameResult, GameRecord, db
+from sqlalchemy import tuple_
+from models import Player, GameResult, GameRecord, Game, Meeting, db
+from idempotency import idempotent
+from http_cache import conditional
+from datetime import datetime
+from utils import encode_cursor, decode_cursor
+from rollup import player_results_removed
 
 player = Blueprint('player', __name__)
 
 # API 엔드포인트: 플레이어 목록 조회
 @player.route('/api/players', methods=['GET'])
+@conditional(Player)
 def api_player_list():
     players = Player.query.all()
     result = []
@@ -19,32 +26,72 @@ def api_player_list():
     
     return jsonify(result)
 
+# 게임 히스토리 페이지 크기
+HISTORY_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 200
+
 # API 엔드포인트: 단일 플레이어 조회
+# 게임 히스토리는 기록 날짜 최신순 키셋 페이지네이션 (cursor, limit)이며 from/to 날짜와 game_id 로 필터링할 수 있습니다.
+# 날짜 조건과 정렬은 game_result.record_date 로 처리하므로 (player_id, record_date, id) 인덱스를 순서대로 읽어
+# 페이지 크기만큼만 조회합니다. 뒤쪽 페이지도 앞쪽 페이지와 비용이 같습니다.
 @player.route('/api/players/<int:player_id>', methods=['GET'])
 def api_player_detail(player_id):
     player = Player.query.get_or_404(player_id)
     
-    # 플레이어의 게임 기록 조회 - GameRecord 테이블과 조인하여 관련 정보 가져오기
-    game_results = db.session.query(
-        GameResult, GameRecord
+    limit = request.args.get('limit', HISTORY_PAGE_SIZE, type=int)
+    limit = min(max(limit, 1), HISTORY_MAX_PAGE_SIZE)
+    game_id = request.args.get('game_id', type=int)
+    
+    try:
+        after = decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+        date_from = datetime.strptime(request.args['from'], '%Y-%m-%d').date() if request.args.get('from') else None
+        date_to = datetime.strptime(request.args['to'], '%Y-%m-%d').date() if request.args.get('to') else None
+    except ValueError:
+        return jsonify({'error': '잘못된 커서 또는 날짜 형식입니다.'}), 400
+    
+    # 플레이어의 게임 기록 조회 - 게임과 모임을 같은 쿼리에서 조인
+    query = db.session.query(
+        GameResult.id, GameResult.score, GameResult.is_winner, GameResult.record_date.label('date'),
+        GameRecord.id.label('record_id'), GameRecord.game_id, GameRecord.meeting_id,
+        Game.name.label('game_name'),
+        Meeting.date.label('meeting_date'), Meeting.location.label('meeting_location')
     ).join(
         GameRecord, GameResult.game_record_id == GameRecord.id
+    ).outerjoin(
+        Game, Game.id == GameRecord.game_id
+    ).outerjoin(
+        Meeting, Meeting.id == GameRecord.meeting_id
     ).filter(
         GameResult.player_id == player_id
-    ).all()
+    )
+    
+    if game_id:
+        query = query.filter(GameRecord.game_id == game_id)
+    if date_from:
+        query = query.filter(GameResult.record_date >= date_from)
+    if date_to:
+        query = query.filter(GameResult.record_date <= date_to)
+    if after:
+        # 행 값 비교는 인덱스 범위로 처리되어 커서 이전 행을 건너뛰며 읽지 않습니다
+        query = query.filter(tuple_(GameResult.record_date, GameResult.id) < tuple_(*after))
+    
+    rows = query.order_by(GameResult.record_date.desc(), GameResult.id.desc()).limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1].date, rows[limit - 1].id) if len(rows) > limit else None
     
     game_history = []
     
-    for result, record in game_results:
+    for row in rows[:limit]:
         game_history.append({
-            'id': result.id,
-            'game_id': record.game_id,
-            'game_name': record.game.name if record.game else None,
-            'score': result.score,
-            'is_winner': result.is_winner,
-            'meeting_id': record.meeting_id,
-            'meeting_date': record.meeting.date.strftime('%Y-%m-%d') if record.meeting else None,
-            'meeting_location': record.meeting.location if record.meeting else None
+            'id': row.id,
+            'game_record_id': row.record_id,
+            'date': row.date.strftime('%Y-%m-%d') if row.date else None,
+            'game_id': row.game_id,
+            'game_name': row.game_name,
+            'score': row.score,
+            'is_winner': row.is_winner,
+            'meeting_id': row.meeting_id,
+            'meeting_date': row.meeting_date.strftime('%Y-%m-%d') if row.meeting_date else None,
+            'meeting_location': row.meeting_location
         })
     
     return jsonify({
@@ -53,11 +100,13 @@ def api_player_detail(player_id):
         'birth_year': player.birth_year,
         'mbti': player.mbti,
         'location': player.location,
-        'game_history': game_history
+        'game_history': game_history,
+        'next_cursor': next_cursor
     })
 
 # API 엔드포인트: 플레이어 추가
 @player.route('/api/players', methods=['POST'])
+@idempotent
 def api_add_player():
     data = request.json
     
@@ -138,6 +187,9 @@ def api_edit_player(player_id):
 def api_delete_player(player_id):
     player = Player.query.get_or_404(player_id)
     
+    # 통계 롤업에서 제외 (같은 트랜잭션)
+    player_results_removed(player_id)
+    
     # 플레이어와 관련된 게임 결과 삭제
     GameResult.query.filter_by(player_id=player_id).delete()
     
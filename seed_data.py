@@ -0,0 +1,295 @@
+"""
+합성 데이터 생성기
+
+플레이어, 게임, 모임, 모임 참가자, 게임 기록, 게임 결과를 지정한 결과 수(1만 ~ 1000만 행)만큼 만듭니다.
+같은 --seed 와 --results 로는 항상 같은 데이터가 만들어집니다.
+
+    python seed_data.py --db /tmp/bench-1m.db --results 1000000
+    python seed_data.py --db /tmp/bench-10k.db --results 10000 --seed 7
+
+데이터 분포:
+    - 플레이어와 게임의 활동량은 지프(Zipf) 분포를 따릅니다. ID가 작을수록 많이 플레이합니다
+      (점검 도구와 벤치마크가 쓰는 첫 번째 ID가 가장 무거운 플레이어/게임입니다).
+    - 기록의 약 80%는 모임에 속하고, 모임 날짜는 최근일수록 촘촘합니다. (DATE_START ~ DATE_END)
+    - 결과의 약 5%는 미등록 플레이어(player_id 없음, player_name 만 있음)입니다.
+    - 승자는 최고 점수를 받은 플레이어입니다. (동점이면 모두 승자)
+
+테이블은 인덱스 없이 만든 뒤 executemany 로 한꺼번에 넣고, 마지막에 인덱스를 만듭니다.
+이어서 앱을 통해 통계 롤업(rollup.rebuild)과 레이팅(ratings.replay)을 계산하고 ANALYZE 를 실행합니다.
+"""
+import argparse
+import datetime
+import logging
+import os
+import random
+import sqlite3
+import sys
+import time
+from itertools import accumulate
+
+# 결과 수에 비례하는 데이터 크기 (최소, 최대)
+RESULTS_PER_PLAYER = 500
+PLAYER_RANGE = (50, 20000)
+RESULTS_PER_GAME = 5000
+GAME_RANGE = (20, 1000)
+
+ZIPF_EXPONENT = 1.1
+GUEST_NAMES = 500
+UNREGISTERED_RATIO = 0.05
+STANDALONE_RATIO = 0.2  # 모임에 속하지 않는 기록 비율
+PLAYERS_PER_RECORD = {2: 15, 3: 25, 4: 30, 5: 18, 6: 12}  # 플레이어 수: 가중치
+GAMES_PER_MEETING = (2, 10)
+PARTICIPANTS_PER_MEETING = (4, 12)
+PARTICIPANT_STATUSES = {'confirmed': 80, 'maybe': 15, 'declined': 5}
+DATE_START = datetime.date(2019, 1, 1)
+DATE_END = datetime.date(2024, 12, 31)
+
+MBTI_TYPES = [a + b + c + d for a in 'EI' for b in 'NS' for c in 'TF' for d in 'JP']
+LOCATIONS = ['서울', '부산', '대구', '인천', '광주', '대전', '수원', '성남', '고양', '용인']
+
+BATCH_SIZE = 50000
+
+
+def plan(results):
+    """결과 수에 맞는 플레이어/게임 수"""
+    players = min(max(results // RESULTS_PER_PLAYER, PLAYER_RANGE[0]), PLAYER_RANGE[1])
+    games = min(max(results // RESULTS_PER_GAME, GAME_RANGE[0]), GAME_RANGE[1])
+    return players, games
+
+
+def _zipf_cum_weights(n):
+    return list(accumulate(1 / rank ** ZIPF_EXPONENT for rank in range(1, n + 1)))
+
+
+def _pick(rng, population, cum_weights, k):
+    """가중치에 따라 서로 다른 k 개를 고릅니다."""
+    chosen = []
+    while len(chosen) < k:
+        for value in rng.choices(population, cum_weights=cum_weights, k=k - len(chosen)):
+            if value not in chosen:
+                chosen.append(value)
+    return chosen
+
+
+class _Writer:
+    """테이블별 행을 모아 BATCH_SIZE 마다 executemany 로 넣습니다."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.sql = {}
+        self.rows = {}
+        self.counts = {}
+
+    def table(self, name, columns):
+        placeholders = ', '.join('?' for _ in columns)
+        self.sql[name] = f'INSERT INTO {name} ({", ".join(columns)}) VALUES ({placeholders})'
+        self.rows[name] = []
+        self.counts[name] = 0
+
+    def add(self, name, row):
+        rows = self.rows[name]
+        rows.append(row)
+        if len(rows) >= BATCH_SIZE:
+            self.flush(name)
+
+    def flush(self, name=None):
+        for table in [name] if name else list(self.rows):
+            if self.rows[table]:
+                self.conn.executemany(self.sql[table], self.rows[table])
+                self.counts[table] += len(self.rows[table])
+                self.rows[table] = []
+
+
+def _create_schema(conn):
+    from sqlalchemy.dialects import sqlite
+    from sqlalchemy.schema import CreateTable
+    from models import db
+    for table in db.metadata.sorted_tables:
+        conn.execute(str(CreateTable(table).compile(dialect=sqlite.dialect())))
+
+
+def _create_indexes(conn):
+    from sqlalchemy.dialects import sqlite
+    from sqlalchemy.schema import CreateIndex
+    from models import db
+    for table in db.metadata.sorted_tables:
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            conn.execute(str(CreateIndex(index).compile(dialect=sqlite.dialect())))
+
+
+def _timestamp(day, hour):
+    return f'{day.isoformat()} {hour:02d}:00:00.000000'
+
+
+def _results(rng, writer, record_id, record_day, players, guests, guest_weights):
+    """한 기록의 결과 행을 넣고 결과 수를 반환합니다."""
+    scores = [rng.randint(0, 120) for _ in players]
+    top = max(scores)
+    for player_id, score in zip(players, scores):
+        if rng.random() < UNREGISTERED_RATIO:
+            guest = rng.choices(guests, cum_weights=guest_weights)[0]
+            writer.add('game_result', (record_id, None, guest, score, score == top, record_day.isoformat()))
+        else:
+            writer.add('game_result', (record_id, player_id, None, score, score == top, record_day.isoformat()))
+    return len(players)
+
+
+def load(conn, results, seed=42):
+    """원본 테이블에 합성 데이터를 넣고 테이블별 행 수를 반환합니다."""
+    rng = random.Random(seed)
+    player_count, game_count = plan(results)
+    player_ids = range(1, player_count + 1)
+    game_ids = range(1, game_count + 1)
+    player_weights = _zipf_cum_weights(player_count)
+    game_weights = _zipf_cum_weights(game_count)
+    guests = [f'손님{i}' for i in range(1, GUEST_NAMES + 1)]
+    guest_weights = _zipf_cum_weights(GUEST_NAMES)
+    sizes, size_weights = list(PLAYERS_PER_RECORD), list(accumulate(PLAYERS_PER_RECORD.values()))
+    statuses, status_weights = list(PARTICIPANT_STATUSES), list(accumulate(PARTICIPANT_STATUSES.values()))
+
+    writer = _Writer(conn)
+    writer.table('player', ['id', 'name', 'birth_year', 'mbti', 'location'])
+    writer.table('game', ['id', 'name', 'description'])
+    writer.table('meeting', ['id', 'date', 'location', 'description', 'host_id', 'created_at'])
+    writer.table('meeting_participant', ['meeting_id', 'player_id', 'arrival_time', 'status', 'created_at'])
+    writer.table('game_record', ['id', 'meeting_id', 'game_id', 'date'])
+    writer.table('game_result', ['game_record_id', 'player_id', 'player_name', 'score', 'is_winner', 'record_date'])
+
+    for player_id in player_ids:
+        writer.add('player', (player_id, f'플레이어{player_id}', rng.randint(1970, 2005),
+                              rng.choice(MBTI_TYPES), rng.choice(LOCATIONS)))
+    for game_id in game_ids:
+        writer.add('game', (game_id, f'게임{game_id}', None))
+
+    # 모임 날짜는 생성 순서대로 DATE_START 에서 DATE_END 로 나아가며, 최근일수록 모임이 많습니다
+    mean_players = sum(size * weight for size, weight in PLAYERS_PER_RECORD.items()) / sum(PLAYERS_PER_RECORD.values())
+    expected_meetings = max(1, int(results / mean_players * (1 - STANDALONE_RATIO) / (sum(GAMES_PER_MEETING) / 2)))
+    span = (DATE_END - DATE_START).days
+
+    generated = 0
+    record_id = meeting_id = 0
+    meeting_games_left = 0
+    participants = []
+    day = DATE_START
+    while generated < results:
+        size = rng.choices(sizes, cum_weights=size_weights)[0]
+        if rng.random() < STANDALONE_RATIO:
+            record_id += 1
+            record_day = min(DATE_END, day + datetime.timedelta(days=rng.randint(0, 6)))
+            writer.add('game_record', (record_id, None, rng.choices(game_ids, cum_weights=game_weights)[0],
+                                       record_day.isoformat()))
+            players = _pick(rng, player_ids, player_weights, min(size, player_count))
+            generated += _results(rng, writer, record_id, record_day, players, guests, guest_weights)
+            continue
+
+        if meeting_games_left == 0:
+            meeting_id += 1
+            progress = min(1.0, meeting_id / expected_meetings)
+            day = DATE_START + datetime.timedelta(days=int(span * progress ** 0.5))
+            members = _pick(rng, player_ids, player_weights,
+                            min(rng.randint(*PARTICIPANTS_PER_MEETING), player_count))
+            writer.add('meeting', (meeting_id, day.isoformat(), rng.choice(LOCATIONS), None, members[0],
+                                   _timestamp(day - datetime.timedelta(days=rng.randint(1, 14)), 12)))
+            participants = []
+            for player_id in members:
+                status = rng.choices(statuses, cum_weights=status_weights)[0]
+                writer.add('meeting_participant', (meeting_id, player_id, f'{rng.randint(18, 20)}:00:00.000000',
+                                                   status, _timestamp(day, 9)))
+                if status != 'declined':
+                    participants.append(player_id)
+            meeting_games_left = rng.randint(*GAMES_PER_MEETING)
+
+        meeting_games_left -= 1
+        record_id += 1
+        writer.add('game_record', (record_id, meeting_id, rng.choices(game_ids, cum_weights=game_weights)[0],
+                                   day.isoformat()))
+        # 참가자 중에서 고르고, 모자라면 다른 플레이어로 채웁니다
+        players = rng.sample(participants, min(size, len(participants)))
+        if len(players) < size:
+            extra = [p for p in _pick(rng, player_ids, player_weights, min(size, player_count)) if p not in players]
+            players += extra[:size - len(players)]
+        generated += _results(rng, writer, record_id, day, players, guests, guest_weights)
+
+    writer.flush()
+    return writer.counts
+
+
+def _create_app(db_path):
+    os.environ.setdefault('APP_ENV', 'testing')
+    from app import create_app
+    return create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.abspath(db_path)}',
+        'CREATE_SCHEMA': False,
+        'LOG_ASYNC': False,
+        'LOG_ACCESS': False,
+        'DEBUG': False,
+        'TESTING': False,
+    })
+
+
+def generate(db_path, results, seed=42, report=print):
+    """
+    db_path 에 합성 데이터 DB를 만듭니다. (파일이 이미 있으면 FileExistsError)
+    테이블별 행 수를 반환합니다.
+    """
+    if os.path.exists(db_path):
+        raise FileExistsError(db_path)
+    started = time.perf_counter()
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        # 생성 중에는 저널 없이 씁니다. 중간에 실패한 파일은 지우고 다시 만드세요
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        conn.execute('BEGIN')
+        _create_schema(conn)
+        counts = load(conn, results, seed)
+        conn.execute('COMMIT')
+        report(f"원본 데이터 {sum(counts.values())}행 ({time.perf_counter() - started:.1f}초)")
+
+        started = time.perf_counter()
+        _create_indexes(conn)
+        report(f"인덱스 생성 ({time.perf_counter() - started:.1f}초)")
+        conn.execute('PRAGMA journal_mode = WAL')
+    finally:
+        conn.close()
+
+    import ratings
+    import rollup
+    from models import db
+    logging.disable(logging.CRITICAL)
+    app = _create_app(db_path)
+    with app.app_context():
+        started = time.perf_counter()
+        rollup.rebuild()
+        db.session.commit()
+        report(f"통계 롤업 계산 ({time.perf_counter() - started:.1f}초)")
+        started = time.perf_counter()
+        ratings.replay()
+        db.session.commit()
+        report(f"레이팅 계산 ({time.perf_counter() - started:.1f}초)")
+        db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
+        db.engine.dispose()
+    logging.disable(logging.NOTSET)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='합성 데이터 생성')
+    parser.add_argument('--db', required=True, help='만들 SQLite 파일 (이미 있으면 중단)')
+    parser.add_argument('--results', type=int, default=100_000, help='게임 결과 행 수 (1만 ~ 1000만)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    try:
+        counts = generate(args.db, args.results, args.seed)
+    except FileExistsError:
+        print(f"{args.db} 파일이 이미 있습니다. 다른 경로를 지정하거나 파일을 지우세요.")
+        return 1
+    for table, count in counts.items():
+        print(f"- {table}: {count}행")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
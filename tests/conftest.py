@@ -0,0 +1,52 @@
+import os
+
+# app 모듈을 가져올 때 만들어지는 기본 앱도 메모리 DB(testing 프로필)를 쓰도록 먼저 설정합니다
+os.environ['APP_ENV'] = 'testing'
+
+import pytest  # noqa: E402
+from app import create_app  # noqa: E402
+from models import db  # noqa: E402
+from player_cache import player_stats_cache  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    # 테스트마다 새 메모리 DB를 사용합니다
+    app = create_app({'ANALYTICS_SNAPSHOT_DIR': str(tmp_path / 'analytics')})
+    player_stats_cache.clear()
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def create_player(client, name):
+    response = client.post('/api/players', json={'name': name})
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['id']
+
+
+def create_game(client, name):
+    response = client.post('/api/games', json={'name': name})
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['id']
+
+
+def create_meeting(client, host_id, date='2024-05-01'):
+    response = client.post('/api/meetings', json={'date': date, 'location': '보드게임 카페', 'host_id': host_id})
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['id']
+
+
+def add_record(client, game_id, results, meeting_id=None, date='2024-05-01'):
+    if meeting_id:
+        response = client.post(f'/api/meetings/{meeting_id}/records', json={'game_id': game_id, 'results': results})
+    else:
+        response = client.post('/api/game-records', json={'game_id': game_id, 'date': date, 'results': results})
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['id']
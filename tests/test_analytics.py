@@ -0,0 +1,83 @@
+import json
+import os
+import analytics
+from routes.index import analytics_snapshot_dir
+from tests.conftest import create_player, create_game, add_record
+
+
+def _add_records(client, count):
+    first, second = create_player(client, '플레이어1'), create_player(client, '플레이어2')
+    game = create_game(client, '카탄')
+    for i in range(count):
+        add_record(client, game, [{'player_id': first, 'score': i, 'is_winner': True}, {'player_id': second}])
+    return first, second, game
+
+
+def test_rebuild_publishes_new_generation_without_touching_mapped_files(app, client):
+    first, second, game = _add_records(client, 3)
+    directory = analytics_snapshot_dir()
+
+    snapshot = analytics.load_snapshot(directory)
+    assert snapshot.rows == 6
+    old_generation_dir = os.path.dirname(snapshot['result_id'].filename)
+    old_ids = snapshot['result_id'].tolist()
+    old_size = os.path.getsize(snapshot['result_id'].filename)
+
+    meta = analytics.build_snapshot(directory)
+    assert meta['generation'] == 2
+    # 이전 세대 파일은 그대로 남아 있어 열려 있는 매핑을 계속 읽을 수 있습니다
+    assert os.path.getsize(snapshot['result_id'].filename) == old_size
+    assert snapshot['result_id'].tolist() == old_ids
+    assert analytics.load_snapshot(directory)['result_id'].tolist() == old_ids
+
+    # 바로 이전 세대까지만 남기고 더 오래된 세대는 지웁니다
+    analytics.build_snapshot(directory)
+    assert not os.path.exists(old_generation_dir)
+    assert sorted(entry for entry in os.listdir(directory) if entry.startswith('gen-')) == ['gen-2', 'gen-3']
+
+
+def test_refresh_appends_to_current_generation(app, client):
+    first, second, game = _add_records(client, 2)
+    directory = analytics_snapshot_dir()
+    snapshot = analytics.load_snapshot(directory)
+    generation = analytics._read_meta(directory)['generation']
+
+    add_record(client, game, [{'player_id': first}, {'player_id': second, 'score': 7, 'is_winner': True}])
+    refreshed = analytics.load_snapshot(directory)
+    assert analytics._read_meta(directory)['generation'] == generation
+    assert refreshed.rows == snapshot.rows + 2
+    assert refreshed['result_id'][:snapshot.rows].tolist() == snapshot['result_id'].tolist()
+
+
+def test_legacy_snapshot_layout_is_rebuilt(app, client):
+    _add_records(client, 1)
+    directory = analytics_snapshot_dir()
+    os.makedirs(directory)
+    with open(os.path.join(directory, 'meta.json'), 'w') as f:
+        json.dump({'rows': 0, 'last_result_id': 0, 'result_total': 0}, f)
+    for name in analytics.COLUMNS:
+        open(os.path.join(directory, f'{name}.bin'), 'wb').close()
+
+    assert analytics.load_snapshot(directory).rows == 2
+    assert not any(entry.endswith('.bin') for entry in os.listdir(directory))
+    assert client.get('/api/stats/analytics').status_code == 200
+
+
+def test_delete_newest_then_insert_rebuilds_snapshot(app, client):
+    players = [create_player(client, f'플레이어{i}') for i in range(4)]
+    first_game, second_game = create_game(client, '카탄'), create_game(client, '스플렌더')
+    add_record(client, first_game, [{'player_id': players[0], 'score': 5, 'is_winner': True}, {'player_id': players[1]}])
+    add_record(client, second_game, [{'player_id': players[0], 'score': 9, 'is_winner': True}, {'player_id': players[1]}])
+    directory = analytics_snapshot_dir()
+    assert analytics.load_snapshot(directory).rows == 4
+
+    # 가장 최근 결과를 지운 뒤 같은 수의 결과를 추가하면 SQLite 가 지워진 결과 ID 를 다시 씁니다
+    assert client.post(f'/games/{second_game}/delete').status_code == 302
+    third_game = create_game(client, '아그리콜라')
+    add_record(client, third_game, [{'player_id': players[2], 'score': 3, 'is_winner': True}, {'player_id': players[3]}])
+
+    data = client.get('/api/stats/analytics').get_json()
+    assert {winner['id']: winner['wins'] for winner in data['top_winners']} == {
+        players[0]: 1, players[1]: 0, players[2]: 1, players[3]: 0,
+    }
+    assert sorted(stats['id'] for stats in data['score_stats']) == [first_game, third_game]
@@ -0,0 +1,20 @@
+import pytest
+from app import create_app
+from config import DevelopmentConfig, ProductionConfig
+
+
+def test_production_requires_secret_key(monkeypatch):
+    monkeypatch.setattr(ProductionConfig, 'SECRET_KEY', None)
+    with pytest.raises(RuntimeError, match='SECRET_KEY'):
+        create_app('production')
+
+
+def test_development_app_does_not_create_database_file(tmp_path):
+    db_path = tmp_path / 'boardgame.db'
+
+    class LocalDevelopmentConfig(DevelopmentConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        LOG_ASYNC = False
+
+    create_app(LocalDevelopmentConfig)
+    assert not db_path.exists()
@@ -0,0 +1,42 @@
+import routes.game
+from routes.game import GAME_RECORD_PAGE_SIZE
+from tests.conftest import create_player, create_game, add_record
+
+
+def _render_context(monkeypatch):
+    # 템플릿 대신 뷰가 넘기는 값을 기록합니다
+    rendered = {}
+    monkeypatch.setattr(routes.game, 'render_template', lambda name, **context: rendered.update(context) or '')
+    return rendered
+
+
+def test_game_detail_pages_records_by_date(client, monkeypatch):
+    player = create_player(client, '플레이어')
+    game = create_game(client, '카탄')
+    count = GAME_RECORD_PAGE_SIZE + 5
+    for day in range(count):
+        add_record(client, game, [{'player_id': player, 'is_winner': True}], date=f'2024-01-{day % 28 + 1:02d}')
+
+    rendered = _render_context(monkeypatch)
+    pages = []
+    cursor = None
+    while True:
+        response = client.get(f'/games/{game}' + (f'?cursor={cursor}' if cursor else ''))
+        assert response.status_code == 200
+        pages.append([(record.date, record.id) for record in rendered['game_records']])
+        cursor = rendered['next_cursor']
+        if not cursor:
+            break
+
+    assert [len(page) for page in pages] == [GAME_RECORD_PAGE_SIZE, 5]
+    records = [record for page in pages for record in page]
+    assert records == sorted(records, reverse=True)
+    assert len(set(records)) == count
+    assert rendered['play_count'] == count
+
+
+def test_game_detail_redirects_bad_cursor(client):
+    game = create_game(client, '카탄')
+    response = client.get(f'/games/{game}?cursor=not-a-cursor')
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith(f'/games/{game}')
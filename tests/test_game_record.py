@@ -0,0 +1,114 @@
+import pytest
+from models import db, GameResult
+from record_ingest import MAX_PLAYER_NAME_LENGTH
+from routes.game_record import MAX_BATCH_RECORDS
+from tests.conftest import create_player, create_game, create_meeting
+
+
+@pytest.mark.parametrize('body', [
+    [1, 2],
+    'records',
+    {},
+    {'records': []},
+    {'records': {'game_id': 1}},
+    {'records': 'abc'},
+])
+def test_batch_rejects_malformed_body(client, body):
+    response = client.post('/api/game-records/batch', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_batch_rejects_non_json_body(client):
+    response = client.post('/api/game-records/batch', data='not json', content_type='application/json')
+    assert response.status_code == 400
+
+
+def test_batch_rejects_too_many_records(client):
+    record = {'game_id': 1, 'date': '2024-05-01', 'results': [{'player_id': 1}]}
+    response = client.post('/api/game-records/batch', json={'records': [record] * (MAX_BATCH_RECORDS + 1)})
+    assert response.status_code == 400
+    assert str(MAX_BATCH_RECORDS) in response.get_json()['error']
+
+
+def test_batch_reports_non_dict_items_per_record(client):
+    player = create_player(client, '플레이어')
+    game = create_game(client, '카탄')
+    valid = {'game_id': game, 'date': '2024-05-01', 'results': [{'player_id': player, 'is_winner': True}]}
+
+    response = client.post('/api/game-records/batch', json={'records': [valid, 1, 'record', None]})
+    assert response.status_code == 207
+    data = response.get_json()
+    assert (data['created'], data['failed']) == (1, 3)
+    assert [record['status'] for record in data['records']] == ['created', 'error', 'error', 'error']
+
+
+@pytest.mark.parametrize('score', ['abc', 'x', 12.5, True, [], {}, 10 ** 30, -2 ** 63 - 1, str(2 ** 63), 1e30])
+def test_record_rejects_non_numeric_score(client, score):
+    first, second = create_player(client, '플레이어1'), create_player(client, '플레이어2')
+    game = create_game(client, '카탄')
+
+    for results in (
+        [{'player_id': first, 'score': score, 'is_winner': True}, {'player_id': second, 'score': 3}],
+        [{'player_id': first, 'score': 5, 'is_winner': True}, {'player_id': 0, 'player_name': '손님', 'score': score}],
+    ):
+        response = client.post('/api/game-records', json={'game_id': game, 'date': '2024-05-01', 'results': results})
+        assert response.status_code == 400
+        assert '점수' in response.get_json()['error']
+
+    # 거부된 기록은 저장되지 않았으므로 분석 통계가 정상 동작합니다
+    assert client.get('/api/stats/analytics').status_code == 200
+
+
+def test_record_accepts_numeric_and_empty_scores(client):
+    first, second = create_player(client, '플레이어1'), create_player(client, '플레이어2')
+    game = create_game(client, '카탄')
+    meeting = create_meeting(client, first)
+    response = client.post(f'/api/meetings/{meeting}/records', json={'game_id': game, 'results': [
+        {'player_id': first, 'score': '12', 'is_winner': True},
+        {'player_id': second, 'score': 7.0},
+        {'player_id': 0, 'player_name': '손님', 'score': ''},
+    ]})
+    assert response.status_code == 201
+
+    detail = client.get(f'/api/meetings/{meeting}').get_json()
+    assert [result['score'] for result in detail['games'][0]['results']] == [12, 7, None]
+    assert client.get('/api/stats/analytics').status_code == 200
+    assert client.get('/api/stats/ratings').status_code == 200
+
+
+def test_batch_reports_non_numeric_score_per_record(client):
+    player = create_player(client, '플레이어')
+    game = create_game(client, '카탄')
+    records = [
+        {'game_id': game, 'date': '2024-05-01', 'results': [{'player_id': player, 'score': 10}]},
+        {'game_id': game, 'date': '2024-05-02', 'results': [{'player_id': player, 'score': 'abc'}]},
+        {'game_id': game, 'date': '2024-05-03', 'results': [{'player_id': player, 'score': 10 ** 30}]},
+        {'game_id': game, 'date': '2024-05-04', 'results': [{'player_id': player, 'score': 2 ** 63 - 1}]},
+    ]
+    response = client.post('/api/game-records/batch', json={'records': records})
+    assert response.status_code == 207
+    assert [record['status'] for record in response.get_json()['records']] == ['created', 'error', 'error', 'created']
+
+
+@pytest.mark.parametrize('name', [['x'], {'name': 'x'}, 12, True, 'x' * (MAX_PLAYER_NAME_LENGTH + 1)])
+def test_record_rejects_invalid_player_name(client, name):
+    game = create_game(client, '카탄')
+    results = [{'player_id': 0, 'player_name': name, 'is_winner': True}]
+    response = client.post('/api/game-records', json={'game_id': game, 'date': '2024-05-01', 'results': results})
+    assert response.status_code == 400
+    assert '이름' in response.get_json()['error']
+
+
+def test_batch_reports_invalid_player_name_per_record(client):
+    game = create_game(client, '카탄')
+    records = [
+        {'game_id': game, 'date': '2024-05-01', 'results': [{'player_id': 0, 'player_name': ' 손님 ', 'is_winner': True}]},
+        {'game_id': game, 'date': '2024-05-02', 'results': [{'player_id': 0, 'player_name': ['x']}]},
+    ]
+    response = client.post('/api/game-records/batch', json={'records': records})
+    assert response.status_code == 207
+    data = response.get_json()
+    assert [record['status'] for record in data['records']] == ['created', 'error']
+    assert '이름' in data['records'][1]['error']
+    assert [name for (name,) in db.session.query(GameResult.player_name)] == ['손님']
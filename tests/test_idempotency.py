@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+from models import db, Player, IdempotencyKey
+
+
+def _create(client, key, name='플레이어'):
+    return client.post('/api/players', json={'name': name}, headers={'Idempotency-Key': key})
+
+
+def _lose_response(key, age_seconds):
+    # 응답을 저장하기 전에 프로세스가 종료된 상태: 처리 중 예약만 남습니다
+    stored = db.session.get(IdempotencyKey, key)
+    stored.status_code = stored.content_type = stored.response_body = None
+    stored.created_at = datetime.utcnow() - timedelta(seconds=age_seconds)
+    db.session.commit()
+
+
+def test_retry_replays_stored_response(client):
+    first = _create(client, 'key-1')
+    retry = _create(client, 'key-1')
+    assert first.status_code == retry.status_code == 201
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert retry.get_json() == first.get_json()
+    assert Player.query.count() == 1
+
+
+def test_reused_key_with_different_body_is_rejected(client):
+    _create(client, 'key-1')
+    assert _create(client, 'key-1', name='다른 플레이어').status_code == 422
+
+
+def test_in_flight_reservation_blocks_retry_until_lease_expires(app, client):
+    lease = app.config['IDEMPOTENCY_LEASE_SECONDS']
+    _create(client, 'key-1')
+
+    _lose_response('key-1', age_seconds=lease / 2)
+    assert _create(client, 'key-1').status_code == 409
+
+    _lose_response('key-1', age_seconds=lease + 1)
+    retry = _create(client, 'key-1')
+    assert retry.status_code == 201
+    assert 'Idempotent-Replayed' not in retry.headers
+
+    # 넘겨받은 요청의 응답이 저장되어 이후 재시도는 그 응답을 돌려받습니다
+    replay = _create(client, 'key-1')
+    assert replay.headers['Idempotent-Replayed'] == 'true'
+    assert replay.get_json() == retry.get_json()
@@ -0,0 +1,43 @@
+from query_stats import query_budget
+from tests.conftest import create_player, create_game, create_meeting, add_record
+
+# 모임 상세 조회 쿼리 수 상한 (모임, 호스트, 참가자, 예정 게임, 기록, 결과 일괄 로딩)
+MEETING_DETAIL_QUERY_BUDGET = 6
+
+
+def _meeting_with_records(client, host, guest, game, record_count):
+    meeting_id = create_meeting(client, host)
+    response = client.post(f'/api/meetings/{meeting_id}/participants', json={'player_id': guest, 'arrival_time': '19:00'})
+    assert response.status_code < 400
+    for i in range(record_count):
+        # 기록마다 참가자 목록에 없는 플레이어를 넣어 결과의 플레이어를 따로 불러오지 않는지 확인합니다
+        player = create_player(client, f'플레이어{meeting_id}-{i}')
+        add_record(client, game, [
+            {'player_id': host, 'score': 10 + i, 'is_winner': True},
+            {'player_id': player, 'score': 5},
+            {'player_id': 0, 'player_name': f'손님{i}', 'score': 3},
+        ], meeting_id=meeting_id)
+    return meeting_id
+
+
+def test_meeting_detail_query_count_does_not_grow_with_records(client):
+    host = create_player(client, '호스트')
+    guest = create_player(client, '참가자')
+    game = create_game(client, '카탄')
+
+    counts = {}
+    for record_count in (1, 10, 30):
+        meeting_id = _meeting_with_records(client, host, guest, game, record_count)
+        with query_budget(MEETING_DETAIL_QUERY_BUDGET, f'meeting detail ({record_count} records)') as stats:
+            response = client.get(f'/api/meetings/{meeting_id}')
+
+        assert response.status_code == 200
+        games = response.get_json()['games']
+        assert len(games) == record_count
+        assert all(len(game['results']) == 3 for game in games)
+        assert games[-1]['results'][2]['player'] == {
+            'id': None, 'name': f'손님{record_count - 1}', 'registered': False
+        }
+        counts[record_count] = stats.count
+
+    assert len(set(counts.values())) == 1, counts
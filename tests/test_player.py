@@ -0,0 +1,58 @@
+from datetime import date as Date
+from models import db, GameRecord, GameResult
+from tests.conftest import create_player, create_game, add_record
+
+
+def _history_pages(client, player_id, query=''):
+    pages, cursor = [], None
+    while True:
+        url = f'/api/players/{player_id}?limit=2{query}' + (f'&cursor={cursor}' if cursor else '')
+        response = client.get(url)
+        assert response.status_code == 200
+        data = response.get_json()
+        pages.append([(entry['date'], entry['id']) for entry in data['game_history']])
+        cursor = data['next_cursor']
+        if not cursor:
+            return pages
+
+
+def test_player_history_follows_cursor_in_record_date_order(client):
+    player = create_player(client, '플레이어')
+    game = create_game(client, '카탄')
+    # 기록 날짜가 저장 순서와 다르도록 섞어서 추가합니다
+    for date in ('2024-03-01', '2024-01-15', '2024-03-01', '2023-12-31', '2024-02-10'):
+        add_record(client, game, [{'player_id': player, 'is_winner': True}], date=date)
+
+    pages = _history_pages(client, player)
+    assert [len(page) for page in pages] == [2, 2, 1]
+    history = [entry for page in pages for entry in page]
+    assert history == sorted(history, reverse=True)
+    assert [date for date, _ in history] == ['2024-03-01', '2024-03-01', '2024-02-10', '2024-01-15', '2023-12-31']
+
+    filtered = [entry for page in _history_pages(client, player, '&from=2024-01-01&to=2024-02-29') for entry in page]
+    assert [date for date, _ in filtered] == ['2024-02-10', '2024-01-15']
+
+
+def test_player_history_rejects_bad_cursor(client):
+    player = create_player(client, '플레이어')
+    assert client.get(f'/api/players/{player}?cursor=not-a-cursor').status_code == 400
+
+
+def test_result_record_date_follows_game_record(app, client):
+    player = create_player(client, '플레이어')
+    game = create_game(client, '카탄')
+    record_id = add_record(client, game, [{'player_id': player, 'is_winner': True}], date='2024-05-01')
+
+    # 기록 날짜를 지정하지 않고 저장한 결과도 기록의 날짜를 갖습니다 (ORM, Core INSERT)
+    db.session.add(GameResult(game_record_id=record_id, player_id=player, score=1))
+    db.session.execute(GameResult.__table__.insert(), [{'game_record_id': record_id, 'player_id': player}])
+    db.session.commit()
+    assert [entry for page in _history_pages(client, player) for entry in page] == [
+        ('2024-05-01', 3), ('2024-05-01', 2), ('2024-05-01', 1)
+    ]
+
+    # 기록 날짜를 바꾸면 결과의 복사본도 함께 바뀝니다
+    db.session.get(GameRecord, record_id).date = Date(2023, 1, 2)
+    db.session.commit()
+    assert {record_date for (record_date,) in db.session.query(GameResult.record_date)} == {Date(2023, 1, 2)}
+    assert [d for page in _history_pages(client, player, '&to=2023-12-31') for d, _ in page] == ['2023-01-02'] * 3
@@ -0,0 +1,47 @@
+import pytest
+from query_stats import query_budget
+from tests.conftest import create_player, create_game, create_meeting, add_record
+
+# 엔드포인트별 쿼리 수 상한. 모임/기록/플레이어 수와 관계없이 일정해야 합니다
+QUERY_BUDGETS = {
+    'meeting list': ('/api/meetings', 3),
+    'meeting detail': ('/api/meetings/{meeting_id}', 5),
+    'game detail': ('/api/games/{game_id}', 4),
+    'player detail': ('/api/players/{player_id}', 2),
+}
+
+
+def _grow(client, ids, size):
+    # 추적하는 모임/게임/플레이어가 참조되는 모임, 기록, 참가자를 size 에 비례해 늘립니다
+    players = [create_player(client, f'플레이어{ids["round"]}-{i}') for i in range(size)]
+    games = [create_game(client, f'게임{ids["round"]}-{i}') for i in range(size)]
+    ids['round'] += 1
+    for player, game in zip(players, games):
+        meeting = create_meeting(client, player)
+        client.post(f'/api/meetings/{meeting}/participants', json={'player_id': ids['player_id'], 'arrival_time': '19:00'})
+        for record_game in (game, ids['game_id']):
+            add_record(client, record_game, [
+                {'player_id': ids['player_id'], 'score': 3, 'is_winner': True},
+                {'player_id': player, 'score': 1},
+                {'player_id': 0, 'player_name': '손님', 'score': 2},
+            ], meeting_id=meeting)
+        add_record(client, game, [{'player_id': player, 'is_winner': True}, {'player_id': 0, 'player_name': '손님'}],
+                   meeting_id=ids['meeting_id'])
+
+
+@pytest.mark.parametrize('endpoint', sorted(QUERY_BUDGETS))
+def test_endpoint_stays_within_query_budget(client, endpoint):
+    path, budget = QUERY_BUDGETS[endpoint]
+    host = create_player(client, '호스트')
+    ids = {'player_id': host, 'game_id': create_game(client, '카탄'), 'round': 0}
+    ids['meeting_id'] = create_meeting(client, host)
+
+    counts = []
+    for size in (1, 4, 10):
+        _grow(client, ids, size)
+        with query_budget(budget, f'{endpoint} (+{size})') as stats:
+            response = client.get(path.format(**ids))
+        assert response.status_code == 200
+        counts.append(stats.count)
+
+    assert len(set(counts)) == 1, counts
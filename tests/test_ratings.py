@@ -0,0 +1,96 @@
+import pytest
+import ratings
+from app import create_app
+from http_cache import bump_tables
+from models import db, RatingState
+from player_cache import player_stats_cache
+from tests.conftest import create_player, create_game, add_record
+
+
+def _leaderboard(client):
+    response = client.get('/api/stats/ratings')
+    assert response.status_code == 200
+    data = response.get_json()
+    return data['stale'], {entry['id']: entry['games'] for entry in data['ratings']}
+
+
+def _add_records(client):
+    first, second = create_player(client, '플레이어1'), create_player(client, '플레이어2')
+    game = create_game(client, '카탄')
+    add_record(client, game, [{'player_id': first, 'is_winner': True}, {'player_id': second}], date='2024-05-01')
+    add_record(client, game, [{'player_id': first}, {'player_id': second, 'is_winner': True}], date='2024-05-02')
+    return first, second, game
+
+
+def test_read_serves_stale_ratings_without_replaying(app, client):
+    first, second, game = _add_records(client)
+
+    # 조회는 재계산하지 않고 stale 로 알려 줍니다
+    assert _leaderboard(client) == (True, {})
+    assert client.get(f'/api/stats/player/{first}/ratings').get_json()['stale'] is True
+    assert db.session.get(RatingState, 1).dirty
+
+    result = app.test_cli_runner().invoke(args=['rebuild-ratings', '--if-dirty'])
+    assert result.exit_code == 0, result.output
+    assert _leaderboard(client) == (False, {first: 2, second: 2})
+
+    # 이후 날짜의 기록은 저장할 때 바로 반영됩니다
+    add_record(client, game, [{'player_id': first, 'is_winner': True}, {'player_id': second}], date='2024-05-03')
+    assert _leaderboard(client) == (False, {first: 3, second: 3})
+
+    # 결과가 삭제되면 재계산 전까지 기존 레이팅을 stale 로 돌려줍니다
+    assert client.delete(f'/api/players/{second}').status_code == 200
+    assert _leaderboard(client) == (True, {first: 3})
+    assert app.test_cli_runner().invoke(args=['rebuild-ratings', '--if-dirty']).exit_code == 0
+    assert _leaderboard(client) == (False, {})
+
+
+def test_refresh_discards_replay_when_records_change_meanwhile(app, client, monkeypatch):
+    _add_records(client)
+    replay = ratings.replay
+
+    def replay_with_concurrent_record():
+        count = replay()
+        # 재계산하는 동안 다른 요청이 기록을 저장한 것처럼 카운터를 올립니다
+        bump_tables(db.session.connection(), ['game_record'])
+        return count
+
+    monkeypatch.setattr(ratings, 'replay', replay_with_concurrent_record)
+    assert ratings.refresh() is None
+    assert db.session.get(RatingState, 1).dirty
+
+    monkeypatch.setattr(ratings, 'replay', replay)
+    assert ratings.refresh() == 4
+    assert not ratings.is_stale()
+
+
+@pytest.fixture
+def file_app(tmp_path):
+    # 백그라운드 스레드가 같은 DB를 보도록 파일 DB를 사용합니다
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'ratings.db'}",
+        'ANALYTICS_SNAPSHOT_DIR': str(tmp_path / 'analytics'),
+        'RATINGS_BACKGROUND_REPLAY': True,
+    })
+    app.instance_path = str(tmp_path / 'instance')
+    player_stats_cache.clear()
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_read_schedules_single_background_replay(file_app, monkeypatch):
+    client = file_app.test_client()
+    first, second, _ = _add_records(client)
+
+    threads = []
+    schedule_replay = ratings.schedule_replay
+    monkeypatch.setattr(ratings, 'schedule_replay', lambda app: threads.append(schedule_replay(app)))
+    assert _leaderboard(client)[0] is True
+    assert threads[0] is not None
+    threads[0].join(timeout=10)
+
+    db.session.remove()
+    assert _leaderboard(client) == (False, {first: 2, second: 2})
+    assert len(threads) == 1
@@ -1,14 +1,32 @@
 from flask import make_response
+from datetime import datetime
+import base64
+import binascii
 
 # CORS 응답 헤더를 추가하는 유틸리티 함수
 def add_cors_headers(response):
     response.headers.add('Access-Control-Allow-Origin', '*')
-    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,Access-Control-Allow-Origin,Accept,X-Requested-With')
+    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,Access-Control-Allow-Origin,Accept,X-Requested-With,Idempotency-Key,If-None-Match')
     response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
+    response.headers.add('Access-Control-Expose-Headers', 'X-Next-Cursor,ETag,Idempotent-Replayed,X-Query-Count,X-Query-Time-Ms,X-Query-Repeated')
     return response
 
 # OPTIONS 요청에 대한 응답을 생성하는 유틸리티 함수
 def create_cors_preflight_response():
     response = make_response()
     add_cors_headers(response)
-    return response, 204
\ No newline at end of file
+    return response, 204
+
+# (date, id) 키셋 페이지네이션 커서를 불투명한 토큰으로 변환하는 유틸리티 함수
+def encode_cursor(cursor_date, cursor_id):
+    raw = f"{cursor_date.strftime('%Y-%m-%d')}|{cursor_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+# 커서 토큰을 (date, id) 로 복원하는 유틸리티 함수 (잘못된 토큰이면 ValueError)
+def decode_cursor(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        date_part, id_part = raw.split('|')
+        return datetime.strptime(date_part, '%Y-%m-%d').date(), int(id_part)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise ValueError('잘못된 커서입니다.')
@@ -0,0 +1,154 @@
+from datetime import timedelta
+from sqlalchemy import func, case, or_, union
+from models import (db, GameRecord, GameResult, MonthlyGameStat, MonthlyPlayerGameStat,
+                    MonthlyPlayerMeetingStat, MonthlyPlayerCountStat)
+from rollup import month_key
+
+# 기간(from/to) 통계 모듈
+# 기간에 완전히 포함되는 달은 월별 롤업 테이블(rollup.py)에서 합산하고,
+# 일부만 포함되는 시작/끝 달은 GameRecord.date 인덱스로 원본 기록을 조회하여 더합니다.
+
+
+def _month_end(value):
+    next_month = (value.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return next_month - timedelta(days=1)
+
+
+class Window:
+    """
+    기간을 롤업으로 읽을 전체 월 범위(first_month ~ last_month, None은 제한 없음)와
+    원본 기록으로 읽을 경계 날짜 범위 목록(edges)으로 나눕니다.
+    """
+
+    def __init__(self, date_from=None, date_to=None):
+        self.date_from = date_from
+        self.date_to = date_to
+        self.first_month = month_key(date_from) if date_from else None
+        self.last_month = month_key(date_to) if date_to else None
+        self.edges = []
+
+        if date_from and date_from.day != 1:
+            month_end = _month_end(date_from)
+            self.edges.append((date_from, min(month_end, date_to) if date_to else month_end))
+            self.first_month = month_key(month_end + timedelta(days=1))
+
+        if date_to and date_to != _month_end(date_to):
+            month_start = date_to.replace(day=1)
+            self.last_month = month_key(month_start - timedelta(days=1))
+            # 시작 달과 같은 달이면 이미 첫 경계 범위에 포함됩니다
+            if not self.edges or self.edges[0][1] < date_to:
+                self.edges.append((max(month_start, date_from) if date_from else month_start, date_to))
+
+    @property
+    def has_months(self):
+        return self.first_month is None or self.last_month is None or self.first_month <= self.last_month
+
+    def month_filter(self, column):
+        conditions = []
+        if self.first_month is not None:
+            conditions.append(column >= self.first_month)
+        if self.last_month is not None:
+            conditions.append(column <= self.last_month)
+        return conditions
+
+    def edge_filter(self):
+        return or_(*[GameRecord.date.between(start, end) for start, end in self.edges])
+
+
+def game_play_counts(window):
+    """게임별 플레이(기록) 수: {game_id: plays}"""
+    counts = {}
+    if window.has_months:
+        for game_id, plays in db.session.query(
+            MonthlyGameStat.game_id, func.sum(MonthlyGameStat.play_count)
+        ).filter(*window.month_filter(MonthlyGameStat.month)).group_by(MonthlyGameStat.game_id):
+            counts[game_id] = counts.get(game_id, 0) + plays
+    if window.edges:
+        for game_id, plays in db.session.query(
+            GameRecord.game_id, func.count(GameRecord.id)
+        ).filter(window.edge_filter()).group_by(GameRecord.game_id):
+            counts[game_id] = counts.get(game_id, 0) + plays
+    return counts
+
+
+def _player_results(window, group_column, edge_group_column, conditions, edge_conditions):
+    # {그룹 키: [플레이 수, 승리 수]}
+    totals = {}
+    if window.has_months:
+        for key, plays, wins in db.session.query(
+            group_column, func.sum(MonthlyPlayerGameStat.plays), func.sum(MonthlyPlayerGameStat.wins)
+        ).filter(
+            *window.month_filter(MonthlyPlayerGameStat.month), *conditions
+        ).group_by(group_column):
+            total = totals.setdefault(key, [0, 0])
+            total[0] += plays
+            total[1] += wins
+    if window.edges:
+        for key, plays, wins in db.session.query(
+            edge_group_column, func.count(GameResult.id), func.sum(case((GameResult.is_winner, 1), else_=0))
+        ).join(
+            GameRecord, GameResult.game_record_id == GameRecord.id
+        ).filter(
+            window.edge_filter(), GameResult.player_id.isnot(None), *edge_conditions
+        ).group_by(edge_group_column):
+            total = totals.setdefault(key, [0, 0])
+            total[0] += plays
+            total[1] += wins
+    return totals
+
+
+def player_totals(window):
+    """등록된 플레이어별 플레이/승리 수: {player_id: [plays, wins]}"""
+    return _player_results(window, MonthlyPlayerGameStat.player_id, GameResult.player_id, (), ())
+
+
+def player_game_stats(window, player_id):
+    """한 플레이어의 게임별 플레이/승리 수: {game_id: [plays, wins]}"""
+    return _player_results(
+        window, MonthlyPlayerGameStat.game_id, GameRecord.game_id,
+        (MonthlyPlayerGameStat.player_id == player_id,), (GameResult.player_id == player_id,)
+    )
+
+
+def player_meeting_counts(window, limit=10):
+    """기간 안에 참여한 모임 수 상위 플레이어: [(player_id, meeting_count), ...]"""
+    selects = []
+    if window.has_months:
+        selects.append(db.select(
+            MonthlyPlayerMeetingStat.player_id, MonthlyPlayerMeetingStat.meeting_id
+        ).filter(*window.month_filter(MonthlyPlayerMeetingStat.month)))
+    if window.edges:
+        selects.append(db.select(GameResult.player_id, GameRecord.meeting_id).join(
+            GameRecord, GameResult.game_record_id == GameRecord.id
+        ).filter(
+            window.edge_filter(), GameResult.player_id.isnot(None), GameRecord.meeting_id.isnot(None)
+        ))
+    # 여러 달에 걸친 같은 (플레이어, 모임) 쌍의 중복을 제거합니다
+    pairs = (selects[0].distinct() if len(selects) == 1 else union(*selects)).subquery()
+    meeting_count = func.count()
+    return [tuple(row) for row in db.session.execute(
+        db.select(pairs.c.player_id, meeting_count).group_by(pairs.c.player_id).order_by(
+            meeting_count.desc(), pairs.c.player_id
+        ).limit(limit)
+    )]
+
+
+def player_count_histogram(window):
+    """기록당 플레이어 수별 기록 수: {player_count: record_count}"""
+    histogram = {}
+    if window.has_months:
+        for player_count, records in db.session.query(
+            MonthlyPlayerCountStat.player_count, func.sum(MonthlyPlayerCountStat.record_count)
+        ).filter(
+            *window.month_filter(MonthlyPlayerCountStat.month)
+        ).group_by(MonthlyPlayerCountStat.player_count):
+            histogram[player_count] = histogram.get(player_count, 0) + records
+    if window.edges:
+        per_record = db.select(func.count(GameResult.id).label('player_count')).join(
+            GameRecord, GameResult.game_record_id == GameRecord.id
+        ).filter(window.edge_filter()).group_by(GameResult.game_record_id).subquery()
+        for player_count, records in db.session.execute(
+            db.select(per_record.c.player_count, func.count()).group_by(per_record.c.player_count)
+        ):
+            histogram[player_count] = histogram.get(player_count, 0) + records
+    return histogram